@@ -0,0 +1,63 @@
+"""
+Performance benchmarks for the portfolio project.
+
+Benchmarks are plain scripts, run from the repository root, e.g.:
+
+    python -m benchmarks.fragment_cache
+
+`loadtest` drives the whole site over HTTP and `compare` diffs two of
+its JSON results. They are not collected by pytest. Unless DATABASE_URL is already set,
+each benchmark runs against a throwaway SQLite database.
+"""
+import os
+import statistics
+import tempfile
+import time
+
+
+def setup_django(database_url=None):
+    """
+    Configures and boots Django for a benchmark run and migrates the
+    database. Returns the database URL in use.
+    """
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+    elif not os.environ.get('DATABASE_URL'):
+        path = os.path.join(tempfile.mkdtemp(prefix='portfolio-bench-'), 'bench.sqlite3')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret-key')
+    os.environ.setdefault('DEBUG', 'True')
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return os.environ['DATABASE_URL']
+
+
+def timed(func, repeat):
+    """Runs `func` `repeat` times and returns the wall-clock timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    """Returns min/median/mean of a list of timings, in milliseconds."""
+    return {
+        'min_ms': round(min(timings) * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+    }
+
+
+def percentile(values, pct):
+    """Returns the `pct`th percentile (0-100) of `values`, by nearest rank."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
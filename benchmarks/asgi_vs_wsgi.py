@@ -0,0 +1,134 @@
+"""
+Benchmark: the WSGI (sync views) and ASGI (async views) deployments
+under concurrency, with a slow database and with slow clients.
+
+Starts the site under gunicorn with sync workers (`portfolio_project.wsgi`)
+and under gunicorn with uvicorn workers (`portfolio_project.asgi`), each
+with the same number of worker processes, and runs three scenarios
+against each:
+
+- baseline:    C concurrent clients requesting the index page and the
+               projects API as fast as they can;
+- slow-db:     the same, with BENCHMARK_QUERY_DELAY added to every query
+               (see 'slow_db_settings.py');
+- slow-client: the same, while S more clients trickle their request
+               headers in slowly, as clients on poor connections do.
+
+Reports throughput and latency percentiles of the fast clients.
+
+Usage:
+    python -m benchmarks.asgi_vs_wsgi [--workers 1] [--clients 20]
+        [--slow-clients 10] [--duration 5] [--query-delay 0.05]
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+
+from benchmarks import percentile, setup_django
+from benchmarks.server import HOST, GunicornServer, get
+
+MODES = {
+    'wsgi': ['portfolio_project.wsgi', '-k', 'sync', '--threads', '1'],
+    'asgi': ['portfolio_project.asgi', '-k', 'uvicorn_worker.UvicornWorker'],
+}
+PATHS = ['/', '/api/projects/?page_size=10']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--slow-clients', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--query-delay', type=float, default=0.05)
+    parser.add_argument('--port', type=int, default=8731)
+    args = parser.parse_args()
+
+    setup_django()
+    from projects.models import Project
+
+    Project.objects.bulk_create(
+        Project(title=f"Benchmark Project {i}", description="Concurrency benchmark.")
+        for i in range(args.projects)
+    )
+
+    scenarios = {
+        'baseline': {'slow_db': False, 'slow_clients': 0},
+        'slow-db': {'slow_db': True, 'slow_clients': 0},
+        'slow-client': {'slow_db': False, 'slow_clients': args.slow_clients},
+    }
+    results = {
+        'workers': args.workers,
+        'clients': args.clients,
+        'duration_s': args.duration,
+        'query_delay_s': args.query_delay,
+        'runs': {},
+    }
+    for scenario, options in scenarios.items():
+        for mode in MODES:
+            env = {}
+            if options['slow_db']:
+                env['DJANGO_SETTINGS_MODULE'] = 'benchmarks.slow_db_settings'
+                env['BENCHMARK_QUERY_DELAY'] = str(args.query_delay)
+            with GunicornServer(MODES[mode], port=args.port, workers=args.workers, env=env):
+                results['runs'][f'{scenario}/{mode}'] = load(
+                    args.port, args.clients, options['slow_clients'], args.duration,
+                )
+    print(json.dumps(results, indent=2))
+
+
+def load(port, clients, slow_clients, duration):
+    """Runs the fast (and slow) clients for `duration` seconds."""
+    stop = threading.Event()
+    latencies = []
+    errors = []
+
+    def fast_client(number):
+        index = number
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                status = get(port, PATHS[index % len(PATHS)])
+            except OSError as exc:
+                errors.append(type(exc).__name__)
+            else:
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors.append(status)
+            index += 1
+
+    def slow_client():
+        # Sends one header line every 0.5s and never finishes the request.
+        while not stop.is_set():
+            try:
+                with socket.create_connection((HOST, port), timeout=5) as sock:
+                    sock.sendall(b'GET / HTTP/1.1\r\nHost: localhost\r\n')
+                    while not stop.wait(0.5):
+                        sock.sendall(b'X-Slow: 1\r\n')
+            except OSError:
+                stop.wait(0.1)
+
+    threads = [threading.Thread(target=slow_client) for _ in range(slow_clients)]
+    threads += [threading.Thread(target=fast_client, args=(number,)) for number in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {'requests': len(latencies), 'errors': len(errors), 'req_per_s': round(len(latencies) / elapsed, 1)}
+    if latencies:
+        for pct in (50, 95, 99):
+            result[f'p{pct}_ms'] = round(percentile(latencies, pct) * 1000, 1)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares two JSON results of `benchmarks.loadtest`, e.g. from two commits.
+
+Prints every metric side by side with its relative change. With
+--fail-above PCT, exits with status 1 if any endpoint's p95 latency
+rose, or its throughput fell, by more than PCT percent, or if it runs
+more queries per request than before.
+
+Usage:
+    python -m benchmarks.compare base.json head.json [--fail-above 10]
+"""
+import argparse
+import json
+import sys
+
+METRICS = ('req_per_s', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request', 'errors')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--fail-above', type=float, help='regression threshold in percent')
+    args = parser.parse_args()
+
+    with open(args.base) as file:
+        base = json.load(file)
+    with open(args.head) as file:
+        head = json.load(file)
+
+    print(f"base: {base.get('commit')} ({base.get('timestamp')})")
+    print(f"head: {head.get('commit')} ({head.get('timestamp')})")
+    if base.get('config') != head.get('config'):
+        print('warning: the runs used different configurations')
+
+    regressions = []
+    rows = [('endpoint', 'metric', 'base', 'head', 'change')]
+    for name, before, after in sections(base, head):
+        for metric in METRICS:
+            if metric not in before and metric not in after:
+                continue
+            old, new = before.get(metric), after.get(metric)
+            rows.append((name, metric, _format(old), _format(new), _change(old, new)))
+            if args.fail_above is not None and is_regression(metric, old, new, args.fail_above):
+                regressions.append(f'{name} {metric}: {old} -> {new}')
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) above {args.fail_above}%:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+
+def sections(base, head):
+    yield 'overall', base['overall'], head['overall']
+    for name in base['endpoints']:
+        if name in head['endpoints']:
+            yield name, base['endpoints'][name], head['endpoints'][name]
+
+
+def is_regression(metric, old, new, threshold):
+    if old is None or new is None:
+        return False
+    if metric == 'queries_per_request':
+        return new > old
+    if metric == 'req_per_s':
+        return old and (old - new) / old * 100 > threshold
+    if metric == 'p95_ms':
+        return old and (new - old) / old * 100 > threshold
+    return False
+
+
+def _format(value):
+    return '-' if value is None else str(value)
+
+
+def _change(old, new):
+    if not old or new is None:
+        return ''
+    return f'{(new - old) / old * 100:+.1f}%'
+
+
+if __name__ == '__main__':
+    main()
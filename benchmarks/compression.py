@@ -0,0 +1,95 @@
+"""
+Benchmark: bytes on the wire and CPU cost of compressed responses.
+
+Seeds N projects, then requests a few dynamic endpoints through the
+full middleware stack (Django's test client, no network) with each
+Accept-Encoding: identity, gzip and Brotli. Compressed requests run
+twice: "cold", with the cache of compressed bodies cleared before every
+request, and "warm", served from it. Reports body bytes and the CPU time
+per request (process time, so waiting on nothing else is counted).
+
+Usage:
+    python -m benchmarks.compression [--projects 200] [--repeat 50]
+"""
+import argparse
+import json
+import statistics
+import time
+from io import StringIO
+
+from benchmarks import setup_django
+
+ENDPOINTS = {
+    'api_list_20': '/api/projects/',
+    'api_list_100': '/api/projects/?page_size=100',
+    'index_html': '/',
+}
+ENCODINGS = {'identity': 'identity', 'gzip': 'gzip', 'br': 'br'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+
+    call_command('seed_db', projects=args.projects, seed=0, stdout=StringIO())
+
+    # A separate cache for compressed bodies, so "cold" runs can clear it
+    # without also dropping the API representation cache.
+    cache_settings = {
+        **settings.CACHES,
+        'compression': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    }
+    results = {'projects': args.projects, 'repeat': args.repeat, 'endpoints': {}}
+    with override_settings(
+        CACHES=cache_settings, COMPRESSION_CACHE_ALIAS='compression',
+        DEBUG=False, ALLOWED_HOSTS=['testserver'],
+    ):
+        client = Client()
+        compressed_cache = caches['compression']
+        for name, path in ENDPOINTS.items():
+            client.get(path)  # Fill the page and API caches first.
+            endpoint = {}
+            for label, encoding in ENCODINGS.items():
+                modes = {'cold': compressed_cache.clear, 'warm': None} if encoding != 'identity' else {'': None}
+                for mode, before in modes.items():
+                    key = f'{label}_{mode}' if mode else label
+                    endpoint[key] = measure(client, path, encoding, args.repeat, before)
+            identity = endpoint['identity']['bytes']
+            for key, result in endpoint.items():
+                result['ratio'] = round(result['bytes'] / identity, 3)
+            results['endpoints'][name] = endpoint
+
+    print(json.dumps(results, indent=2))
+
+
+def measure(client, path, encoding, repeat, before=None):
+    """Requests `path` `repeat` times. Returns body size and CPU ms per request."""
+    cpu = []
+    size = None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.process_time()
+        response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+        cpu.append(time.process_time() - start)
+        if response.status_code != 200:
+            raise SystemExit(f'GET {path} returned {response.status_code}.')
+        size = len(response.content)
+    return {
+        'bytes': size,
+        'cpu_ms_median': round(statistics.median(cpu) * 1000, 3),
+        'cpu_ms_mean': round(statistics.mean(cpu) * 1000, 3),
+    }
+
+
+if __name__ == '__main__':
+    main()
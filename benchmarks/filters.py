@@ -0,0 +1,103 @@
+"""
+Benchmark: filtering the project list by technology and category.
+
+Seeds a synthetic catalog (100,000 projects over 1,000 technologies by
+default) and times the first page of `/api/projects/` filters, as built
+by 'projects/filters.py':
+
+- `any` / `all` of two and three technologies, and a category,
+- `all` run the naive way, one join of the links per technology,
+- every filter again without the indexes added for them, to show what
+  they are worth.
+
+Usage:
+    python -m benchmarks.filters [--projects 100000] [--technologies 1000] [--repeat 20]
+"""
+import argparse
+import json
+
+from benchmarks import setup_django, summarize, timed
+
+THROUGH_INDEX = 'projects_project_technologies_technology_project_idx'
+CATEGORY_INDEX = 'project_cat_created_id_idx'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=100_000)
+    parser.add_argument('--technologies', type=int, default=1000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--max-technologies', type=int, default=8)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    database_url = setup_django()
+
+    from django.core.management import call_command
+    from django.db import connection
+    from projects.filters import filter_projects
+    from projects.models import Category, Project, Technology
+
+    call_command(
+        'seed_db', projects=args.projects, technologies=args.technologies,
+        categories=args.categories, max_technologies=args.max_technologies, seed=1,
+        verbosity=0, stdout=open('/dev/null', 'w'),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    # The most used names, so every filter matches enough rows to fill pages.
+    popular = list(Technology.objects.order_by('-project_count').values_list('name', flat=True)[:3])
+    category = Category.objects.order_by('-project_count').values_list('name', flat=True)[0]
+    filters = {
+        'any of 2 technologies': {'technologies': popular[:2], 'match': 'any', 'categories': []},
+        'all of 2 technologies': {'technologies': popular[:2], 'match': 'all', 'categories': []},
+        'all of 3 technologies': {'technologies': popular, 'match': 'all', 'categories': []},
+        'category': {'technologies': [], 'match': 'any', 'categories': [category]},
+        'category + any of 2': {'technologies': popular[:2], 'match': 'any', 'categories': [category]},
+    }
+    ordered = Project.objects.order_by('-created_at', '-id')
+
+    def first_page(queryset):
+        return lambda: list(queryset.values_list('pk', flat=True)[:args.page_size + 1])
+
+    def chained_joins(names):
+        queryset = ordered
+        for name in names:
+            queryset = queryset.filter(technologies__name=name)
+        return queryset
+
+    def run_all(label):
+        timings = {
+            name: summarize(timed(first_page(filter_projects(ordered, value)), args.repeat))
+            for name, value in filters.items()
+        }
+        timings['all of 3 technologies, chained joins'] = summarize(
+            timed(first_page(chained_joins(popular)), args.repeat)
+        )
+        return {label: timings}
+
+    results = {
+        'database': database_url.split(':', 1)[0],
+        'projects': args.projects,
+        'technologies': args.technologies,
+        'links': Project.technologies.through.objects.count(),
+        'matches': {
+            name: filter_projects(ordered, value).count() for name, value in filters.items()
+        },
+        'repeat': args.repeat,
+    }
+    results.update(run_all('indexed'))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX {THROUGH_INDEX}')
+        cursor.execute(f'DROP INDEX {CATEGORY_INDEX}')
+        cursor.execute('ANALYZE')
+    results.update(run_all('without the filter indexes'))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
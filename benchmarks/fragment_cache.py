@@ -0,0 +1,75 @@
+"""
+Benchmark: rendering project cards with a cold and a warm fragment cache.
+
+Renders 'projects/project_index.html' for N projects (1,000 by default)
+for an anonymous and an authenticated visitor, first with the fragment
+cache cleared before every render (cold) and then with every card
+already cached (warm).
+
+Usage:
+    python -m benchmarks.fragment_cache [--projects 1000] [--repeat 10]
+"""
+import argparse
+import json
+
+from benchmarks import setup_django, summarize, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser, User
+    from django.core.cache import cache
+    from django.template.loader import render_to_string
+    from projects.models import Project
+
+    Project.objects.bulk_create(
+        Project(
+            title=f"Benchmark Project {i}",
+            description="A project used to benchmark card rendering. " * 5,
+            link=f"https://example.com/{i}",
+        )
+        for i in range(args.projects)
+    )
+    projects = list(Project.objects.all())
+    visitors = {
+        'anonymous': AnonymousUser(),
+        'authenticated': User(username='bench', is_staff=True),
+    }
+
+    results = {'projects': args.projects, 'repeat': args.repeat, 'renders': {}}
+    for label, user in visitors.items():
+        context = {
+            'projects': projects,
+            'user': user,
+            'card_cache_timeout': settings.PROJECT_CARD_CACHE_TIMEOUT,
+        }
+
+        def render():
+            render_to_string('projects/project_index.html', context)
+
+        def render_cold():
+            cache.clear()
+            render()
+
+        render()  # Compile the templates before timing anything.
+        cold = summarize(timed(render_cold, args.repeat))
+        render()  # Fill the cache.
+        warm = summarize(timed(render, args.repeat))
+        results['renders'][label] = {
+            'cold': cold,
+            'warm': warm,
+            'speedup': round(cold['median_ms'] / warm['median_ms'], 2),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
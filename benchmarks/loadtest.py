@@ -0,0 +1,291 @@
+"""
+Benchmark: HTTP load test replaying a realistic mix of site traffic.
+
+Seeds N projects (unless --url points at a running site), starts the
+site under gunicorn with gunicorn.conf.py, and replays a weighted,
+seeded-random mix of requests from concurrent workers:
+
+    /                          project index
+    /projects/<pk>/            project detail
+    /technologies/<name>/      technology page
+    /api/projects/             API list
+    POST /contact/             contact form (with a CSRF token)
+
+Reports requests/s, p50/p95/p99 latency and SQL queries per request
+(read from the Server-Timing header), overall and per endpoint, as JSON
+that `python -m benchmarks.compare` can diff between commits.
+
+Usage:
+    python -m benchmarks.loadtest [--projects 200] [--requests 2000]
+        [--concurrency 8] [--mode wsgi|asgi] [--workers 2]
+        [--database-url postgres://...] [--url http://host:port]
+        [--output results.json]
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import re
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from urllib.parse import quote, urlencode, urlsplit
+
+from benchmarks import percentile, setup_django
+from benchmarks.server import GunicornServer
+
+# Endpoint -> relative weight in the traffic mix.
+MIX = {
+    'index': 30,
+    'project_detail': 30,
+    'technology_detail': 15,
+    'api_list': 20,
+    'contact': 5,
+}
+TECHNOLOGIES = 8
+CATEGORIES = 4
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100, help='requests sent before measuring')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mode', choices=['wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8732)
+    parser.add_argument('--database-url', help='default: a throwaway SQLite database')
+    parser.add_argument('--url', help='load-test an already running site instead')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON results to this file')
+    args = parser.parse_args()
+
+    if args.url:
+        results = run(args.url, args)
+    else:
+        database_url = setup_django(args.database_url)
+        seed(args.projects, args.seed)
+        server = GunicornServer(
+            port=args.port, workers=args.workers, env={'SERVER_MODE': args.mode},
+        )
+        with server:
+            results = run(server.url, args)
+        results['database'] = urlsplit(database_url).scheme
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+def seed(count, seed):
+    """
+    Creates `count` synthetic projects, each in a category and using a
+    few technologies, through the ORM so counts and related projects
+    are maintained as on the live site.
+    """
+    from projects.models import Category, Project, Technology
+
+    rng = random.Random(seed)
+    technologies = [Technology.objects.create(name=f"Technology {i}") for i in range(TECHNOLOGIES)]
+    categories = [Category.objects.create(name=f"Category {i}") for i in range(CATEGORIES)]
+    for i in range(count):
+        project = Project.objects.create(
+            title=f"Load Test Project {i}",
+            description="A synthetic project for the load test. " * 5,
+            category=rng.choice(categories),
+            link=f"https://example.com/projects/{i}",
+        )
+        project.technologies.set(rng.sample(technologies, rng.randint(1, 3)))
+
+
+def run(base_url, args):
+    """Discovers targets, warms the site up and runs the measured load."""
+    targets = discover(base_url)
+    rng = random.Random(args.seed)
+    endpoints = list(MIX)
+    plan = rng.choices(endpoints, weights=[MIX[name] for name in endpoints], k=args.warmup + args.requests)
+
+    replay(base_url, targets, plan[:args.warmup], args.concurrency, args.seed)
+    started = time.perf_counter()
+    samples = replay(base_url, targets, plan[args.warmup:], args.concurrency, args.seed)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {
+            'projects': len(targets['projects']),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'mode': None if args.url else args.mode,
+            'workers': None if args.url else args.workers,
+            'seed': args.seed,
+            'mix': MIX,
+        },
+        'elapsed_s': round(elapsed, 3),
+        'overall': summarize_samples(samples, elapsed),
+        'endpoints': {
+            name: summarize_samples([sample for sample in samples if sample['endpoint'] == name], elapsed)
+            for name in endpoints
+        },
+    }
+
+
+def discover(base_url):
+    """Lists the project pks and technology names to request, via the API."""
+    client = Client(base_url)
+    projects = []
+    path = '/api/projects/?page_size=100'
+    while path:
+        data = json.loads(client.request('GET', path)[2])
+        projects += [project['id'] for project in data['results']]
+        path = data['next'] and _path(data['next'])
+    technologies = [technology['name'] for technology in json.loads(client.request('GET', '/api/technologies/')[2])]
+    if not projects or not technologies:
+        raise SystemExit('The site has no projects or technologies to request.')
+    return {'projects': projects, 'technologies': technologies}
+
+
+def replay(base_url, targets, plan, concurrency, seed):
+    """Sends the planned requests from `concurrency` threads. Returns the samples."""
+    samples = []
+    lock = threading.Lock()
+    plan = iter(enumerate(plan))
+
+    def worker(number):
+        client = Client(base_url)
+        rng = random.Random(f'{seed}-{number}')
+        while True:
+            with lock:
+                item = next(plan, None)
+            if item is None:
+                return
+            index, endpoint = item
+            sample = send(client, endpoint, targets, rng, index)
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def send(client, endpoint, targets, rng, index):
+    """Sends one request of the given kind and measures it."""
+    if endpoint == 'contact':
+        # Each POST first needs the form's CSRF cookie and token.
+        if not client.csrf_token:
+            client.request('GET', '/contact/')
+        body = urlencode({
+            'csrfmiddlewaretoken': client.csrf_token,
+            'name': 'Load Test',
+            'email': 'loadtest@example.com',
+            'subject': f'Load test {index}',
+            'message': 'Sent by benchmarks.loadtest.',
+        })
+        method, path = 'POST', '/contact/'
+    else:
+        method, body = 'GET', None
+        path = {
+            'index': lambda: '/',
+            'project_detail': lambda: f"/projects/{rng.choice(targets['projects'])}/",
+            'technology_detail': lambda: f"/technologies/{quote(rng.choice(targets['technologies']))}/",
+            'api_list': lambda: '/api/projects/',
+        }[endpoint]()
+
+    start = time.perf_counter()
+    try:
+        status, headers, _ = client.request(method, path, body)
+    except (OSError, http.client.HTTPException):
+        status, headers = None, {}
+    latency = time.perf_counter() - start
+
+    match = SERVER_TIMING_QUERIES.search(headers.get('server-timing', ''))
+    return {
+        'endpoint': endpoint,
+        'ok': status is not None and status < 400,
+        'latency': latency,
+        'queries': int(match.group(1)) if match else None,
+    }
+
+
+def summarize_samples(samples, elapsed):
+    ok = [sample for sample in samples if sample['ok']]
+    latencies = [sample['latency'] for sample in ok]
+    queries = [sample['queries'] for sample in ok if sample['queries'] is not None]
+    summary = {
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'req_per_s': round(len(ok) / elapsed, 1),
+    }
+    if latencies:
+        summary.update({
+            f'p{pct}_ms': round(percentile(latencies, pct) * 1000, 2) for pct in (50, 95, 99)
+        })
+    if queries:
+        summary['queries_per_request'] = round(sum(queries) / len(queries), 2)
+    return summary
+
+
+class Client:
+    """A keep-alive HTTP connection that keeps the cookies it is sent."""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        self.host = url.netloc
+        self.cookies = SimpleCookie()
+
+    @property
+    def csrf_token(self):
+        cookie = self.cookies.get('csrftoken')
+        return cookie.value if cookie else None
+
+    def request(self, method, path, body=None):
+        headers = {'Host': self.host}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={morsel.value}' for key, morsel in self.cookies.items())
+        if body is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['Referer'] = f'http://{self.host}/contact/'
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+        except (OSError, http.client.HTTPException):
+            # The server closed the kept-alive connection: retry once.
+            self.connection.close()
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+        content = response.read()
+        for value in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(value)
+        return response.status, {key.lower(): value for key, value in response.getheaders()}, content
+
+
+def _path(url):
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Runs the site under a real gunicorn server for HTTP benchmarks.
+
+The server is started from the repository root, so gunicorn.conf.py
+applies unless the arguments override it, and it inherits the
+benchmark's DATABASE_URL and settings environment (see `setup_django`).
+The rate limits are raised out of reach, so a load test measures the
+site rather than 429 responses; pass `env` to benchmark them instead.
+"""
+import http.client
+import os
+import subprocess
+import sys
+import time
+
+HOST = '127.0.0.1'
+# One load-test client would exhaust the default rates within seconds.
+UNTHROTTLED = {
+    f'THROTTLE_RATE_{scope}': '1000000/s' for scope in ('ANON', 'USER', 'WRITE', 'CONTACT')
+}
+
+
+class GunicornServer:
+    """Context manager running `gunicorn <args>` on HOST:port until exit."""
+
+    def __init__(self, args=(), port=8731, workers=1, env=None):
+        self.port = port
+        self.url = f'http://{HOST}:{port}'
+        self.command = [
+            sys.executable, '-m', 'gunicorn', *args,
+            '--bind', f'{HOST}:{port}',
+            '--workers', str(workers),
+            '--log-level', 'warning',
+        ]
+        self.env = {**os.environ, **UNTHROTTLED, **(env or {})}
+        self.env.pop('ASYNC_VIEWS', None)
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                get(self.port, '/')
+                return self
+            except OSError:
+                if self.process.poll() is not None:
+                    break
+                time.sleep(0.2)
+        self.process.kill()
+        raise RuntimeError(f'Server did not start: {" ".join(self.command)}')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def get(port, path, timeout=30):
+    """Sends one GET request to HOST:port and returns the status code."""
+    connection = http.client.HTTPConnection(HOST, port, timeout=timeout)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
@@ -0,0 +1,27 @@
+"""
+Settings for benchmarking with a slow database.
+
+The regular settings, plus a fixed delay of BENCHMARK_QUERY_DELAY
+seconds added to every SQL query, to mimic a remote or busy database
+server with a local SQLite file.
+"""
+import os
+import time
+
+from django.db.backends.signals import connection_created
+
+from portfolio_project.settings import *  # noqa: F401,F403
+
+BENCHMARK_QUERY_DELAY = float(os.environ.get('BENCHMARK_QUERY_DELAY', '0.05'))
+
+
+def _delay(execute, sql, params, many, context):
+    time.sleep(BENCHMARK_QUERY_DELAY)
+    return execute(sql, params, many, context)
+
+
+def _slow_down(sender, connection, **kwargs):
+    connection.execute_wrappers.insert(0, _delay)
+
+
+connection_created.connect(_slow_down)
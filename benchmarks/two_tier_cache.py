@@ -0,0 +1,154 @@
+"""
+Benchmark: the two-tier cache against the plain backends.
+
+Times, per operation, a `get` of a cached key, a `get_many` of a page of
+keys (as the API representation cache does) and a `set`, on:
+
+- the per-process memory cache (not shared by workers),
+- the file and database caches (shared),
+- the two-tier cache in front of each shared one (see
+  'projects/cache_backends.py').
+
+It also reports the local tier's hit rate under a mixed workload: a few
+workers serving random reads and writes of the same keys, with the given
+share of writes. Each write clears every worker's local tier; workers
+check the generation before every read, as they do once per
+GENERATION_CHECK_INTERVAL, so this is the hit rate when writes are at
+least that far apart.
+
+Usage:
+    python -m benchmarks.two_tier_cache [--ops 2000] [--keys 1000] [--repeat 5]
+        [--workers 4] [--write-ratios 0,0.001,0.01,0.1]
+"""
+import argparse
+import json
+import random
+import tempfile
+
+from benchmarks import setup_django, summarize, timed
+
+VALUE = {'id': 1, 'title': "Benchmark Project", 'description': "A cached representation. " * 10}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ops', type=int, default=2000, help="Operations per timed run.")
+    parser.add_argument('--keys', type=int, default=1000, help="Distinct keys read.")
+    parser.add_argument('--page', type=int, default=20, help="Keys per get_many.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4, help="Workers in the mixed workload.")
+    parser.add_argument(
+        '--write-ratios', default='0,0.001,0.01,0.1',
+        help="Comma-separated shares of writes in the mixed workload.",
+    )
+    args = parser.parse_args()
+    write_ratios = [float(ratio) for ratio in args.write_ratios.split(',')]
+
+    database_url = setup_django()
+
+    from django.core.cache import caches
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+
+    from projects.cache_backends import TwoTierCache
+
+    def two_tier(shared):
+        return {
+            'BACKEND': 'projects.cache_backends.TwoTierCache',
+            'LOCATION': f'bench-{shared}',
+            'OPTIONS': {'SHARED': shared, 'MAX_ENTRIES': args.keys * 2},
+        }
+
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': args.keys * 2},
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tempfile.mkdtemp(prefix='portfolio-bench-cache-'),
+            'OPTIONS': {'MAX_ENTRIES': args.keys * 10},
+        },
+        'database': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'bench_cache',
+            'OPTIONS': {'MAX_ENTRIES': args.keys * 10},
+        },
+        'two-tier over file': two_tier('file'),
+        'two-tier over database': two_tier('database'),
+    }
+    keys = [f'bench:{number}' for number in range(args.keys)]
+
+    def per_op(timings, ops):
+        # summarize() reports milliseconds per run: turn them into microseconds per operation.
+        return {name.replace('_ms', '_us'): round(value * 1000 / ops, 2) for name, value in summarize(timings).items()}
+
+    results = {'database': database_url.split(':', 1)[0], 'ops': args.ops, 'keys': args.keys, 'backends': {}}
+    with override_settings(CACHES={'default': backends['locmem'], **backends}):
+        call_command('createcachetable', verbosity=0)
+        for name in backends:
+            cache = caches[name]
+            cache.set_many({key: VALUE for key in keys})
+            state = {'next': 0}
+
+            def cycle(count):
+                start = state['next']
+                state['next'] = (start + count) % args.keys
+                return [keys[(start + offset) % args.keys] for offset in range(count)]
+
+            def get():
+                for key in cycle(args.ops):
+                    cache.get(key)
+
+            def get_many():
+                for _ in range(args.ops // args.page):
+                    cache.get_many(cycle(args.page))
+
+            def set_():
+                for key in cycle(args.ops):
+                    cache.set(key, VALUE)
+
+            get()  # Warm the local tier of the two-tier caches.
+            results['backends'][name] = {
+                'get': per_op(timed(get, args.repeat), args.ops),
+                f'get_many({args.page})': per_op(timed(get_many, args.repeat), args.ops // args.page),
+                'set': per_op(timed(set_, args.repeat), args.ops),
+            }
+            if hasattr(cache, 'stats'):
+                results['backends'][name]['local_tier'] = cache.stats()
+
+        results['mixed_hit_rate'] = {
+            str(ratio): mixed_hit_rate(TwoTierCache, 'file', keys, ratio, args) for ratio in write_ratios
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+def mixed_hit_rate(backend, shared, keys, write_ratio, args):
+    """Local tier hit rate of `args.workers` workers serving random reads and writes."""
+    workers = [
+        backend(f'bench-mixed-{write_ratio}-{number}', {'OPTIONS': {
+            'SHARED': shared, 'MAX_ENTRIES': args.keys * 2, 'GENERATION_CHECK_INTERVAL': 0,
+        }})
+        for number in range(args.workers)
+    ]
+    for worker in workers:
+        worker.get_many(keys)  # Warm every local tier.
+    before = [worker.stats() for worker in workers]
+
+    rng = random.Random(0)
+    for op in range(args.ops * args.repeat):
+        worker = workers[op % len(workers)]
+        key = rng.choice(keys)
+        if rng.random() < write_ratio:
+            worker.set(key, VALUE)
+        else:
+            worker.get(key)
+
+    hits = sum(worker.stats()['hits'] - start['hits'] for worker, start in zip(workers, before))
+    misses = sum(worker.stats()['misses'] - start['misses'] for worker, start in zip(workers, before))
+    return round(hits / (hits + misses), 4)
+
+
+if __name__ == '__main__':
+    main()
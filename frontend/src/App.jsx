@@ -5,7 +5,7 @@ import './App.css'
 
 function App() {
 
-  const { projects, isLoading, error, refresh } = useProjects();
+  const { projects, isLoading, isLoadingMore, error, hasMore, loadMore, refresh } = useProjects();
   
   if (isLoading) {
     return (
@@ -31,6 +31,11 @@ function App() {
         ))}
       </div>
       <div style={{ marginTop: '20px', textAlign: 'center' }}>
+        {hasMore && (
+          <button onClick={loadMore} disabled={isLoadingMore} className="btn-refresh">
+            {isLoadingMore ? '🌀 Loading...' : '⬇️ Load More'}
+          </button>
+        )}
         <button onClick={refresh} className="btn-refresh">
           🔄 Refresh Data
         </button>
@@ -4,22 +4,31 @@ const API_BASE_URL = import.meta.env.VITE_API_URL;
 
 function useProjects() {
   const [projects, setProjects] = useState([]);
+  const [nextUrl, setNextUrl] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
-  // 1. Define the fetch logic as a standalone function
+  // The API is cursor-paginated: each page returns { next, results },
+  // where 'next' is the full URL of the following page (or null).
+  const fetchPage = async (url) => {
+    const response = await fetch(url);
+
+    if (!response.ok) {
+      throw new Error(`API call failed with status: ${response.status}`);
+    }
+
+    return response.json();
+  };
+
+  // 1. Define the fetch logic as a standalone function (first page only)
   const fetchProjects = async () => {
     setIsLoading(true); // Show loading spinner again while refreshing
     setError(null);     // Clear any old errors
     try {
-      const response = await fetch(`${API_BASE_URL}/api/projects/`);
-      
-      if (!response.ok) {
-        throw new Error(`API call failed with status: ${response.status}`);
-      }
-      
-      const data = await response.json();
-      setProjects(data);
+      const data = await fetchPage(`${API_BASE_URL}/api/projects/`);
+      setProjects(data.results);
+      setNextUrl(data.next);
     } catch (err) {
       console.error('Error fetching data:', err);
       setError(err.message || 'Could not connect to the backend server.');
@@ -28,13 +37,39 @@ function useProjects() {
     }
   };
 
-  // 2. Use useEffect to call it ONCE when the component mounts
+  // 2. Follow the 'next' cursor and append the following page
+  const loadMore = async () => {
+    if (!nextUrl || isLoadingMore) {
+      return;
+    }
+    setIsLoadingMore(true);
+    try {
+      const data = await fetchPage(nextUrl);
+      setProjects(current => [...current, ...data.results]);
+      setNextUrl(data.next);
+    } catch (err) {
+      console.error('Error fetching data:', err);
+      setError(err.message || 'Could not connect to the backend server.');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  // 3. Use useEffect to call it ONCE when the component mounts
   useEffect(() => {
     fetchProjects();
   }, []);
 
-  // 3. Return the function as 'refresh' so App.jsx can use it
-  return { projects, isLoading, error, refresh: fetchProjects };
+  // 4. Return the functions so App.jsx can refresh or page through results
+  return {
+    projects,
+    isLoading,
+    isLoadingMore,
+    error,
+    hasMore: nextUrl !== null,
+    loadMore,
+    refresh: fetchProjects,
+  };
 }
 
-export default useProjects;
\ No newline at end of file
+export default useProjects;
@@ -0,0 +1,79 @@
+"""
+Gunicorn configuration for the portfolio project.
+
+Picked up automatically when `gunicorn` is started from the repository
+root (see Dockerfile, run.sh and docker-compose.yml). Every value can be
+tuned with an environment variable:
+
+    SERVER_MODE        'wsgi' (default): sync views, threaded workers;
+                       'asgi': async views, Uvicorn workers.
+    PORT               Port to listen on (default 8000).
+    WEB_CONCURRENCY    Worker processes (default: 2 x CPUs + 1 for WSGI,
+                       one per CPU for ASGI, at most MAX_DEFAULT_WORKERS).
+                       CPUs are those this process may run on; a
+                       container's CPU quota is not visible, so set it
+                       there.
+    GUNICORN_THREADS   Threads per WSGI worker (default 4).
+    GUNICORN_TIMEOUT   Seconds before a silent worker is restarted (default 30).
+    GUNICORN_MAX_REQUESTS
+                       Requests before a worker is recycled (default 1000).
+
+The application is preloaded in the master process and warmed up there
+(see portfolio_project/warmup.py), so workers fork with the code
+imported, the URL resolver built and the templates compiled.
+"""
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+try:
+    CPUS = len(os.sched_getaffinity(0))
+except AttributeError:  # Not available on macOS or Windows.
+    CPUS = os.cpu_count() or 1
+# Every worker thread may hold a database connection: a large host must
+# not exhaust the database's by default.
+MAX_DEFAULT_WORKERS = 8
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'portfolio_project.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(CPUS, MAX_DEFAULT_WORKERS)))
+else:
+    wsgi_app = 'portfolio_project.wsgi:application'
+    # Threads keep a worker serving while another request waits on I/O.
+    worker_class = 'gthread'
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(CPUS * 2 + 1, MAX_DEFAULT_WORKERS)))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycling a worker only costs a fork of the warm master.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded application is imported and
+    # before any worker is forked.
+    if server.cfg.preload_app:
+        _warm_up(server.log)
+
+
+def post_worker_init(worker):
+    # Without preloading, each worker loads and warms its own copy.
+    if not worker.cfg.preload_app:
+        _warm_up(worker.log)
+
+
+def _warm_up(log):
+    from portfolio_project.warmup import warm_up
+
+    log.info('Warm-up: %s', warm_up())
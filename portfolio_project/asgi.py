@@ -2,9 +2,11 @@
 ASGI config for the portfolio_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
-This file is the entry point for ASGI-compatible web servers and enables
-asynchronous features (which are not used in this project but are
-supported by default).
+This file is the entry point for ASGI-compatible web servers. It turns on
+ASYNC_VIEWS, so project pages and API reads are served by the native
+async views in 'projects/async_views.py'. Run it with, e.g.:
+
+    SERVER_MODE=asgi gunicorn  # see gunicorn.conf.py
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,5 +15,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,25 @@
+"""
+URL configuration used when ASYNC_VIEWS is enabled (ASGI deployments).
+
+Identical to 'urls.py', except that project pages and JSON reads of the
+projects API are served by the async views in 'projects/async_views.py'.
+"""
+from django.contrib import admin
+from django.urls import path, include
+from django.conf import settings
+from django.conf.urls.static import static
+from projects import async_views, views as project_views
+from .urls import router
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    # Listed before the router, so these take its list and detail routes.
+    path('api/projects/', async_views.project_api_list, name='project-list'),
+    path('api/projects/<int:pk>/', async_views.project_api_detail, name='project-detail'),
+    path('api/facets/', project_views.facet_counts, name='facets'),
+    path('api/', include(router.urls)),
+    path('', include('projects.async_urls')),
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -4,6 +4,7 @@ Django settings for portfolio_project project.
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -36,8 +37,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'projects.middleware.QueryInstrumentationMiddleware',
+    'projects.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'projects.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -47,7 +50,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'portfolio_project.urls'
+# Serve pages and API reads with native async views. Set by asgi.py, so
+# it is on whenever the site runs under an ASGI server (e.g. uvicorn).
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+ROOT_URLCONF = 'portfolio_project.async_urls' if ASYNC_VIEWS else 'portfolio_project.urls'
 
 TEMPLATES = [
     {
@@ -118,7 +125,7 @@ if DEBUG:
 
     STORAGES = {
         "default": {
-            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "BACKEND": "projects.storage.PresignedFileSystemStorage",
         },
         "staticfiles": {
             "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
@@ -167,7 +174,7 @@ else:
 
     STORAGES = {
         "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "BACKEND": "projects.storage.PresignedS3Storage",
         },
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -189,6 +196,28 @@ else:
     EMAIL_TIMEOUT = 10
 
 
+# --- ASGI Database Connections ---
+# Under ASGI every request's queries run in their own short-lived
+# thread, so a persistent connection would never be reused. Close
+# connections at the end of each request instead.
+if ASYNC_VIEWS:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# --- Direct Image Uploads ---
+# Project images are uploaded straight to storage with a presigned POST
+# (see projects/uploads.py). Limits for each upload:
+PROJECT_IMAGE_MAX_UPLOAD_SIZE = int(os.environ.get('PROJECT_IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+PROJECT_IMAGE_UPLOAD_EXPIRY = 10 * 60
+
+# --- Email Outbox ---
+# Contact messages are queued and sent by `manage.py process_outbox`.
+# Failed sends are retried after OUTBOX_RETRY_BASE_SECONDS * 2^(attempt-1)
+# seconds (capped), up to OUTBOX_MAX_ATTEMPTS attempts.
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 60 * 60
+OUTBOX_LEASE_SECONDS = 5 * 60
+
 # --- Default Auto Field ---
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -200,7 +229,149 @@ REST_FRAMEWORK = {
 
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+
+    # Same JSON as DRF's JSONRenderer, encoded with orjson.
+    'DEFAULT_RENDERER_CLASSES': [
+        'projects.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    # Token buckets per IP address or user (see projects/throttling.py).
+    # The contact rate limits the plain Django contact view.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'projects.throttling.AnonTokenBucketThrottle',
+        'projects.throttling.UserTokenBucketThrottle',
+        'projects.throttling.WriteTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.environ.get('THROTTLE_RATE_ANON', '120/min'),
+        'user': os.environ.get('THROTTLE_RATE_USER', '600/min'),
+        'write': os.environ.get('THROTTLE_RATE_WRITE', '60/min'),
+        'contact': os.environ.get('THROTTLE_RATE_CONTACT', '5/hour'),
+    },
+    # Number of proxies in front of the app, so the client IP address is
+    # read from X-Forwarded-For (e.g. 1 behind one load balancer). 0, as
+    # docker-compose serves gunicorn directly: a client-supplied header
+    # must never pick the rate limit bucket.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# --- Caching ---
+# A per-process LRU (see projects/cache_backends.py) in front of a cache
+# shared by every worker: a file cache on the host by default, or any
+# other backend (e.g. Redis, when the site runs on several hosts).
+# MAX_ENTRIES is raised from Django's default of 300 so that a full page
+# of cached project cards is not culled from the local tier.
+CACHES = {
+    'default': {
+        'BACKEND': 'projects.cache_backends.TwoTierCache',
+        'LOCATION': 'default',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+            # Seconds a local copy is kept, and how often each worker
+            # checks whether another one wrote to the shared tier.
+            'LOCAL_TIMEOUT': float(os.environ.get('CACHE_LOCAL_TIMEOUT', 5)),
+            'GENERATION_CHECK_INTERVAL': float(os.environ.get('CACHE_GENERATION_CHECK_INTERVAL', 1)),
+        },
+    },
+    'shared': {
+        'BACKEND': os.environ.get(
+            'CACHE_SHARED_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'CACHE_SHARED_LOCATION', os.path.join(tempfile.gettempdir(), 'portfolio_project_cache'),
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_SHARED_MAX_ENTRIES', 100000)),
+        },
+    },
+    # Rate limit buckets (see projects/throttling.py), which need atomic
+    # add/incr shared by every worker: Redis. Without THROTTLE_REDIS_URL
+    # each worker process keeps its own buckets, so a client may make up
+    # to WEB_CONCURRENCY times the configured rates.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['THROTTLE_REDIS_URL'],
+    } if os.environ.get('THROTTLE_REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('THROTTLE_CACHE_MAX_ENTRIES', 100000)),
+        },
+    },
+}
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+# --- Projects API Representation Cache ---
+# Cache alias and lifetime (seconds) of the serialized projects API
+# responses. Entries are also invalidated on every relevant model change.
+PROJECTS_API_CACHE_ALIAS = 'default'
+PROJECTS_API_CACHE_TIMEOUT = int(os.environ.get('PROJECTS_API_CACHE_TIMEOUT', 60 * 60))
+
+# --- Projects API Batch Writes ---
+# Maximum number of projects in one request to /api/projects/bulk/.
+PROJECTS_BULK_MAX_ITEMS = int(os.environ.get('PROJECTS_BULK_MAX_ITEMS', 1000))
+
+# --- Projects Export ---
+# Projects fetched (with their technologies) per chunk by the streaming
+# export endpoint and `manage.py export_projects`.
+PROJECTS_EXPORT_CHUNK_SIZE = int(os.environ.get('PROJECTS_EXPORT_CHUNK_SIZE', 2000))
+
+# --- Related Projects ---
+# Number of related projects precomputed and shown for each project.
+RELATED_PROJECTS_COUNT = int(os.environ.get('RELATED_PROJECTS_COUNT', 4))
+
+# --- Projects Import ---
+# Records upserted per transaction by `manage.py import_projects`.
+PROJECTS_IMPORT_CHUNK_SIZE = int(os.environ.get('PROJECTS_IMPORT_CHUNK_SIZE', 2000))
+
+# --- Response Compression ---
+# Dynamic responses of at least COMPRESSION_MIN_SIZE bytes are sent with
+# Brotli or gzip (see projects/compression.py). Compressed bodies of
+# responses with an ETag are cached by content hash in this cache alias.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 512))
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 60 * 60
+
+# --- Template Fragment Cache ---
+# Lifetime (seconds) of each cached project card. Cards are keyed on the
+# project's pk and updated_at, so edits never serve a stale card.
+PROJECT_CARD_CACHE_TIMEOUT = int(os.environ.get('PROJECT_CARD_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# --- Query Budgets ---
+# Maximum number of SQL queries per GET request, by URL name. Requests over
+# budget are logged, or raise QueryBudgetExceeded when the action is
+# 'raise' (as it is in the test suite). Budgets include the two session
+# and user queries of authenticated requests.
+QUERY_BUDGETS = {
+    'projects:project_index': 4,
+    'projects:project_detail': 6,
+    'projects:technology_detail': 5,
+    'project-list': 5,
+    'project-detail': 5,
+    'facets': 3,
+}
+QUERY_BUDGET_ACTION = os.environ.get('QUERY_BUDGET_ACTION', 'log')
+
+# --- Logging ---
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'projects': {
+            'handlers': ['console'],
+            'level': os.environ.get('PROJECTS_LOG_LEVEL', 'INFO'),
+        },
+    },
 }
 
 # --- CORS Configuration ---
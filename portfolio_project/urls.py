@@ -13,6 +13,7 @@ router.register(r'projects', project_views.ProjectViewSet, basename='project')
 router.register(r'technologies', project_views.TechnologyViewSet, basename='technology')
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/facets/', project_views.facet_counts, name='facets'),
     path('api/', include(router.urls)),
     # Include all URLs from the 'projects' app
     path('', include('projects.urls')), 
@@ -5,7 +5,8 @@ This file registers models with the Django admin interface and
 defines custom ModelAdmin classes to improve the admin experience.
 """
 from django.contrib import admin
-from .models import Project, Technology, Category
+from .models import Project, Technology, Category, OutboundEmail
+from .search import search_projects
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
@@ -15,12 +16,29 @@ class ProjectAdmin(admin.ModelAdmin):
     # Columns to display in the admin list view
     list_display = ('title', 'link', 'created_at', 'category',)
 
-    # Fields to include in the admin search bar
+    # Enables the admin search bar; lookups go through the full-text index
+    # (see get_search_results) rather than LIKE scans over these fields.
     search_fields = ('title', 'description',)
 
     # Use a horizontal filter widget for the ManyToMany 'technologies' field
     filter_horizontal = ('technologies',)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Answers admin searches from the full-text index."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return search_projects(queryset, search_term), False
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """
+    Shows the email outbox, so failed deliveries can be inspected.
+    """
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at',)
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at',)
+
 # Register the other models with the default admin interface
 admin.site.register(Technology)
 admin.site.register(Category)
\ No newline at end of file
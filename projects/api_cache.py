@@ -0,0 +1,200 @@
+"""
+Cache of serialized API representations for the 'projects' app.
+
+Projects change rarely but are read constantly, so the API keeps:
+
+- one cached representation per project, keyed by primary key, and
+- one cached envelope per list URL (page, cursor, search query), keyed by
+  a "list generation" number that is bumped whenever any project changes.
+
+Entries are invalidated precisely by the receivers in 'signals.py'.
+Hit/miss counters are kept in memory by each worker process, so reads
+never write to the shared cache; see `stats()`.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+KEY_PREFIX = 'projects:api'
+LIST_GENERATION_KEY = f'{KEY_PREFIX}:list-generation'
+KINDS = ('project', 'list')
+
+# Per thread: the pks to invalidate when the current transaction commits.
+_pending = threading.local()
+
+# This process's hit/miss counts, keyed by (kind, outcome).
+_counts = dict.fromkeys(((kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')), 0)
+_counts_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.PROJECTS_API_CACHE_ALIAS]
+
+
+def _timeout():
+    return settings.PROJECTS_API_CACHE_TIMEOUT
+
+
+def _project_key(pk):
+    return f'{KEY_PREFIX}:project:{pk}'
+
+
+def _list_key(request):
+    url = request.build_absolute_uri()
+    digest = hashlib.md5(url.encode('utf-8'), usedforsecurity=False).hexdigest()
+    return f'{KEY_PREFIX}:list:{_list_generation()}:{digest}'
+
+
+def _base_url(request):
+    # Representations embed absolute URLs, so they are only valid for the
+    # scheme and host they were rendered for.
+    return request.build_absolute_uri('/')
+
+
+def _list_generation():
+    cache = _cache()
+    generation = cache.get(LIST_GENERATION_KEY)
+    if generation is None:
+        cache.add(LIST_GENERATION_KEY, _new_generation(), None)
+        generation = cache.get(LIST_GENERATION_KEY)
+    return generation
+
+
+def _new_generation():
+    # Millisecond clock, so a generation lost to eviction never restarts
+    # at a number whose list entries could still be cached.
+    return int(time.time() * 1000)
+
+
+# --- Reads and writes ---
+
+def get_projects(pks, request):
+    """Returns a {pk: representation} dict of the cached projects among `pks`."""
+    base_url = _base_url(request)
+    entries = _cache().get_many([_project_key(pk) for pk in pks])
+    found = {}
+    for pk in pks:
+        entry = entries.get(_project_key(pk))
+        if entry is not None and entry['base_url'] == base_url:
+            found[pk] = entry['data']
+    _record('project', hits=len(found), misses=len(pks) - len(found))
+    return found
+
+
+def set_projects(representations, request):
+    """Caches a {pk: representation} dict."""
+    base_url = _base_url(request)
+    _cache().set_many(
+        {
+            _project_key(pk): {'base_url': base_url, 'data': data}
+            for pk, data in representations.items()
+        },
+        _timeout(),
+    )
+
+
+def get_list(request):
+    """Returns the cached list envelope for this request URL, or None."""
+    data = _cache().get(_list_key(request))
+    _record('list', hits=int(data is not None), misses=int(data is None))
+    return data
+
+
+def set_list(request, data):
+    _cache().set(_list_key(request), data, _timeout())
+
+
+def represent(projects, request, serialize):
+    """
+    Returns the representations of `projects` (model instances or
+    `values()` rows), in order, reusing cached ones and calling
+    `serialize(missing)` (returning a list) only for the cache misses,
+    which are then cached.
+    """
+    pks = [_pk(project) for project in projects]
+    cached = get_projects(pks, request)
+    missing = [project for project, pk in zip(projects, pks) if pk not in cached]
+    if missing:
+        fresh = dict(zip((_pk(project) for project in missing), serialize(missing)))
+        set_projects(fresh, request)
+        cached.update(fresh)
+    return [cached[pk] for pk in pks]
+
+
+def _pk(project):
+    return project['id'] if isinstance(project, dict) else project.pk
+
+
+# --- Invalidation ---
+
+def invalidate_projects(pks):
+    """
+    Drops the cached representations of `pks` and every cached list once
+    the surrounding transaction commits (at once outside of one): before
+    then, a concurrent reader would cache the old state again.
+
+    The pks of every call in a transaction are dropped together, with one
+    `delete_many` and one bump of the list generation. Pass only projects
+    that existed before the transaction: new ones cannot be cached yet.
+    """
+    _pending.__dict__.setdefault('pks', set()).update(pks)
+    # One callback per call: the first to run takes every pending pk.
+    transaction.on_commit(_invalidate_pending)
+
+
+def _invalidate_pending():
+    pks = _pending.__dict__.pop('pks', None)
+    if pks is not None:
+        _invalidate(sorted(pks))
+
+
+def _invalidate(pks):
+    cache = _cache()
+    if pks:
+        cache.delete_many([_project_key(pk) for pk in pks])
+    try:
+        cache.incr(LIST_GENERATION_KEY)
+    except ValueError:
+        cache.set(LIST_GENERATION_KEY, _new_generation(), None)
+
+
+# --- Statistics ---
+
+def _record(kind, hits, misses):
+    with _counts_lock:
+        _counts[kind, 'hits'] += hits
+        _counts[kind, 'misses'] += misses
+
+
+def reset_stats():
+    """Zeroes this process's hit/miss counters."""
+    with _counts_lock:
+        for key in _counts:
+            _counts[key] = 0
+
+
+def stats():
+    """
+    Returns this worker's hit/miss counts and hit rate for each kind of
+    entry and, for a two-tier cache, the counters of its local tier.
+    """
+    with _counts_lock:
+        counts = dict(_counts)
+    result = {}
+    for kind in KINDS:
+        hits = counts[kind, 'hits']
+        misses = counts[kind, 'misses']
+        total = hits + misses
+        result[kind] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    cache = _cache()
+    if hasattr(cache, 'stats'):
+        result['local_tier'] = cache.stats()
+    return result
@@ -10,3 +10,7 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        # Connect the signal receivers that keep derived data in sync.
+        from . import signals  # noqa: F401
@@ -0,0 +1,21 @@
+"""
+URL patterns for the 'projects' app when served over ASGI.
+
+The same routes as 'urls.py', with the read-only pages served by the
+native async views in 'async_views.py'.
+"""
+from django.urls import path
+from . import async_views
+from .urls import app_name, urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'project_index': async_views.project_index,
+    'project_detail': async_views.project_detail,
+    'technology_detail': async_views.technology_detail,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,205 @@
+"""
+Async views for the 'projects' app.
+
+Native async counterparts of the read-only pages and API reads in
+'views.py', built on Django's async ORM (`aget`, `async for`,
+`aaggregate`). They are routed instead of the sync views when the site
+is served over ASGI (see 'async_urls.py' and portfolio_project/asgi.py),
+so a request waiting on the database or on a slow client does not hold
+a worker thread.
+
+Forms, writes and the admin stay synchronous; the API views delegate
+every method other than GET/HEAD to ProjectViewSet, and run its
+throttles on the reads they serve themselves.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.shortcuts import render
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotFound, Throttled, ValidationError
+from rest_framework.request import Request
+
+from . import api_cache, fieldsets, filters, related
+from .conditional import (
+    async_conditional_page, aproject_list_state, aproject_state, atechnology_state,
+)
+from .models import Project, Technology
+from .pagination import ProjectCursorPagination
+from .renderers import ORJSONRenderer
+from .representations import ProjectRows
+from .search import search_projects
+from .serializers import ProjectSerializer
+from .views import ProjectViewSet
+
+NOT_FOUND = 'No Project matches the given query.'
+
+sync_project_list = sync_to_async(ProjectViewSet.as_view({'get': 'list', 'post': 'create'}))
+sync_project_detail = sync_to_async(ProjectViewSet.as_view({
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}))
+
+# --- Pages ---
+
+@async_conditional_page(aproject_list_state, last_modified=False)
+async def project_index(request):
+    """Async version of `views.project_index`."""
+    try:
+        project_filters = filters.requested_filters(request.GET)
+    except ValidationError as exc:
+        return HttpResponseBadRequest(' '.join(exc.detail['match']))
+    queryset = filters.filter_projects(Project.objects.for_listing(), project_filters)
+    projects = [project async for project in queryset]
+    context = {
+        'projects': projects,
+        'filters': project_filters,
+        'card_cache_timeout': settings.PROJECT_CARD_CACHE_TIMEOUT,
+    }
+    return render(request, 'projects/project_index.html', context)
+
+@async_conditional_page(aproject_state)
+async def project_detail(request, pk):
+    """Async version of `views.project_detail`."""
+    try:
+        project = await Project.objects.for_detail().aget(pk=pk)
+    except Project.DoesNotExist:
+        raise Http404(NOT_FOUND)
+    context = {
+        'project': project,
+        'related_projects': await sync_to_async(related.related_projects)(project.pk),
+    }
+    return render(request, 'projects/project_detail.html', context)
+
+@async_conditional_page(atechnology_state, last_modified=False)
+async def technology_detail(request, name):
+    """Async version of `views.technology_detail`."""
+    try:
+        technology = await Technology.objects.aget(name=name)
+    except Technology.DoesNotExist:
+        raise Http404('No Technology matches the given query.')
+    projects = [project async for project in technology.project_set.for_listing()]
+    context = {
+        'technology': technology,
+        'projects': projects,
+        'card_cache_timeout': settings.PROJECT_CARD_CACHE_TIMEOUT,
+    }
+    return render(request, 'projects/technology_detail.html', context)
+
+# --- API reads ---
+
+@csrf_exempt
+async def project_api_list(request):
+    """
+    `GET /api/projects/`: the same keyset-paginated, searchable,
+    filterable and cached JSON list as `ProjectViewSet.list`.
+    """
+    if not _is_json_read(request):
+        return await sync_project_list(request)
+    return await _check_throttles(request) or await _project_api_list(request)
+
+@csrf_exempt
+async def project_api_detail(request, pk):
+    """`GET /api/projects/<pk>/`: the same cached JSON as `ProjectViewSet.retrieve`."""
+    if not _is_json_read(request):
+        return await sync_project_detail(request, pk=pk)
+    return await _check_throttles(request) or await _project_api_detail(request, pk)
+
+@async_conditional_page(aproject_list_state, last_modified=False)
+async def _project_api_list(request):
+    data = await sync_to_async(api_cache.get_list)(request)
+    if data is not None:
+        return _json_response(data)
+
+    try:
+        fields = fieldsets.requested_fields(request.GET)
+        project_filters = filters.requested_filters(request.GET)
+    except ValidationError as exc:
+        return _json_response(exc.detail, status=400)
+
+    drf_request = Request(request)
+    queryset = ProjectViewSet.queryset.all()
+    query = request.GET.get('q', '').strip()
+    if query:
+        queryset = search_projects(queryset, query)
+    queryset = filters.filter_projects(queryset, project_filters)
+    rows = ProjectRows(request, fields)
+    queryset = rows.values(fieldsets.restrict(queryset, fields))
+
+    paginator = ProjectCursorPagination()
+    try:
+        page_queryset = paginator.get_page_queryset(queryset, drf_request)
+    except NotFound as exc:
+        return _json_response({'detail': exc.detail}, status=404)
+    page = paginator.finish_page([row async for row in page_queryset])
+
+    data = {
+        'next': paginator.get_next_link(),
+        'results': await _represent(page, drf_request, fields, serialize=rows.represent),
+    }
+    await sync_to_async(api_cache.set_list)(request, data)
+    return _json_response(data)
+
+@async_conditional_page(aproject_state)
+async def _project_api_detail(request, pk):
+    try:
+        fields = fieldsets.requested_fields(request.GET)
+    except ValidationError as exc:
+        return _json_response(exc.detail, status=400)
+
+    if fields is None:
+        cached = await sync_to_async(api_cache.get_projects)([pk], request)
+        if pk in cached:
+            return _json_response(cached[pk])
+
+    try:
+        project = await fieldsets.restrict(ProjectViewSet.queryset, fields).aget(pk=pk)
+    except Project.DoesNotExist:
+        return _json_response({'detail': NOT_FOUND}, status=404)
+    data = (await _represent([project], Request(request), fields))[0]
+    return _json_response(data)
+
+async def _represent(projects, request, fields=None, serialize=None):
+    def serialize_instances(missing):
+        return ProjectSerializer(
+            missing, many=True, fields=fields, context={'request': request},
+        ).data
+    serialize = serialize or serialize_instances
+    if fields is not None:
+        # Sparse fieldsets bypass the cache of full representations.
+        return await sync_to_async(serialize)(projects)
+    return await sync_to_async(api_cache.represent)(projects, request, serialize)
+
+@sync_to_async
+def _check_throttles(request):
+    """
+    Runs ProjectViewSet's throttles, as its `initial()` does before a
+    read. Returns DRF's 429 response if one refuses the request.
+    """
+    view = ProjectViewSet()
+    try:
+        view.check_throttles(Request(request, authenticators=view.get_authenticators()))
+    except Throttled as exc:
+        response = _json_response({'detail': exc.detail}, status=429)
+        response['Retry-After'] = '%d' % exc.wait
+        return response
+    return None
+
+def _is_json_read(request):
+    # The browsable API (and `?format=`) is left to the DRF viewset.
+    return (
+        request.method in ('GET', 'HEAD')
+        and 'format' not in request.GET
+        and 'text/html' not in request.headers.get('Accept', '')
+    )
+
+def _json_response(data, status=200):
+    """Renders `data` exactly as the DRF viewset's JSON renderer does."""
+    response = HttpResponse(
+        ORJSONRenderer().render(data), status=status, content_type='application/json',
+    )
+    patch_vary_headers(response, ['Accept'])
+    return response
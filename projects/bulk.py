@@ -0,0 +1,298 @@
+"""
+Batch writes for the 'projects' app.
+
+Sync jobs create, update, upsert and delete projects in batches through
+`ProjectViewSet.bulk` instead of one request (and one transaction, one
+set of M2M adds and per-slug lookups) per project; `manage.py
+import_projects` upserts through the same functions. Each operation:
+
+- takes the items validated by BulkProjectSerializer,
+- resolves every technology and category name of the batch with one
+  query per model,
+- writes with `bulk_create` / `bulk_update` and bulk-inserts the
+  technology through rows,
+- runs in a single transaction: if any item is invalid, nothing is
+  written and BulkWriteError reports the errors of each item.
+
+Bulk writes send no `post_save` / `m2m_changed` signals, so every
+operation sends one `projects_bulk_changed` signal instead, whose
+receivers refresh the search index and the API cache (see 'signals.py'),
+recounts the facet counters of the technologies and categories it
+touched (see 'facets.py') and schedules the refresh of the related
+projects it affects (see 'related.py').
+"""
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from . import facets, related
+from .models import LISTED_FIELDS, Category, Project, Technology
+from .signals import bulk_write, projects_bulk_changed
+
+# Scalar fields written from an item, besides `category` and `technologies`.
+FIELDS = ('title', 'description', 'link')
+
+Through = Project.technologies.through
+_INSERT_THROUGH = 'INSERT INTO {} ({}, {}) VALUES (%s, %s)'.format(
+    Through._meta.db_table,
+    Through._meta.get_field('project').column,
+    Through._meta.get_field('technology').column,
+)
+
+
+class BulkWriteError(Exception):
+    """
+    Raised when items of a batch are invalid. `errors` holds one dict of
+    field errors per item, empty for the valid ones, like DRF's
+    `many=True` serializers.
+    """
+
+    def __init__(self, errors):
+        super().__init__('Invalid items in batch.')
+        self.errors = errors
+
+
+def create_projects(items, using=DEFAULT_DB_ALIAS):
+    """Creates one project per item. Returns [{'id', 'title', 'status'}]."""
+    with transaction.atomic(using=using):
+        errors = [{} for _ in items]
+        technologies, categories = _resolve(items, errors, using)
+        taken = Project.objects.using(using).filter(title__in=[item['title'] for item in items])
+        _check_titles(items, errors, set(taken.values_list('title', flat=True)))
+        _raise_for(errors)
+
+        projects = Project.objects.using(using).bulk_create(
+            _assign(Project(), item, categories) for item in items
+        )
+        touched = _set_technologies(projects, items, technologies, using)
+        facets.recount(touched, [project.category_id for project in projects], using=using)
+        related.refresh_later([project.pk for project in projects], using=using)
+        _changed(projects, using, created=projects)
+    return _results(projects, ['created'] * len(projects))
+
+
+def update_projects(items, using=DEFAULT_DB_ALIAS):
+    """
+    Partially updates the project identified by each item's `id`: only the
+    fields present in an item are changed.
+    """
+    with transaction.atomic(using=using):
+        errors = [{} for _ in items]
+        ids = [item['id'] for item in items]
+        projects = (
+            Project.objects.using(using).select_for_update().defer('search_vector').in_bulk(ids)
+        )
+        counts = Counter(ids)
+        for index, pk in enumerate(ids):
+            if pk not in projects:
+                errors[index]['id'] = [f'No project with id {pk}.']
+            elif counts[pk] > 1:
+                errors[index]['id'] = [f'Project {pk} appears more than once in this batch.']
+        technologies, categories = _resolve(items, errors, using)
+        titled = [item for item in items if 'title' in item]
+        taken = (
+            Project.objects.using(using)
+            .filter(title__in=[item['title'] for item in titled])
+            .exclude(pk__in=[item['id'] for item in titled])
+        )
+        _check_titles(items, errors, set(taken.values_list('title', flat=True)))
+        _raise_for(errors)
+
+        # bulk_update() skips auto_now, so bump updated_at here: the
+        # conditional GET validators and card caches are keyed on it.
+        now = timezone.now()
+        fields = {'updated_at'}
+        changed = []
+        categories_touched = {project.category_id for project in projects.values()}
+        for item in items:
+            project = _assign(projects[item['id']], item, categories)
+            project.updated_at = now
+            fields.update(_model_field(name) for name in item if name in FIELDS + ('category',))
+            changed.append(project)
+        Project.objects.using(using).bulk_update(changed, sorted(fields))
+        touched = _set_technologies(changed, items, technologies, using, replace=True)
+        categories_touched.update(project.category_id for project in changed)
+        facets.recount(touched, categories_touched, using=using)
+        related.refresh_later(
+            [project.pk for project, item in zip(changed, items) if 'technologies' in item], using=using,
+        )
+        related.invalidate_listing(
+            [project.pk for project, item in zip(changed, items) if not item.keys().isdisjoint(LISTED_FIELDS)],
+            using=using,
+        )
+        _changed(changed, using)
+    return _results(changed, ['updated'] * len(changed))
+
+
+def upsert_projects(items, using=DEFAULT_DB_ALIAS, create_relations=False):
+    """
+    Creates or fully replaces projects by `title`: a project with the
+    item's title is overwritten, otherwise a new one is created. With
+    `create_relations`, unknown category and technology names are
+    created instead of being reported as errors.
+    """
+    with transaction.atomic(using=using):
+        if create_relations:
+            _create_missing_relations(items, using)
+        errors = [{} for _ in items]
+        technologies, categories = _resolve(items, errors, using)
+        _check_titles(items, errors, taken=set())
+        _raise_for(errors)
+
+        titles = [item['title'] for item in items]
+        existing = dict(
+            Project.objects.using(using).filter(title__in=titles).values_list('title', 'category_id')
+        )
+        projects = Project.objects.using(using).bulk_create(
+            [_assign(Project(), {'link': None, 'category': None, **item}, categories) for item in items],
+            update_conflicts=True,
+            unique_fields=['title'],
+            update_fields=['description', 'link', 'category', 'updated_at'],
+        )
+        touched = _set_technologies(projects, items, technologies, using, replace=True)
+        categories_touched = {*existing.values(), *(project.category_id for project in projects)}
+        facets.recount(touched, categories_touched, using=using)
+        related.refresh_later([project.pk for project in projects], using=using)
+        # Replaced links: only existing projects can be in a list yet.
+        related.invalidate_listing(
+            [project.pk for project in projects if project.title in existing], using=using,
+        )
+        _changed(projects, using, created=[project for project in projects if project.title not in existing])
+    statuses = ['updated' if title in existing else 'created' for title in titles]
+    return _results(projects, statuses)
+
+
+def delete_projects(ids, using=DEFAULT_DB_ALIAS):
+    """Deletes the projects with the given ids. Returns [{'id', 'status'}]."""
+    with transaction.atomic(using=using):
+        found = dict(
+            Project.objects.using(using).filter(pk__in=ids).values_list('pk', 'category_id')
+        )
+        errors = [{} if pk in found else {'id': [f'No project with id {pk}.']} for pk in ids]
+        _raise_for(errors)
+
+        touched = set(
+            Through.objects.using(using).filter(project_id__in=found).values_list('technology_id', flat=True)
+        )
+        listed_by = related.listing(found, using=using) - set(found)
+        # The per-project delete receivers are replaced by one batch signal.
+        with bulk_write():
+            Project.objects.using(using).filter(pk__in=found).delete()
+        facets.recount(touched, set(found.values()), using=using)
+        related.refresh_later([], stale=listed_by, using=using)
+        projects_bulk_changed.send(sender=Project, saved=[], deleted=sorted(found), created=[], using=using)
+    return [{'id': pk, 'status': 'deleted'} for pk in ids]
+
+
+def _resolve(items, errors, using):
+    """
+    Maps every technology and category name used by the batch to its pk,
+    recording unknown names as errors of their items.
+    """
+    technology_names = {name for item in items for name in item.get('technologies', ())}
+    category_names = {item['category'] for item in items if item.get('category')}
+    technologies = dict(
+        Technology.objects.using(using).filter(name__in=technology_names).values_list('name', 'pk')
+    )
+    categories = dict(
+        Category.objects.using(using).filter(name__in=category_names).values_list('name', 'pk')
+    )
+    for index, item in enumerate(items):
+        missing = [name for name in item.get('technologies', ()) if name not in technologies]
+        if missing:
+            errors[index]['technologies'] = [_does_not_exist(name) for name in missing]
+        if item.get('category') and item['category'] not in categories:
+            errors[index]['category'] = [_does_not_exist(item['category'])]
+    return technologies, categories
+
+
+def _create_missing_relations(items, using):
+    """Bulk-creates the technologies and categories named by `items` that do not exist yet."""
+    names = {
+        Technology: {name for item in items for name in item.get('technologies', ())},
+        Category: {item['category'] for item in items if item.get('category')},
+    }
+    for model, wanted in names.items():
+        existing = set(model.objects.using(using).filter(name__in=wanted).values_list('name', flat=True))
+        model.objects.using(using).bulk_create(
+            [model(name=name) for name in sorted(wanted - existing)], ignore_conflicts=True,
+        )
+
+
+def _check_titles(items, errors, taken):
+    """Flags titles used by another project or repeated within the batch."""
+    counts = Counter(item['title'] for item in items if 'title' in item)
+    for index, item in enumerate(items):
+        title = item.get('title')
+        if title in taken:
+            errors[index]['title'] = ['project with this title already exists.']
+        elif title is not None and counts[title] > 1:
+            errors[index]['title'] = ['This title appears more than once in this batch.']
+
+
+def _raise_for(errors):
+    if any(errors):
+        raise BulkWriteError(errors)
+
+
+def _assign(project, item, categories):
+    for name in FIELDS:
+        if name in item:
+            setattr(project, name, item[name])
+    if 'category' in item:
+        project.category_id = categories.get(item['category'])
+    return project
+
+
+def _model_field(name):
+    return 'category_id' if name == 'category' else name
+
+
+def _set_technologies(projects, items, technologies, using, replace=False):
+    """
+    Links each project to its item's technologies with one bulk insert.
+    With `replace`, the existing links of those projects are dropped first.
+    Returns the pks of the technologies whose links changed.
+    """
+    pairs = [
+        (project, item['technologies'])
+        for project, item in zip(projects, items)
+        if 'technologies' in item
+    ]
+    touched = set()
+    if replace and pairs:
+        links = Through.objects.using(using).filter(project_id__in=[project.pk for project, _ in pairs])
+        touched.update(links.values_list('technology_id', flat=True))
+        links.delete()
+    rows = [
+        (project.pk, technologies[name])
+        for project, names in pairs
+        for name in dict.fromkeys(names)
+    ]
+    if rows:
+        # A plain executemany(): through rows have no defaults or signals,
+        # and building a model instance per link dominated large batches.
+        with connections[using].cursor() as cursor:
+            cursor.executemany(_INSERT_THROUGH, rows)
+    touched.update(technology_pk for _, technology_pk in rows)
+    return touched
+
+
+def _changed(projects, using, created=()):
+    projects_bulk_changed.send(
+        sender=Project, saved=[project.pk for project in projects], deleted=[],
+        created=[project.pk for project in created], using=using,
+    )
+
+
+def _results(projects, statuses):
+    return [
+        {'id': project.pk, 'title': project.title, 'status': status}
+        for project, status in zip(projects, statuses)
+    ]
+
+
+def _does_not_exist(name):
+    # Same wording as the SlugRelatedField errors of ProjectSerializer.
+    return f'Object with name={name} does not exist.'
@@ -0,0 +1,263 @@
+"""
+Two-tier cache backend: a small per-process LRU in front of a shared
+cache.
+
+The shared tier (a file, database or Redis cache, configured as another
+alias) is what every worker sees, but each read from it costs a disk or
+network round trip. `TwoTierCache` keeps the most recently used entries
+in process memory as well, for at most LOCAL_TIMEOUT seconds, and only
+goes to the shared tier on a local miss:
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'projects.cache_backends.TwoTierCache',
+            'LOCATION': 'default',
+            'OPTIONS': {'SHARED': 'shared', 'MAX_ENTRIES': 1000},
+        },
+        'shared': {'BACKEND': '...FileBasedCache', 'LOCATION': '...'},
+    }
+
+Writes go to both tiers. Other workers learn about them through a
+generation kept in the shared tier: every write that can make a copy
+held elsewhere stale (everything but `add()`) replaces it with a new
+random value, and each worker reads it at most every
+GENERATION_CHECK_INTERVAL seconds and drops its whole local tier when it
+changed. The writer drops its own local tier too, since it cannot tell
+whether another worker wrote since its last check. A local copy is
+therefore at most that many seconds behind the shared tier, except when
+two workers write the same key at once: each may keep its own value for
+up to LOCAL_TIMEOUT seconds.
+
+Every write clears every worker's local tier, so an alias written on
+every request gains little from one (see the mixed workload of
+'benchmarks/two_tier_cache.py').
+
+The local tier of each LOCATION is shared by the threads of a process,
+like Django's LocMemCache. `stats()` reports its hits, misses,
+evictions and invalidations.
+"""
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+GENERATION_KEY = 'two-tier:generation'
+
+_missing = object()
+# Local tiers, by LOCATION.
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class _LocalTier:
+    """An LRU of pickled values with expiry times, and its statistics."""
+
+    def __init__(self):
+        self.entries = OrderedDict()  # key -> (pickled value, expiry time)
+        self.lock = threading.Lock()
+        self.generation = None
+        self.checked_at = None
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+class TwoTierCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        try:
+            self._shared_alias = options['SHARED']
+        except KeyError:
+            raise ValueError("TwoTierCache requires OPTIONS['SHARED'], the alias of the shared cache.")
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._check_interval = options.get('GENERATION_CHECK_INTERVAL', 1)
+        with _tiers_lock:
+            self._tier = _tiers.setdefault(location, _LocalTier())
+
+    @property
+    def shared(self):
+        """The shared tier, for data that must skip the local one (e.g. counters)."""
+        return caches[self._shared_alias]
+
+    # --- Reads ---
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._check_generation()
+        value = self._get_local(local_key)
+        if value is not _missing:
+            return value
+        value = self.shared.get(key, _missing, version=version)
+        if value is _missing:
+            return default
+        self._set_local(local_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._check_generation()
+        found, missing = {}, {}
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version=version)
+            value = self._get_local(local_key)
+            if value is _missing:
+                missing[key] = local_key
+            else:
+                found[key] = value
+        if missing:
+            fetched = self.shared.get_many(list(missing), version=version)
+            for key, value in fetched.items():
+                self._set_local(missing[key], value, DEFAULT_TIMEOUT)
+            found.update(fetched)
+        return found
+
+    def has_key(self, key, version=None):
+        return self.get(key, _missing, version=version) is not _missing
+
+    # --- Writes ---
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Only succeeds for a key no worker can hold: nothing to invalidate.
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._set_local(self.make_and_validate_key(key, version=version), value, timeout)
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._bump_generation()
+        self._set_local(self.make_and_validate_key(key, version=version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        self._bump_generation()
+        for key, value in data.items():
+            local_key = self.make_and_validate_key(key, version=version)
+            if key in failed:
+                self._delete_local(local_key)
+            else:
+                self._set_local(local_key, value, timeout)
+        return failed
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self.shared.touch(key, timeout, version=version)
+        self._delete_local(self.make_and_validate_key(key, version=version))
+        return touched
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        try:
+            value = self.shared.incr(key, delta, version=version)
+        except ValueError:
+            self._delete_local(local_key)
+            raise
+        self._bump_generation()
+        self._set_local(local_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        self._bump_generation()
+        self._delete_local(self.make_and_validate_key(key, version=version))
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version=version)
+        self._bump_generation()
+        for key in keys:
+            self._delete_local(self.make_and_validate_key(key, version=version))
+
+    def clear(self):
+        self.shared.clear()
+        tier = self._tier
+        with tier.lock:
+            tier.entries.clear()
+            tier.generation = tier.checked_at = None
+
+    # --- Statistics ---
+
+    def stats(self):
+        """Counters of this process's local tier."""
+        tier = self._tier
+        with tier.lock:
+            lookups = tier.hits + tier.misses
+            return {
+                'hits': tier.hits,
+                'misses': tier.misses,
+                'hit_rate': round(tier.hits / lookups, 4) if lookups else None,
+                'evictions': tier.evictions,
+                'invalidations': tier.invalidations,
+                'entries': len(tier.entries),
+                'max_entries': self._max_entries,
+            }
+
+    # --- Local tier ---
+
+    def _get_local(self, local_key):
+        tier = self._tier
+        with tier.lock:
+            entry = tier.entries.get(local_key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del tier.entries[local_key]
+                tier.misses += 1
+                return _missing
+            tier.entries.move_to_end(local_key)
+            tier.hits += 1
+        return pickle.loads(entry[0])
+
+    def _set_local(self, local_key, value, timeout):
+        expiry = time.time() + self._local_timeout
+        backend_timeout = self.get_backend_timeout(timeout)
+        if backend_timeout is not None:
+            expiry = min(expiry, backend_timeout)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        tier = self._tier
+        with tier.lock:
+            tier.entries[local_key] = (pickled, expiry)
+            tier.entries.move_to_end(local_key)
+            while len(tier.entries) > self._max_entries:
+                tier.entries.popitem(last=False)
+                tier.evictions += 1
+
+    def _delete_local(self, local_key):
+        tier = self._tier
+        with tier.lock:
+            tier.entries.pop(local_key, None)
+
+    # --- Invalidation across workers ---
+
+    def _check_generation(self):
+        tier = self._tier
+        now = time.monotonic()
+        if tier.checked_at is not None and now - tier.checked_at < self._check_interval:
+            return
+        generation = self.shared.get(GENERATION_KEY)
+        with tier.lock:
+            if generation != tier.generation:
+                self._invalidate_local(tier)
+                tier.generation = generation
+            tier.checked_at = now
+
+    def _bump_generation(self):
+        # A new random value rather than incr(): on most backends incr() is
+        # a get and a set, so two concurrent writers could both store N+1
+        # and other workers would only notice one of the writes.
+        generation = secrets.randbits(63)
+        self.shared.set(GENERATION_KEY, generation, None)
+        tier = self._tier
+        with tier.lock:
+            self._invalidate_local(tier)
+            tier.generation = generation
+            tier.checked_at = time.monotonic()
+
+    @staticmethod
+    def _invalidate_local(tier):
+        if tier.entries:
+            tier.entries.clear()
+            tier.invalidations += 1
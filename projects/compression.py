@@ -0,0 +1,140 @@
+"""
+HTTP response compression for the 'projects' app.
+
+WhiteNoise serves precompressed static files; this module compresses
+the dynamic responses (HTML pages, API JSON) for CompressionMiddleware:
+
+- `negotiate()` picks Brotli or gzip from the request's Accept-Encoding,
+  honouring q-values (Brotli needs the optional `brotli` package).
+- `compress_cached()` keeps compressed bytes in the cache, keyed by a
+  hash of the uncompressed body and the encoding, so a response that is
+  served again unchanged (a cached API list, a page behind an ETag) is
+  compressed once rather than on every request.
+- `compress_stream()` / `acompress_stream()` compress streaming
+  responses chunk by chunk, flushing after each chunk.
+
+Compressed bodies are deterministic (gzip headers carry no timestamp),
+so equal bodies always produce equal bytes.
+"""
+import gzip
+import hashlib
+import re
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always offered.
+    brotli = None
+
+# Encodings offered, in order of preference.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+KEY_PREFIX = 'compression'
+
+COMPRESSIBLE_TYPE_RE = re.compile(
+    r'^(text/.+|application/(json|javascript|xml|x-ndjson|manifest\+json)|.+\+(json|xml))$'
+)
+
+
+def is_compressible_type(content_type):
+    """True for text-like media types (HTML, JSON, CSV, JavaScript, XML, ...)."""
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return bool(COMPRESSIBLE_TYPE_RE.match(media_type))
+
+
+def negotiate(accept_encoding):
+    """
+    Returns the preferred encoding the client accepts ('br' or 'gzip'),
+    or None to send the response uncompressed.
+    """
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    default = qualities.get('*', 0.0)
+    accepted = [(qualities.get(coding, default), coding) for coding in ENCODINGS]
+    accepted = [(quality, coding) for quality, coding in accepted if quality > 0]
+    if not accepted:
+        return None
+    # Highest q-value wins; ties go to the server's preference.
+    return max(accepted, key=lambda item: (item[0], -ENCODINGS.index(item[1])))[1]
+
+
+def compress(content, encoding):
+    """Compresses `content` (bytes) with `encoding`."""
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_cached(content, encoding):
+    """
+    Like `compress()`, but reuses the result of an earlier call with the
+    same content and encoding.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    key = f'{KEY_PREFIX}:{encoding}:{digest}'
+    cache = caches[settings.COMPRESSION_CACHE_ALIAS]
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(content, encoding)
+        cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+    return compressed
+
+
+def compress_stream(chunks, encoding):
+    """Compresses an iterable of byte chunks, yielding compressed chunks."""
+    compressor = _Compressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    """`compress_stream()` for the async iterators of async streaming responses."""
+    compressor = _Compressor(encoding)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class _Compressor:
+    """Incremental Brotli or gzip compressor that flushes every chunk."""
+
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self.brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self.brotli = None
+            # wbits=31: a gzip container (header with no timestamp).
+            self.zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        if not chunk:
+            return b''
+        if self.brotli is not None:
+            return self.brotli.process(chunk) + self.brotli.flush()
+        return self.zlib.compress(chunk) + self.zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.brotli is not None:
+            return self.brotli.finish()
+        return self.zlib.flush(zlib.Z_FINISH)
@@ -0,0 +1,142 @@
+"""
+Conditional GET support for the 'projects' app.
+
+Every validator is computed from one aggregate query (row count plus
+`Max('updated_at')`), so an unchanged page is answered with
+304 Not Modified before any template or serializer runs.
+
+`Project.updated_at` is also bumped when a project's technologies or
+category change (see 'signals.py'), and the row count changes on
+deletion, so the ETag moves with everything a page displays.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .models import Project, Technology
+
+
+def conditional_page(state_func, last_modified=True):
+    """
+    Decorates a view with ETag (and optionally Last-Modified) handling.
+
+    `state_func(request, *args, **kwargs)` returns a dict with `count` and
+    `last_modified` keys from a single aggregate query. It is run once per
+    request, even though Django asks for the ETag and Last-Modified
+    separately.
+
+    List pages should pass `last_modified=False`: `Max('updated_at')`
+    does not move when an older row is deleted, so only the ETag (which
+    includes the row count) can be trusted to change.
+    """
+    def get_state(request, *args, **kwargs):
+        states = request.__dict__.setdefault('_conditional_states', {})
+        if state_func not in states:
+            states[state_func] = state_func(request, *args, **kwargs)
+        return states[state_func]
+
+    def etag_func(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        parts = (
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            request.user.pk,
+            state['count'],
+            state['last_modified'].isoformat() if state['last_modified'] else '',
+        )
+        digest = hashlib.md5(repr(parts).encode('utf-8'), usedforsecurity=False).hexdigest()
+        # Weak: the same data may be rendered (or compressed) in equivalent forms.
+        return f'W/"{digest}"'
+
+    def last_modified_func(request, *args, **kwargs):
+        return get_state(request, *args, **kwargs)['last_modified']
+
+    return condition(
+        etag_func=etag_func,
+        last_modified_func=last_modified_func if last_modified else None,
+    )
+
+
+def conditional_action(state_func, last_modified=True):
+    """`conditional_page` for methods of class-based views and viewsets."""
+    return method_decorator(conditional_page(state_func, last_modified=last_modified))
+
+
+def async_conditional_page(state_func, last_modified=True):
+    """
+    `conditional_page` for async views, where `state_func` is a coroutine
+    function (see the `a*_state` functions below).
+
+    The state and the user (part of the ETag) are resolved with the async
+    ORM before Django's `condition` runs, so it never queries the
+    database from the event loop.
+    """
+    def decorator(view):
+        conditional_view = conditional_page(state_func, last_modified=last_modified)(view)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            request.user = await request.auser()
+            states = request.__dict__.setdefault('_conditional_states', {})
+            states[state_func] = await state_func(request, *args, **kwargs)
+            return await conditional_view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+# --- Page states ---
+
+AGGREGATES = {'count': Count('pk'), 'last_modified': Max('updated_at')}
+
+# Aggregating from the Technology side keeps this to one query and
+# still changes when the technology itself is created or deleted.
+TECHNOLOGY_AGGREGATES = {
+    'technology': Max('pk'),
+    'count': Count('project'),
+    'last_modified': Max('project__updated_at'),
+}
+
+
+def _technology_state(state):
+    state['count'] = (state.pop('technology'), state['count'])
+    return state
+
+
+def project_list_state(request, *args, **kwargs):
+    return Project.objects.aggregate(**AGGREGATES)
+
+
+def _project_pk(pk):
+    # The pk comes straight from the URL, e.g. 'abc' for API routes.
+    try:
+        return int(pk)
+    except (TypeError, ValueError):
+        raise Http404
+
+
+def project_state(request, pk, *args, **kwargs):
+    return Project.objects.filter(pk=_project_pk(pk)).aggregate(**AGGREGATES)
+
+
+def technology_state(request, name, *args, **kwargs):
+    return _technology_state(
+        Technology.objects.filter(name=name).aggregate(**TECHNOLOGY_AGGREGATES)
+    )
+
+
+async def aproject_list_state(request, *args, **kwargs):
+    return await Project.objects.aaggregate(**AGGREGATES)
+
+
+async def aproject_state(request, pk, *args, **kwargs):
+    return await Project.objects.filter(pk=_project_pk(pk)).aaggregate(**AGGREGATES)
+
+
+async def atechnology_state(request, name, *args, **kwargs):
+    return _technology_state(
+        await Technology.objects.filter(name=name).aaggregate(**TECHNOLOGY_AGGREGATES)
+    )
@@ -5,8 +5,46 @@ This file defines reusable test data and components that are
 injected into test functions.
 """
 import pytest
+from django.core.cache import caches
+from . import api_cache
 from .models import Project, Category, Technology
 
+@pytest.fixture(autouse=True)
+def memory_caches(settings):
+    """
+    Keeps the shared cache tier and the rate limit buckets in memory
+    rather than in files shared with other processes.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'shared'},
+        'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle'},
+    }
+
+@pytest.fixture(autouse=True)
+def clear_caches(memory_caches):
+    """Starts every test with empty caches, so cached data never leaks between tests."""
+    for cache in caches.all():
+        cache.clear()
+    api_cache.reset_stats()
+    yield
+
+@pytest.fixture(autouse=True)
+def media_storage(settings, tmp_path):
+    """Stores every file written by a test in a temporary directory."""
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.MEDIA_URL = '/media/'
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'default': {'BACKEND': 'projects.storage.PresignedFileSystemStorage'},
+    }
+    return settings.MEDIA_ROOT
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Turns every over-budget request in the test suite into an error."""
+    settings.QUERY_BUDGET_ACTION = 'raise'
+
 @pytest.mark.django_db
 @pytest.fixture
 def test_technology():
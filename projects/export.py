@@ -0,0 +1,109 @@
+"""
+Streaming export of the project catalog.
+
+The export walks the projects table with `QuerySet.iterator(chunk_size=...)`:
+rows are fetched a chunk at a time (a server-side cursor on PostgreSQL)
+and the technologies of each chunk are prefetched with one query, so
+memory use stays flat however many projects there are. Each chunk is
+encoded as one block of bytes, in either format:
+
+- `ndjson`: one JSON object per line,
+- `csv`: a header row, then one row per project, with technology names
+  joined by ';'.
+
+`iter_blocks()` feeds both `ProjectViewSet.export` (through a
+StreamingHttpResponse) and `manage.py export_projects` (to a file).
+Records use the same field names as the batch write API, so an export
+can be loaded back with `manage.py import_projects`.
+"""
+import csv
+import io
+
+import orjson
+from asgiref.sync import sync_to_async
+
+from .models import Project
+
+FIELDS = (
+    'id', 'title', 'description', 'link', 'category', 'technologies',
+    'image', 'created_at', 'updated_at',
+)
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+TECHNOLOGY_SEPARATOR = ';'
+
+
+def iter_records(chunk_size, queryset=None):
+    """Yields one dict per project, in pk order."""
+    if queryset is None:
+        queryset = Project.objects.for_detail().defer('image_variants')
+    for project in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+        yield {
+            'id': project.pk,
+            'title': project.title,
+            'description': project.description,
+            'link': project.link,
+            'category': project.category.name if project.category else None,
+            'technologies': [technology.name for technology in project.technologies.all()],
+            'image': project.image.name or None,
+            'created_at': project.created_at.isoformat(),
+            'updated_at': project.updated_at.isoformat(),
+        }
+
+
+def iter_blocks(export_format, chunk_size, queryset=None):
+    """Yields the export as bytes, one block per chunk of projects."""
+    encode = {'ndjson': _ndjson, 'csv': _csv}[export_format]
+    if export_format == 'csv':
+        yield _csv_rows([FIELDS])
+    chunk = []
+    for record in iter_records(chunk_size, queryset):
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield encode(chunk)
+            chunk = []
+    if chunk:
+        yield encode(chunk)
+
+
+async def aiter_blocks(blocks):
+    """
+    Serves `iter_blocks()` to an ASGI server without reading it all into
+    memory first: each block is produced in the request's sync thread,
+    where its database cursor lives.
+    """
+    while True:
+        block = await sync_to_async(next, thread_sensitive=True)(blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+def write_export(file, export_format, chunk_size, queryset=None):
+    """Writes the export to a binary file object. Returns the bytes written."""
+    written = 0
+    for block in iter_blocks(export_format, chunk_size, queryset):
+        written += file.write(block)
+    return written
+
+
+def _ndjson(records):
+    return b''.join(orjson.dumps(record) + b'\n' for record in records)
+
+
+def _csv(records):
+    return _csv_rows(
+        [
+            TECHNOLOGY_SEPARATOR.join(record[field]) if field == 'technologies' else record[field]
+            for field in FIELDS
+        ]
+        for record in records
+    )
+
+
+def _csv_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
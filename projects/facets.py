@@ -0,0 +1,74 @@
+"""
+Facet counts for the 'projects' app: projects per technology and per
+category.
+
+The counts are denormalized into `Technology.project_count` and
+`Category.project_count`, so reading them is a single query instead of
+a GROUP BY over the technology links on every page view:
+
+- single-object writes (saves, deletes, `technologies.add()` and the
+  like) adjust the counters with F() expressions from the receivers in
+  'signals.py', in the same transaction as the write. The database
+  applies each increment to the current value, so concurrent edits
+  never lose one.
+- batch writes (see 'bulk.py') send no per-object signals and recount
+  the technologies and categories they touched instead.
+- `manage.py recount` recomputes every counter, to repair drift after
+  writes that bypass both, such as raw SQL or `QuerySet.update()`.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Project, Technology
+
+Through = Project.technologies.through
+
+
+def adjust(model, pks, delta, using=DEFAULT_DB_ALIAS):
+    """Adds `delta` to the project counts of the given Technology or Category pks."""
+    pks = [pk for pk in pks if pk is not None]
+    if pks and delta:
+        model.objects.using(using).filter(pk__in=pks).update(project_count=F('project_count') + delta)
+
+
+def recount(technology_pks=None, category_pks=None, using=DEFAULT_DB_ALIAS):
+    """
+    Recomputes the project counts of the given technologies and categories
+    from the links themselves, with one UPDATE per model. None recounts
+    every row; an empty list none.
+    """
+    links = {
+        Technology: Through.objects.filter(technology=OuterRef('pk')).values('technology'),
+        Category: Project.objects.filter(category=OuterRef('pk')).values('category'),
+    }
+    for model, pks in ((Technology, technology_pks), (Category, category_pks)):
+        rows = model.objects.using(using)
+        if pks is not None:
+            pks = {pk for pk in pks if pk is not None}
+            if not pks:
+                continue
+            rows = rows.filter(pk__in=pks)
+        count = links[model].annotate(count=Count('*')).values('count')
+        rows.update(project_count=Coalesce(Subquery(count, output_field=IntegerField()), 0))
+
+
+def facet_counts(using=DEFAULT_DB_ALIAS):
+    """
+    Returns {'technologies': [...], 'categories': [...]}, each a list of
+    {'name', 'count'} dicts for the rows used by at least one project,
+    most used first. Runs one query.
+    """
+    def used(model, kind):
+        return (
+            model.objects.using(using)
+            .filter(project_count__gt=0)
+            .annotate(kind=Value(kind))
+            .values_list('kind', 'name', 'project_count')
+        )
+
+    rows = used(Technology, 'technologies').union(used(Category, 'categories'), all=True)
+    facets = {'technologies': [], 'categories': []}
+    for kind, name, count in rows.order_by('-project_count', 'name'):
+        facets[kind].append({'name': name, 'count': count})
+    return facets
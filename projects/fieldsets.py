@@ -0,0 +1,93 @@
+"""
+Sparse fieldsets for the projects API.
+
+`?fields=title,excerpt,images,technologies` limits each project in a
+response to the listed fields, and `?omit=description` drops fields
+from the default representation. The selection is pushed down to the
+query as well:
+
+- only the columns the requested fields read are loaded (`.only()`),
+- the category join and the technologies prefetch are skipped unless
+  `category` / `technologies` are requested,
+- `excerpt` loads the start of the description, not all of it.
+
+Sparse representations are never stored in the per-project cache of
+'api_cache.py', which only holds full ones.
+"""
+from django.db.models.functions import Left
+from rest_framework.exceptions import ValidationError
+
+from .serializers import ProjectSerializer
+
+# Fields of the default representation, and those only sent on request.
+DEFAULT_FIELDS = tuple(
+    name for name in ProjectSerializer.Meta.fields if name not in ('image_key', 'excerpt')
+)
+OPTIONAL_FIELDS = ('excerpt',)
+
+# Field -> model columns it reads. `technologies` is prefetched and
+# `excerpt` annotated, so neither needs a column of its own.
+COLUMNS = {
+    'url': ('id',),
+    'id': ('id',),
+    'title': ('title',),
+    'description': ('description',),
+    'link': ('link',),
+    'image': ('image',),
+    'images': ('image', 'image_variants'),
+    'created_at': ('created_at',),
+    'category': ('category',),
+    'technologies': (),
+    'excerpt': (),
+}
+# Always loaded: the keyset pagination orders on them.
+REQUIRED_COLUMNS = ('id', 'created_at')
+
+
+def requested_fields(query_params):
+    """
+    Returns the tuple of fields asked for by `?fields=` and `?omit=`, or
+    None for the default representation. Unknown names raise a 400.
+    """
+    fields = _names(query_params, 'fields')
+    omit = _names(query_params, 'omit')
+    if fields is None and omit is None:
+        return None
+
+    errors = {}
+    for param, names in (('fields', fields), ('omit', omit)):
+        unknown = [name for name in names or () if name not in COLUMNS]
+        if unknown:
+            errors[param] = [f"Unknown field(s): {', '.join(unknown)}."]
+    if errors:
+        raise ValidationError(errors)
+
+    selected = fields if fields is not None else DEFAULT_FIELDS
+    return tuple(name for name in selected if name not in (omit or ()))
+
+
+def restrict(queryset, fields):
+    """Loads only what `fields` need from a `for_detail()` queryset."""
+    if fields is None:
+        return queryset
+    columns = set(REQUIRED_COLUMNS)
+    for name in fields:
+        columns.update(COLUMNS[name])
+    queryset = queryset.only(*columns)
+    if 'category' not in fields:
+        queryset = queryset.select_related(None)
+    if 'technologies' not in fields:
+        queryset = queryset.prefetch_related(None)
+    if 'excerpt' in fields:
+        # One character more than needed tells whether the text was cut.
+        queryset = queryset.annotate(
+            description_start=Left('description', ProjectSerializer.EXCERPT_CHARS + 1),
+        )
+    return queryset
+
+
+def _names(query_params, param):
+    value = query_params.get(param, '').strip()
+    if not value:
+        return None
+    return list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
@@ -0,0 +1,78 @@
+"""
+Filtering of project lists by technology and category.
+
+`?technology=Python&technology=Django` keeps the projects using any of
+the listed technologies; with `&match=all`, only those using every one
+of them. `?category=Data+Science` (also repeatable) keeps the projects
+in any of the listed categories. The projects API and the HTML index
+both accept these parameters, and they combine with `?q=` search.
+
+Each filter is one semi-join on an indexed column, however many names
+it lists:
+
+- "any": `id IN (SELECT project_id FROM <links> WHERE technology IN ...)`,
+- "all": the same rows aggregated with `GROUP BY project_id HAVING
+  COUNT(*) = n`, rather than one join of the links per technology,
+- categories: `category_id IN (SELECT id FROM <categories> WHERE name IN ...)`.
+
+The (technology_id, project_id) index on the links covers both
+technology subqueries, and the (category, -created_at, -id) index on
+projects serves a category filter in the order the keyset paginator
+reads it (see migration 0014).
+"""
+from django.db.models import Count, Subquery
+from rest_framework.exceptions import ValidationError
+
+from .models import Category, Project
+
+MATCH_MODES = ('any', 'all')
+
+Through = Project.technologies.through
+
+
+def requested_filters(query_params):
+    """
+    Returns the filters asked for as a dict of `technologies`, `match`
+    and `categories`, or None for an unfiltered list. An unknown `match`
+    raises a 400.
+    """
+    match = query_params.get('match') or 'any'
+    if match not in MATCH_MODES:
+        raise ValidationError({'match': [f"Must be one of: {', '.join(MATCH_MODES)}."]})
+    technologies = _names(query_params, 'technology')
+    categories = _names(query_params, 'category')
+    if not technologies and not categories:
+        return None
+    return {'technologies': technologies, 'match': match, 'categories': categories}
+
+
+def filter_projects(queryset, filters):
+    """Applies `requested_filters()` to a Project queryset."""
+    if filters is None:
+        return queryset
+    technologies = filters['technologies']
+    if technologies:
+        links = Through.objects.filter(technology__name__in=technologies).values('project_id')
+        if filters['match'] == 'all':
+            links = (
+                links.annotate(matched=Count('*'))
+                .filter(matched=len(technologies))
+                .values('project_id')
+            )
+        queryset = queryset.filter(pk__in=links)
+    categories = filters['categories']
+    if len(categories) == 1:
+        # An equality, not IN: the index then yields rows already in
+        # keyset order, and a page stops reading after its last row.
+        category = Category.objects.filter(name=categories[0]).values('pk')
+        queryset = queryset.filter(category=Subquery(category))
+    elif categories:
+        queryset = queryset.filter(category__in=Category.objects.filter(name__in=categories))
+    return queryset
+
+
+def _names(query_params, param):
+    """The distinct, non-blank values of a repeatable parameter, in order."""
+    return list(dict.fromkeys(
+        value.strip() for value in query_params.getlist(param) if value.strip()
+    ))
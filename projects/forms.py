@@ -6,6 +6,7 @@ the public-facing contact form and the admin-facing project creation form.
 """
 from django import forms
 from .models import Project
+from .uploads import validate_upload_key
 
 class ContactForm(forms.Form):
     """
@@ -30,7 +31,12 @@ class ProjectForm(forms.ModelForm):
     """
     A ModelForm based on the Project model, used in the
     CreateView and UpdateView to manage projects from the frontend.
+
+    The image can be posted with the form, or uploaded straight to
+    storage first and referenced by its `image_key` (see 'uploads.py').
     """
+    image_key = forms.CharField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Project
         fields = ('title', 'description', 'technologies', 'category', 'image', 'link')
@@ -44,4 +50,16 @@ class ProjectForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         for field_name, field in self.fields.items():
             if field_name != 'technologies':
-                field.widget.attrs['class'] = 'form-control'
\ No newline at end of file
+                field.widget.attrs['class'] = 'form-control'
+
+    def clean_image_key(self):
+        key = self.cleaned_data['image_key']
+        return validate_upload_key(key) if key else key
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('image_key'):
+            # Assigning the stored name makes the model point at the
+            # already-uploaded object instead of saving a new file.
+            cleaned_data['image'] = cleaned_data['image_key']
+        return cleaned_data
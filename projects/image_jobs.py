@@ -0,0 +1,134 @@
+"""
+Background builds of project image derivatives.
+
+Saving a project with a new image only calls `queue()`, which stores an
+ImageVariantsJob row in the same transaction: the job is visible to the
+worker once the save commits and disappears with it on rollback, so the
+request never resizes images itself. The outbox worker
+(`manage.py process_outbox`) calls `build_pending()` to generate the
+copies (see 'images.py'), record them on the project and delete the ones
+built for the image it replaced. Failures are retried with the outbox's
+backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import api_cache, images
+from .models import ImageVariantsJob, Project
+from .outbox import retry_delay
+
+logger = logging.getLogger('projects.images')
+
+
+def needs_build(project):
+    """True if the project's image changed since its copies were built."""
+    source = project.image.name if project.image else None
+    return source != project.image_variants.get('source')
+
+
+def queue(project, using=None):
+    """
+    Queues a build of the project's current image. A job queued for an
+    older image is re-targeted; one for the same image is left as is.
+    """
+    source = project.image.name if project.image else ''
+    jobs = ImageVariantsJob.objects.using(using)
+    retargeted = jobs.filter(project_id=project.pk).exclude(source=source).update(
+        source=source, attempts=0, next_attempt_at=timezone.now(), last_error='',
+    )
+    if not retargeted:
+        jobs.get_or_create(project_id=project.pk, defaults={'source': source})
+
+
+def claim_due(batch_size, now=None):
+    """
+    Claims up to `batch_size` due jobs for this worker, leased like the
+    outbox's messages (see `outbox.claim_due()`).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            ImageVariantsJob.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        ImageVariantsJob.objects.filter(pk__in=[job.pk for job in batch]).update(
+            next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        )
+    return batch
+
+
+def build_pending(batch_size=100):
+    """
+    Builds every due job, one batch at a time. Returns a dict counting
+    built, retried and failed jobs.
+    """
+    stats = {'built': 0, 'retried': 0, 'failed': 0}
+    while batch := claim_due(batch_size):
+        for job in batch:
+            try:
+                _build(job)
+            except Exception as exc:
+                stats[_record_failure(job, exc)] += 1
+            else:
+                stats['built'] += 1
+    return stats
+
+
+def _build(job):
+    project = Project.objects.filter(pk=job.project_id).only('image', 'image_variants').first()
+    if project is not None and (project.image.name or '') == job.source:
+        previous = project.image_variants
+        variants = images.build_variants(project.image) if job.source else {}
+        storage = project.image.storage
+        # Only record the copies if the image was not replaced meanwhile
+        # (its newer job builds those); otherwise they are never used.
+        updated = Project.objects.filter(pk=project.pk, image=project.image.name).update(
+            image_variants=variants,
+            # Cached cards are keyed on updated_at and pick up the new srcset.
+            updated_at=timezone.now(),
+        )
+        if updated:
+            _delete_replaced(previous, variants, storage)
+            api_cache.invalidate_projects([project.pk])
+        else:
+            images.delete_variants(variants, storage)
+    # A job re-targeted at a newer image stays queued.
+    ImageVariantsJob.objects.filter(pk=job.pk, source=job.source).delete()
+
+
+def _delete_replaced(previous, variants, storage):
+    """
+    Deletes the copies of the replaced image, unless another project
+    still shows them ('seed_db' shares placeholder images and copies).
+    """
+    source = previous.get('source')
+    if not source or source == variants.get('source'):
+        return
+    if Project.objects.filter(image_variants__source=source).exists():
+        return
+    images.delete_variants(previous, storage)
+
+
+def _record_failure(job, exc):
+    """Schedules a retry, or gives up after OUTBOX_MAX_ATTEMPTS. Returns the outcome."""
+    attempts = job.attempts + 1
+    last_error = f'{type(exc).__name__}: {exc}'
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        # The project keeps showing its original image.
+        ImageVariantsJob.objects.filter(pk=job.pk, source=job.source).delete()
+        outcome = 'failed'
+        logger.error('Giving up on image variants of project %s after %s attempts: %s', job.pk, attempts, last_error)
+    else:
+        ImageVariantsJob.objects.filter(pk=job.pk, source=job.source).update(
+            attempts=attempts,
+            last_error=last_error,
+            next_attempt_at=timezone.now() + retry_delay(attempts),
+        )
+        outcome = 'retried'
+        logger.warning('Image variants of project %s failed (attempt %s), retrying: %s', job.pk, attempts, last_error)
+    return outcome
@@ -0,0 +1,149 @@
+"""
+Image derivatives for the 'projects' app.
+
+When a project's image is uploaded or changed, resized copies are
+generated with Pillow in WebP and JPEG by a background worker (see
+'image_jobs.py'), and stored next to the original through the project's
+configured storage (STORAGES["default"]):
+
+    project_images/photo.png
+    project_images/photo__card.webp
+    project_images/photo__card.jpg
+    ...
+
+Their storage names and pixel sizes are recorded in
+`Project.image_variants`, so templates and the API can emit `srcset`,
+`width` and `height` without touching the storage.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger('projects.images')
+
+# Rendition name -> maximum width in pixels. Images are never upscaled.
+RENDITIONS = {
+    'card': 400,
+    'card_2x': 800,
+    'detail': 960,
+    'detail_2x': 1920,
+}
+
+# Format key -> (Pillow format, file extension, save options).
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def generate_variants(image_file):
+    """
+    Generates every rendition of `image_file` (a FieldFile) and saves
+    them through its storage. Returns the `image_variants` dict.
+    """
+    storage = image_file.storage
+    root, _ = os.path.splitext(image_file.name)
+
+    with image_file.open('rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original.load()
+
+    renditions = {}
+    for name, max_width in RENDITIONS.items():
+        width = min(original.width, max_width)
+        same_width = next((r for r in renditions.values() if r['width'] == width), None)
+        if same_width:
+            # A source narrower than this rendition reuses the smaller
+            # copy's files instead of storing the same size again.
+            renditions[name] = same_width
+            continue
+        resized = _resize(original, max_width)
+        rendition = {'width': resized.width, 'height': resized.height}
+        for key, (pil_format, extension, options) in FORMATS.items():
+            content = ContentFile(_encode(resized, pil_format, options))
+            rendition[key] = storage.save(f'{root}__{name}.{extension}', content)
+        renditions[name] = rendition
+
+    return {'source': image_file.name, 'renditions': renditions}
+
+
+def build_variants(image_file):
+    """
+    `generate_variants()` for a stored upload, or an empty `image_variants`
+    dict (recording the source) if the image cannot be decoded.
+    """
+    try:
+        return generate_variants(image_file)
+    except (Image.UnidentifiedImageError, ValueError, Image.DecompressionBombError):
+        # An unreadable (or too large to decode) upload keeps working
+        # with the original image.
+        logger.exception('Could not generate image variants for %s', image_file.name)
+        return {'source': image_file.name, 'renditions': {}}
+
+
+def delete_variants(variants, storage):
+    """Deletes the stored copies listed in an `image_variants` dict."""
+    names = {
+        rendition.get(key)
+        for rendition in variants.get('renditions', {}).values()
+        for key in FORMATS
+    }
+    for name in names - {None}:
+        storage.delete(name)
+
+
+def rendition_urls(project, build_url=None):
+    """
+    Returns {rendition: {'width', 'height', 'webp', 'jpeg'}} with public
+    URLs, or None if the project has no derivatives. `build_url` can turn
+    the storage URLs into absolute ones.
+    """
+    return variant_urls(project.image.name, project.image_variants, project.image.storage, build_url)
+
+
+def variant_urls(source, variants, storage, build_url=None):
+    """
+    `rendition_urls()` from an image name and its `image_variants` dict,
+    e.g. read with `values()`. Copies built for a previous image (while
+    the new one's are still queued) are ignored.
+    """
+    renditions = variants.get('renditions') if source and variants.get('source') == source else None
+    if not renditions:
+        return None
+    build_url = build_url or (lambda url: url)
+    return {
+        name: {
+            'width': rendition['width'],
+            'height': rendition['height'],
+            **{key: build_url(storage.url(rendition[key])) for key in FORMATS},
+        }
+        for name, rendition in renditions.items()
+    }
+
+
+def _resize(image, max_width):
+    if image.width <= max_width:
+        return image.copy()
+    height = round(image.height * max_width / image.width)
+    return image.resize((max_width, height), Image.Resampling.LANCZOS)
+
+
+def _encode(image, pil_format, options):
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        image = _flatten(image)
+    elif pil_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _flatten(image):
+    """Converts to RGB, compositing any transparency onto white (JPEG has no alpha)."""
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
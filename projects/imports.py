@@ -0,0 +1,176 @@
+"""
+Streaming import of projects from NDJSON or CSV.
+
+Reads the format written by 'export.py' (extra fields such as `id` or
+`created_at` are ignored) one record at a time and upserts projects by
+title a chunk at a time with `bulk.upsert_projects`. Each chunk:
+
+- creates its missing technologies and categories with bulk inserts and
+  resolves every name with one query per model,
+- writes projects with `bulk_create(update_conflicts=True)` and their
+  technology links with one bulk insert,
+- commits in its own transaction, so an interrupted import can resume
+  after the last committed record (`offset`).
+
+Invalid records are skipped and reported; they never abort a chunk.
+"""
+import csv
+import io
+import time
+from dataclasses import dataclass, field
+
+import orjson
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import DEFAULT_DB_ALIAS, reset_queries
+
+from .bulk import upsert_projects
+from .export import TECHNOLOGY_SEPARATOR
+from .models import Category, Project, Technology
+
+FORMATS = ('ndjson', 'csv')
+
+_max_length = {
+    'title': Project._meta.get_field('title').max_length,
+    'link': Project._meta.get_field('link').max_length,
+    'category': Category._meta.get_field('name').max_length,
+    'technology': Technology._meta.get_field('name').max_length,
+}
+_validate_url = URLValidator()
+
+
+class InvalidRecord(ValueError):
+    """A record that cannot be imported."""
+
+
+@dataclass
+class ImportStats:
+    """
+    Progress of an import. `committed` counts records from the start of
+    the file, skipped and invalid ones included.
+    """
+    offset: int = 0
+    committed: int = 0
+    created: int = 0
+    updated: int = 0
+    invalid: list = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rate(self):
+        """Records committed per second since the import started."""
+        elapsed = time.perf_counter() - self.started
+        return (self.committed - self.offset) / elapsed if elapsed else 0.0
+
+
+def read_records(file, import_format):
+    """
+    Yields the records of a binary file as dicts, or as InvalidRecord
+    errors for lines that cannot be decoded, which `to_item()` raises.
+    """
+    if import_format == 'ndjson':
+        for line in file:
+            if line.strip():
+                try:
+                    yield orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    yield InvalidRecord('invalid JSON')
+    else:
+        # Undecodable bytes are kept as surrogates, so they only spoil their own row.
+        text = io.TextIOWrapper(file, encoding='utf-8', errors='surrogateescape', newline='')
+        for row in csv.DictReader(text):
+            try:
+                ''.join(value for value in row.values() if isinstance(value, str)).encode('utf-8')
+            except UnicodeEncodeError:
+                yield InvalidRecord('invalid UTF-8')
+                continue
+            names = row.get('technologies') or ''
+            row['technologies'] = [name for name in names.split(TECHNOLOGY_SEPARATOR) if name]
+            yield row
+
+
+def to_item(record):
+    """
+    Turns a record into an item for `bulk.upsert_projects`, or raises
+    InvalidRecord.
+    """
+    if isinstance(record, InvalidRecord):
+        raise record
+    if not isinstance(record, dict):
+        raise InvalidRecord('not an object')
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise InvalidRecord('title is required')
+    if len(title) > _max_length['title']:
+        raise InvalidRecord(f"title is longer than {_max_length['title']} characters")
+    description = record.get('description')
+    if not isinstance(description, str):
+        raise InvalidRecord('description is required')
+
+    link = record.get('link') or None
+    if link is not None:
+        if not isinstance(link, str) or len(link) > _max_length['link']:
+            raise InvalidRecord('invalid link')
+        try:
+            _validate_url(link)
+        except ValidationError:
+            raise InvalidRecord('invalid link')
+
+    category = record.get('category') or None
+    if category is not None and (not isinstance(category, str) or len(category) > _max_length['category']):
+        raise InvalidRecord('invalid category')
+
+    technologies = record.get('technologies') or []
+    if not isinstance(technologies, list) or not all(
+        isinstance(name, str) and 0 < len(name) <= _max_length['technology'] for name in technologies
+    ):
+        raise InvalidRecord('invalid technologies')
+
+    return {
+        'title': title,
+        'description': description,
+        'link': link,
+        'category': category,
+        'technologies': technologies,
+    }
+
+
+def import_records(records, chunk_size, offset=0, progress=None, using=DEFAULT_DB_ALIAS):
+    """
+    Upserts `records` a chunk at a time, skipping the first `offset`.
+    Calls `progress(stats)` after every committed chunk. Returns the
+    ImportStats.
+    """
+    stats = ImportStats(offset=offset, committed=offset)
+    chunk = {}
+    last = offset
+    for number, record in enumerate(records, start=1):
+        if number <= offset:
+            continue
+        last = number
+        try:
+            item = to_item(record)
+        except InvalidRecord as exc:
+            stats.invalid.append((number, str(exc)))
+        else:
+            # A title repeated within a chunk: the last record wins.
+            chunk.pop(item['title'], None)
+            chunk[item['title']] = item
+        if last - stats.committed >= chunk_size:
+            _commit(chunk, last, stats, using, progress)
+            chunk = {}
+    if last > stats.committed:
+        _commit(chunk, last, stats, using, progress)
+    return stats
+
+
+def _commit(chunk, last_number, stats, using, progress):
+    if chunk:
+        results = upsert_projects(list(chunk.values()), using=using, create_relations=True)
+        for result in results:
+            setattr(stats, result['status'], getattr(stats, result['status']) + 1)
+    stats.committed = last_number
+    # With DEBUG on, the connection logs every (huge) bulk statement.
+    reset_queries()
+    if progress is not None:
+        progress(stats)
@@ -0,0 +1,64 @@
+"""
+Custom Django management command to export every project as NDJSON or
+CSV (see projects/export.py), e.g.:
+
+    python manage.py export_projects --output projects.ndjson
+    python manage.py export_projects --format csv > projects.csv
+
+Projects are read a chunk at a time, so memory use does not grow with
+the size of the catalog.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from projects.export import CONTENT_TYPES, write_export
+
+class Command(BaseCommand):
+    help = "Exports every project as NDJSON or CSV to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(CONTENT_TYPES),
+            help="Output format. Default: from the --output extension, else ndjson.",
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write. Default: stdout.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.PROJECTS_EXPORT_CHUNK_SIZE,
+            help="Projects fetched per query (with their technologies).",
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_format = options['format']
+        if export_format is None:
+            extension = os.path.splitext(output or '')[1].lstrip('.').lower()
+            export_format = extension if extension in CONTENT_TYPES else 'ndjson'
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be >= 1.")
+
+        if output:
+            with open(output, 'wb') as file:
+                written = write_export(file, export_format, options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"Exported {written} bytes of {export_format} to {output}."))
+        else:
+            # Binary stdout when there is one, e.g. not under call_command(stdout=StringIO()).
+            stream = getattr(self.stdout, 'buffer', None) or _TextStream(self.stdout)
+            write_export(stream, export_format, options['chunk_size'])
+            stream.flush()
+
+class _TextStream:
+    """Writes the export's bytes to a text stream."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        self.stream.write(data.decode('utf-8'), ending='')
+        return len(data)
+
+    def flush(self):
+        self.stream.flush()
@@ -0,0 +1,116 @@
+"""
+Custom Django management command to import projects from NDJSON or CSV
+(see projects/imports.py), e.g.:
+
+    python manage.py import_projects projects.ndjson
+    python manage.py export_projects | python manage.py import_projects -
+
+Projects are upserted by title, one transaction per chunk of records.
+If an import stops half way, run it again with the --offset it printed
+to resume after the last committed record. The related projects that
+the imported records can affect are recomputed once, after the last
+chunk, rather than after every chunk; --rebuild-related recomputes
+every list instead, which is cheaper when most projects changed.
+"""
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from projects import related
+from projects.imports import FORMATS, import_records, read_records
+
+class Command(BaseCommand):
+    help = "Imports projects from an NDJSON or CSV file, upserting them by title."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help="File to read, or - for stdin.",
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help="Input format. Default: from the file extension, else ndjson.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.PROJECTS_IMPORT_CHUNK_SIZE,
+            help="Records upserted per transaction.",
+        )
+        parser.add_argument(
+            '--offset', type=int, default=0,
+            help="Number of records to skip, e.g. those committed by an interrupted import.",
+        )
+        parser.add_argument(
+            '--rebuild-related', action='store_true',
+            help="Recompute the related projects of every project, not only those the import affects.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database alias to import into.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format']
+        if import_format is None:
+            extension = os.path.splitext(path)[1].lstrip('.').lower()
+            import_format = extension if extension in FORMATS else 'ndjson'
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be >= 1.")
+        if options['offset'] < 0:
+            raise CommandError("--offset must be >= 0.")
+
+        progress = ImportProgress(self.stdout)
+        if path == '-':
+            file = sys.stdin.buffer
+        else:
+            try:
+                file = open(path, 'rb')
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+        try:
+            with related.paused() as related_changes:
+                stats = import_records(
+                    read_records(file, import_format),
+                    chunk_size=options['chunk_size'],
+                    offset=options['offset'],
+                    progress=progress,
+                    using=options['database'],
+                )
+        except Exception as exc:
+            committed = progress.stats.committed if progress.stats else options['offset']
+            raise CommandError(
+                f"Import failed after record {committed}: {exc}\n"
+                f"Resume with --offset {committed}."
+            ) from exc
+        finally:
+            if file is not sys.stdin.buffer:
+                file.close()
+
+        for number, error in stats.invalid:
+            self.stderr.write(f"Skipped record {number}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.committed - stats.offset} records "
+            f"({stats.created} created, {stats.updated} updated, {len(stats.invalid)} skipped) "
+            f"at {stats.rate:,.0f} records/s."
+        ))
+        if options['rebuild_related']:
+            self.stdout.write("Rebuilding related projects...")
+            related.rebuild(using=options['database'])
+        elif related_changes['changed'] or related_changes['stale']:
+            self.stdout.write("Refreshing related projects...")
+            related.refresh_affected(
+                related_changes['changed'], related_changes['stale'], using=options['database'],
+            )
+
+class ImportProgress:
+    """Reports each committed chunk and keeps the latest stats."""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.stats = None
+
+    def __call__(self, stats):
+        self.stats = stats
+        self.stdout.write(f"Committed {stats.committed} records ({stats.rate:,.0f}/s)")
@@ -0,0 +1,42 @@
+"""
+Custom Django management command to deliver the queued emails
+in the outbox (see projects/outbox.py) and build the queued image
+variants (see projects/image_jobs.py).
+"""
+import time
+from django.core.management.base import BaseCommand
+from projects.image_jobs import build_pending
+from projects.outbox import deliver_pending
+
+class Command(BaseCommand):
+    help = "Sends due emails from the outbox over a single SMTP connection and builds queued image variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help="Number of messages (or image jobs) claimed per batch.",
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help="Seconds to sleep between polls in --loop mode.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = deliver_pending(batch_size=options['batch_size'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"Sent {stats['sent']}, retrying {stats['retried']}, failed {stats['failed']}."
+                )
+            stats = build_pending(batch_size=options['batch_size'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"Built {stats['built']} image variants, retrying {stats['retried']}, failed {stats['failed']}."
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+"""
+Custom Django management command to recompute the related projects of
+every project (see projects/related.py), a batch of projects per
+transaction, e.g. once after migrating a database that already holds
+projects, after a bulk import or after a change of
+RELATED_PROJECTS_COUNT.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from projects import related
+
+class Command(BaseCommand):
+    help = "Recomputes the related projects of every project."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=related.BATCH_SIZE,
+            help="Projects whose lists are computed per statement and transaction.",
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the related projects on.",
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be >= 1.")
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} projects ({done / (time.perf_counter() - started):.0f}/s)")
+
+        self.stdout.write("Rebuilding related projects...")
+        changed = related.rebuild(
+            using=options['database'], batch_size=options['batch_size'], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Related projects rebuilt in {time.perf_counter() - started:.1f}s ({changed} lists changed)."
+        ))
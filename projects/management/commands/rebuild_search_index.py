@@ -0,0 +1,22 @@
+"""
+Custom Django management command to rebuild the full-text
+search index of all projects.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from projects.search import rebuild_index
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index for all projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index on.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding search index...")
+        rebuild_index(using=options['database'])
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,24 @@
+"""
+Custom Django management command to recompute the project counts of
+every technology and category (see projects/facets.py), e.g. after
+raw SQL writes that bypassed the signal receivers keeping them current.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from projects import facets
+
+class Command(BaseCommand):
+    help = "Recomputes the project counts of all technologies and categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to recount on.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recounting projects per technology and category...")
+        with transaction.atomic(using=options['database']):
+            facets.recount(using=options['database'])
+        self.stdout.write(self.style.SUCCESS('Facet counts recomputed.'))
@@ -1,14 +1,81 @@
 """
 Custom Django management command to seed the database
 with initial data (Categories, Technologies, and Projects).
+
+With --projects N it instead generates a synthetic dataset of any size
+for performance testing, e.g.:
+
+    python manage.py seed_db --projects 1000000 --technologies 200 --categories 20
+
+Projects and their technology links are written with bulk inserts, one
+batch (and one transaction) at a time, so memory use does not grow with N.
 """
-from django.core.management.base import BaseCommand
+import random
+import time
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import reset_queries, transaction
+from django.db.models import Max
+from PIL import Image
+from projects import api_cache, facets
+from projects.images import generate_variants
 from projects.models import Project, Category, Technology
+from projects.search import index_projects
+
+TECHNOLOGY_NAMES = [
+    'Python', 'Django', 'FastAPI', 'Flask', 'PostgreSQL', 'SQLite', 'Redis', 'Celery',
+    'Docker', 'Kubernetes', 'AWS S3', 'Render', 'Pytest', 'React', 'TypeScript',
+    'JavaScript', 'Bootstrap', 'Pandas', 'NumPy', 'scikit-learn', 'Go', 'Rust',
+]
+CATEGORY_NAMES = ['Web Development', 'Data Science', 'DevOps', 'Mobile', 'Machine Learning', 'Tooling']
+ADJECTIVES = ['Fast', 'Simple', 'Distributed', 'Realtime', 'Secure', 'Tiny', 'Open', 'Smart', 'Async', 'Modular']
+NOUNS = ['Dashboard', 'API', 'Tracker', 'Scheduler', 'Crawler', 'Blog', 'Shop', 'Chat', 'Pipeline', 'Portfolio']
+WORDS = (
+    'build deploy test scale cache query index search render stream queue worker '
+    'service model view template data user project api database server client '
+    'performance latency throughput monitoring logging security storage upload'
+).split()
 
 class Command(BaseCommand):
     help = "Popluates a new database with initial, essential data."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects', type=int,
+            help="Generate this many synthetic projects instead of the showcase data.",
+        )
+        parser.add_argument(
+            '--technologies', type=int, default=50,
+            help="Number of technologies to spread synthetic projects over.",
+        )
+        parser.add_argument(
+            '--categories', type=int, default=10,
+            help="Number of categories to spread synthetic projects over.",
+        )
+        parser.add_argument(
+            '--max-technologies', type=int, default=5,
+            help="Maximum number of technologies per synthetic project.",
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help="Random seed; the same seed generates the same dataset.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help="Number of projects inserted per batch.",
+        )
+        parser.add_argument(
+            '--images', type=int, default=0, metavar='N',
+            help="Attach one of N generated placeholder images to each synthetic project.",
+        )
+
     def handle(self, *args, **options):
+        if options['projects'] is not None:
+            return self.seed_synthetic(**options)
+
         self.stdout.write("Seeding database...")
 
         # --- Create Categories ---
@@ -63,4 +130,85 @@ class Command(BaseCommand):
             proj2.technologies.add(py, fa, dock, pytest)
             self.stdout.write(self.style.SUCCESS('Successfully created FastAPI project.'))
 
-        self.stdout.write(self.style.SUCCESS('Database seeding complete.'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Database seeding complete.'))
+
+    def seed_synthetic(self, projects, technologies, categories, max_technologies,
+                       seed, batch_size, images, **options):
+        if projects < 0 or technologies < 1 or categories < 1 or batch_size < 1:
+            raise CommandError("--projects must be >= 0; --technologies, --categories and --batch-size >= 1.")
+        rng = random.Random(seed)
+        started = time.perf_counter()
+
+        technology_ids = self.ensure_rows(Technology, _names(TECHNOLOGY_NAMES, 'Technology', technologies))
+        category_ids = self.ensure_rows(Category, _names(CATEGORY_NAMES, 'Category', categories))
+        placeholders = [self.create_placeholder_image(number, rng) for number in range(images)]
+        max_technologies = max(1, min(max_technologies, len(technology_ids)))
+        Through = Project.technologies.through
+
+        self.stdout.write(
+            f"Generating {projects} projects in batches of {batch_size} "
+            f"({len(technology_ids)} technologies, {len(category_ids)} categories)..."
+        )
+        # Titles are unique: number new projects past every existing pk.
+        start = (Project.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        created = 0
+        while created < projects:
+            size = min(batch_size, projects - created)
+            with transaction.atomic():
+                batch = Project.objects.bulk_create(
+                    self.build_project(start + created + offset, rng, category_ids, placeholders)
+                    for offset in range(size)
+                )
+                Through.objects.bulk_create(
+                    Through(project_id=project.pk, technology_id=technology_id)
+                    for project in batch
+                    for technology_id in rng.sample(technology_ids, rng.randint(1, max_technologies))
+                )
+                # bulk_create sends no signals, so index the batch directly.
+                index_projects([project.pk for project in batch])
+            created += size
+            # With DEBUG on, the connection logs every (huge) bulk INSERT.
+            reset_queries()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {created}/{projects} projects ({created / elapsed:.0f}/s)")
+
+        # The through rows were bulk-inserted without m2m_changed signals.
+        facets.recount(technology_ids, category_ids)
+        api_cache.invalidate_projects([])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {projects} projects in {time.perf_counter() - started:.1f}s."
+        ))
+        # Computing related projects costs more than generating them.
+        self.stdout.write("Run `manage.py rebuild_related_projects` to compute related projects.")
+
+    def ensure_rows(self, model, names):
+        """Creates any missing rows of a name-keyed model. Returns their pks."""
+        model.objects.bulk_create([model(name=name) for name in names], ignore_conflicts=True)
+        return list(model.objects.filter(name__in=names).order_by('pk').values_list('pk', flat=True))
+
+    def build_project(self, number, rng, category_ids, placeholders):
+        project = Project(
+            title=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {number}",
+            description=' '.join(rng.choices(WORDS, k=rng.randint(20, 60))).capitalize() + '.',
+            link=f"https://example.com/projects/{number}",
+            category_id=rng.choice(category_ids),
+        )
+        if placeholders:
+            project.image, project.image_variants = rng.choice(placeholders)
+        return project
+
+    def create_placeholder_image(self, number, rng):
+        """
+        Stores one placeholder image and its variants. Synthetic projects
+        share these files instead of each getting its own copy.
+        """
+        buffer = BytesIO()
+        color = tuple(rng.randrange(256) for _ in range(3))
+        Image.new('RGB', (1200, 800), color).save(buffer, 'JPEG', quality=85)
+        name = default_storage.save(f'project_images/seed/placeholder-{number}.jpg', ContentFile(buffer.getvalue()))
+        project = Project(image=name)
+        return name, generate_variants(project.image)
+
+def _names(base, prefix, count):
+    """The first `count` names of `base`, continued as 'prefix N' if needed."""
+    return base[:count] + [f'{prefix} {number}' for number in range(len(base) + 1, count + 1)]
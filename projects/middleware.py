@@ -0,0 +1,302 @@
+"""
+Middleware for the 'projects' app.
+
+QueryInstrumentationMiddleware counts the SQL queries each request runs,
+their total time and how many were exact duplicates. It reports them in
+a `Server-Timing` header and a structured log line, and checks read
+(GET/HEAD) requests against the per-URL-name budgets in
+`settings.QUERY_BUDGETS`. For a streamed response (e.g. the exports) the
+log line and budget check wait until the body is consumed, so they count
+the queries run while streaming it; its header, sent first, cannot.
+
+StaticFilesMiddleware is WhiteNoise made async-capable, so that under
+ASGI requests reach the async views without a hop through a thread.
+
+CompressionMiddleware compresses dynamic responses with Brotli or gzip
+(see 'compression.py').
+"""
+import logging
+import re
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import compression
+
+logger = logging.getLogger('projects.queries')
+
+STRONG_ETAG_RE = re.compile(r'^\s*"')
+
+_missing = object()
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more queries than its budget allows."""
+
+
+class QueryCounter:
+    """An `execute_wrapper` that records every query run through it."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Number of queries that repeated an earlier statement with the same parameters."""
+        return sum(seen - 1 for seen in self.statements.values() if seen > 1)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Instruments every request's database usage.
+
+    Place it first in MIDDLEWARE so that queries run by other middleware
+    (sessions, authentication) are counted too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        return self.finish(request, response, counter, start)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        # The async ORM runs queries in the request's sync thread, so the
+        # wrapper is installed on that thread's connection.
+        await sync_to_async(_add_execute_wrapper)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_execute_wrapper)(counter)
+        return self.finish(request, response, counter, start)
+
+    def finish(self, request, response, counter, start):
+        self.add_server_timing(response, counter, time.perf_counter() - start)
+        # Files run no queries; wrapping them would lose wsgi.file_wrapper.
+        if response.streaming and not isinstance(response, FileResponse):
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(request, response, response.streaming_content, counter, start)
+        else:
+            self.report(request, response, counter, time.perf_counter() - start)
+        return response
+
+    def stream(self, request, response, content, counter, start):
+        """
+        Yields the response's body, counting the queries run to produce
+        each chunk (in whichever thread iterates it), then reports them.
+        """
+        content = iter(content)
+        completed = False
+        try:
+            while True:
+                with connection.execute_wrapper(counter):
+                    chunk = next(content, _missing)
+                if chunk is _missing:
+                    break
+                yield chunk
+            completed = True
+        finally:
+            if not completed:
+                # Cut short (e.g. the client went away): log what ran.
+                self.log(request, response, _url_name(request), counter, time.perf_counter() - start)
+        self.report(request, response, counter, time.perf_counter() - start)
+
+    async def astream(self, request, response, content, counter, start):
+        """`stream()` for an async body, whose queries run in the request's sync thread."""
+        await sync_to_async(_add_execute_wrapper)(counter)
+        completed = False
+        try:
+            async for chunk in content:
+                yield chunk
+            completed = True
+        finally:
+            await sync_to_async(_remove_execute_wrapper)(counter)
+            if not completed:
+                self.log(request, response, _url_name(request), counter, time.perf_counter() - start)
+        self.report(request, response, counter, time.perf_counter() - start)
+
+    def report(self, request, response, counter, total):
+        url_name = _url_name(request)
+        self.log(request, response, url_name, counter, total)
+        if request.method in ('GET', 'HEAD'):
+            self.check_budget(url_name, counter)
+
+    def add_server_timing(self, response, counter, total):
+        metrics = (
+            f'db;dur={counter.duration * 1000:.2f};desc="{counter.count} queries, '
+            f'{counter.duplicates} duplicates", app;dur={total * 1000:.2f}'
+        )
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = f'{existing}, {metrics}' if existing else metrics
+
+    def log(self, request, response, url_name, counter, total):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            'queries': counter.count,
+            'duplicate_queries': counter.duplicates,
+            'sql_ms': round(counter.duration * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in fields.items()),
+            extra=fields,
+        )
+
+    def check_budget(self, url_name, counter):
+        budget = settings.QUERY_BUDGETS.get(url_name)
+        if budget is None or counter.count <= budget:
+            return
+        message = f'{url_name} ran {counter.count} queries (budget: {budget})'
+        if settings.QUERY_BUDGET_ACTION == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message, extra={'url_name': url_name, 'queries': counter.count, 'budget': budget})
+
+
+def _url_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+def _add_execute_wrapper(wrapper):
+    # `connection` must be looked up in the thread that runs the queries.
+    connection.execute_wrappers.append(wrapper)
+
+
+def _remove_execute_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also runs natively in async mode."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """
+    Compresses text-like responses with the encoding negotiated from
+    Accept-Encoding, and adds `Vary: Accept-Encoding` to every response
+    that could have been compressed.
+
+    Bodies shorter than COMPRESSION_MIN_SIZE are left alone (and need no
+    Vary). Responses carrying an ETag are representations that get served
+    again unchanged, so their compressed bytes are cached (see
+    `compression.compress_cached`). Streaming responses are compressed on
+    the fly. Files (static and media) are left to WhiteNoise and the
+    storage.
+
+    Place it after QueryInstrumentationMiddleware, so compression time is
+    part of the reported request time, and before anything that reads
+    the response body.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+        if response.streaming:
+            return self.process(request, response)
+        # Compressing (or fetching from the cache) is blocking work.
+        return await sync_to_async(self.process)(request, response)
+
+    def process(self, request, response):
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ['Accept-Encoding'])
+        encoding = compression.negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compression.compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            compress = compression.compress_cached if response.has_header('ETag') else compression.compress
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed bytes differ from the identity ones, so a strong
+        # ETag must not be shared between them (RFC 9110, section 8.8.3).
+        etag = response.get('ETag')
+        if etag and STRONG_ETAG_RE.match(etag):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding') or isinstance(response, FileResponse):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        if not compression.is_compressible_type(response.get('Content-Type', '')):
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:14
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the vendor-specific full-text index and fills it.
+
+    PostgreSQL gets a GIN index over the tsvector column; SQLite gets an
+    FTS5 shadow table keyed by project id.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX projects_project_search_vector_gin "
+            "ON projects_project USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE projects_project SET search_vector = "
+            "setweight(to_tsvector('english'::regconfig, COALESCE(title, '')), 'A') || "
+            "setweight(to_tsvector('english'::regconfig, COALESCE(description, '')), 'B')"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE projects_project_fts "
+            "USING fts5(title, description, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO projects_project_fts (rowid, title, description) "
+            "SELECT id, title, description FROM projects_project"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS projects_project_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS projects_project_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_project_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:04
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_projects(apps, schema_editor):
+    """Fills the new counters from the existing projects (like `manage.py recount`)."""
+    using = schema_editor.connection.alias
+    Project = apps.get_model('projects', 'Project')
+    links = {
+        apps.get_model('projects', 'Technology'):
+            Project.technologies.through.objects.filter(technology=OuterRef('pk')).values('technology'),
+        apps.get_model('projects', 'Category'):
+            Project.objects.filter(category=OuterRef('pk')).values('category'),
+    }
+    for model, rows in links.items():
+        count = rows.annotate(count=Count('*')).values('count')
+        model.objects.using(using).update(
+            project_count=Coalesce(Subquery(count, output_field=IntegerField()), 0)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_project_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='technology',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_projects, migrations.RunPython.noop),
+    ]
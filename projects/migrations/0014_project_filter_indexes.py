@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0013_technology_category_project_count'),
+    ]
+
+    operations = [
+        # The auto-created through model takes no Meta.indexes. Its unique
+        # (project_id, technology_id) index serves lookups by project; this
+        # one covers the technology filters of filters.py, which read
+        # project_id for a set of technology_id values.
+        migrations.RunSQL(
+            "CREATE INDEX projects_project_technologies_technology_project_idx "
+            "ON projects_project_technologies (technology_id, project_id)",
+            "DROP INDEX projects_project_technologies_technology_project_idx",
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='project_cat_created_id_idx'),
+        ),
+        # Superseded by the index above, which leads with category_id.
+        migrations.AlterField(
+            model_name='project',
+            name='category',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='projects.category'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The table starts empty: fill it with `manage.py rebuild_related_projects`,
+# which works in batches instead of holding this migration's transaction
+# for one statement over every pair of projects.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_project_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('position', models.PositiveSmallIntegerField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='projects.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'position'), name='related_project_position_uniq')],
+            },
+        ),
+    ]
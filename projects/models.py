@@ -2,22 +2,47 @@
 Data models for the 'projects' app.
 
 This file defines the database schema for the portfolio.
-It includes models for Projects, the Technologies used, and the
-Categories they belong to. These models are the single source of truth
+It includes models for Projects, the Technologies used, the
+Categories they belong to, each project's precomputed related projects,
+and the outbox of queued emails. These models are the single source of truth
 for the application's data structure.
 """
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+from .images import rendition_urls
 
-class Technology(models.Model):
+class CountedModel(models.Model):
+    """
+    Base of the models whose `project_count` is maintained by facets.py,
+    with F() updates: an instance's copy may be stale, so saving an
+    existing row never writes it back.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, *, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'project_count'
+            ]
+        super().save(update_fields=update_fields, **kwargs)
+
+class Technology(CountedModel):
     """Represents a single technology or framework (e.g., Python, Django)."""
     name = models.CharField(max_length=50, unique=True)
+    # Number of projects using this technology, maintained by facets.py.
+    project_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
 
-class Category(models.Model):
+class Category(CountedModel):
     """A category to group projects (e.g., Web Development, Data Science)."""
     name = models.CharField(max_length=50, unique=True)
+    # Number of projects in this category, maintained by facets.py.
+    project_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = "Categories"
@@ -25,17 +50,161 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class ProjectQuerySet(models.QuerySet):
+    """
+    Canonical eager-loading for Project queries.
+
+    Every page and API endpoint fetches projects through one of these
+    methods, so each runs a fixed number of queries however many
+    projects it shows.
+    """
+
+    def for_listing(self):
+        """Projects shown as cards: no relations are displayed."""
+        return self.defer('search_vector')
+
+    def for_detail(self):
+        """Projects shown in full, with their category and technologies."""
+        return self.defer('search_vector').select_related('category').prefetch_related(
+            models.Prefetch('technologies', queryset=Technology.objects.order_by('name'))
+        )
+
+# Project fields shown in the related lists of other projects.
+LISTED_FIELDS = ('title', 'link', 'image')
+
 class Project(models.Model):
     """The core model representing a single portfolio project."""
     title = models.CharField(max_length=100, unique=True)
     description = models.TextField()
     technologies = models.ManyToManyField(Technology)
-    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    # Indexed by project_cat_created_id_idx below, which leads with it.
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
     image = models.ImageField(upload_to='project_images/', null=True, blank=True)
+    # Resized WebP/JPEG copies of `image`, maintained by images.py.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     link = models.URLField(max_length=200, null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text index of title + description (PostgreSQL only; see search.py).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the newest-first keyset pagination of the projects API.
+            models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+            # Serves the same pagination filtered by category (see filters.py).
+            models.Index(fields=['category', '-created_at', '-id'], name='project_cat_created_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The category counters need the category a save moves away from.
+        if 'category_id' in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        # The related lists showing the project need to know if it changed.
+        instance._loaded_listed_values = instance.listed_values()
+        return instance
+
+    def listed_values(self):
+        """
+        The loaded values of LISTED_FIELDS, the fields shown in the related
+        lists of other projects (see 'related.py'). Deferred ones are left out.
+        """
+        values = {}
+        for name in LISTED_FIELDS:
+            if name in self.__dict__:
+                value = self.__dict__[name]
+                # A FieldFile once the image was accessed, its name before.
+                values[name] = getattr(value, 'name', value) or None
+        return values
+
+    @property
+    def image_renditions(self):
+        """URLs and sizes of the resized image copies, or None."""
+        return rendition_urls(self)
+
+class RelatedProject(models.Model):
+    """
+    One of the nearest neighbours of a project: the projects sharing the
+    most technologies with it, by Jaccard similarity. Precomputed and
+    kept up to date by related.py.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    # Indexed: finds the lists a project appears in when it changes.
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    # |shared technologies| / |technologies of either project|, in (0, 1].
+    score = models.FloatField()
+    # 1 for the most similar project.
+    position = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also serves reading a project's list in order.
+            models.UniqueConstraint(fields=['project', 'position'], name='related_project_position_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.project_id} -> {self.related_id} ({self.score:.2f})'
+
+class OutboundEmail(models.Model):
+    """
+    An email queued for delivery.
+
+    Views enqueue messages here instead of talking to the SMTP server
+    themselves; the 'process_outbox' command delivers them in batches
+    (see 'outbox.py').
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves the worker's "due pending messages" query.
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+class ImageVariantsJob(models.Model):
+    """
+    A project image whose resized copies are still to be built.
+
+    Saving a project with a new image queues (or re-targets) its job in
+    the same transaction; the 'process_outbox' worker builds the copies
+    (see 'image_jobs.py').
+    """
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True)
+    # The image name the copies are built for. A later upload re-targets
+    # the job, and the worker then leaves the newer image alone.
+    source = models.CharField(max_length=100, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'{self.project_id}: {self.source or "(no image)"}'
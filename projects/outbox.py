@@ -0,0 +1,119 @@
+"""
+Email outbox for the 'projects' app.
+
+Request handlers never talk to the SMTP server. They call `enqueue()`,
+which stores the message as an OutboundEmail row and returns at once.
+A separate worker (`manage.py process_outbox`) calls `deliver_pending()`
+to send due messages in batches over one reused connection, retrying
+failures with exponential backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger('projects.outbox')
+
+
+def enqueue(subject, body, from_email, to):
+    """Queues an email for delivery and returns the OutboundEmail."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        to=list(to),
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before retry number `attempts`: base * 2^(attempts - 1), capped."""
+    delay = settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_due(batch_size, now=None):
+    """
+    Claims up to `batch_size` due messages for this worker.
+
+    Claimed rows get a lease: their next attempt is pushed into the
+    future, so concurrent workers skip them, and a worker that dies
+    mid-batch only delays them until the lease expires.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        )
+    return batch
+
+
+def deliver_pending(batch_size=100, connection=None):
+    """
+    Sends every due message, one batch at a time, over a single
+    connection. Returns a dict counting sent, retried and failed messages.
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    batch = claim_due(batch_size)
+    if not batch:
+        return stats
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # The server is unreachable: every claimed message is retried later.
+        for email in batch:
+            stats[_record_failure(email, exc)] += 1
+        return stats
+
+    try:
+        while batch:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, email.to, connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as exc:
+                    stats[_record_failure(email, exc)] += 1
+                else:
+                    _record_success(email)
+                    stats['sent'] += 1
+            batch = claim_due(batch_size)
+    finally:
+        connection.close()
+    return stats
+
+
+def _record_success(email):
+    email.status = OutboundEmail.Status.SENT
+    email.attempts += 1
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+
+
+def _record_failure(email, exc):
+    """Schedules a retry, or gives up after OUTBOX_MAX_ATTEMPTS. Returns the outcome."""
+    email.attempts += 1
+    email.last_error = f'{type(exc).__name__}: {exc}'
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+        outcome = 'failed'
+        logger.error('Giving up on email %s after %s attempts: %s', email.pk, email.attempts, email.last_error)
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        outcome = 'retried'
+        logger.warning('Email %s failed (attempt %s), retrying: %s', email.pk, email.attempts, email.last_error)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+    return outcome
@@ -0,0 +1,195 @@
+"""
+Pagination classes for the 'projects' API.
+
+This file defines a keyset ("cursor") paginator. Instead of an OFFSET,
+each page is fetched with a WHERE clause that continues strictly after
+the last row of the previous page, so page 10,000 costs the same as
+page 1 and rows inserted between requests never shift or duplicate
+results.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates a queryset on a composite, unique ordering key.
+
+    The cursor is an opaque, URL-safe token holding the ordering values
+    of the last row served. The final field of `ordering` must be unique
+    (e.g. the primary key) so that every row has a distinct position.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, request, queryset, view):
+        """Returns the ordering tuple used to build and decode cursors."""
+        return self.ordering
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.get_page_queryset(queryset, request, view)))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Returns the lazily-evaluated slice for the requested page.
+
+        The slice fetches one extra row so `finish_page` can tell whether
+        a next page exists without running a COUNT query.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(self.clean_position(queryset, position)))
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        """Trims the look-ahead row and records the cursor for the next page."""
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self._position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = self.encode_cursor(self.next_position)
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    # --- Cursor encoding ---
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return force_str(base64.urlsafe_b64encode(payload).rstrip(b'='))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def clean_position(self, queryset, position):
+        """
+        Converts each cursor value to the type of its ordering field, or
+        raises NotFound: a well-formed cursor may still hold values that
+        the database cannot compare (e.g. ["x", 1]).
+        """
+        cleaned = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            if value is None or isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise NotFound(self.invalid_cursor_message)
+            if name in queryset.query.annotations:
+                # Annotations (e.g. the search rank) are numbers.
+                if not isinstance(value, (int, float)):
+                    raise NotFound(self.invalid_cursor_message)
+                cleaned.append(value)
+                continue
+            try:
+                cleaned.append(queryset.model._meta.get_field(name).to_python(value))
+            except (TypeError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def _position(self, row):
+        """Extracts the ordering values of a model instance or `values()` row."""
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def _after(self, position):
+        """
+        Builds the lexicographic "row comes after position" condition.
+
+        For ordering (-a, -b) this expands to
+        `a <= pa AND (a < pa OR (a = pa AND b < pb))`. The leading
+        inclusive bound lets the composite index on (a, b) answer the
+        query with a single range scan.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        first = self.ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & condition
+
+
+class ProjectCursorPagination(KeysetPagination):
+    """
+    Newest-first keyset pagination for the projects list endpoint.
+
+    Search results (querysets annotated with a full-text `rank`) are
+    paginated most-relevant-first instead.
+    """
+    ordering = ('-created_at', '-id')
+    search_ordering = ('-rank', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        if 'rank' in queryset.query.annotations:
+            return self.search_ordering
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,277 @@
+"""
+Related projects: the projects sharing the most technologies with each
+project, by Jaccard similarity (shared technologies / technologies of
+either project).
+
+Comparing a project with every other one is a self-join of the
+technology links, too slow to run on every page view, so the top
+RELATED_PROJECTS_COUNT neighbours of each project are stored as
+RelatedProject rows and read with one query.
+
+The lists are computed by one INSERT ... SELECT per batch of projects:
+the database joins the links on technology, counts the shared ones per
+pair and keeps the best pairs with ROW_NUMBER(), so no pair is ever
+loaded into Python. Ties go to the newest project.
+
+When the technologies of some projects change, `refresh_later()`
+recomputes, once the transaction commits, only the lists that can
+change: those of the changed projects, those that include them, and
+those of projects sharing a technology with them that they would now
+enter. Lists that do change mark their project as modified (see
+`_mark_modified`), so page validators and cached representations
+follow. `manage.py rebuild_related_projects` recomputes everything, in
+batches.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from . import api_cache
+from .models import Project, RelatedProject
+
+Through = Project.technologies.through
+
+BATCH_SIZE = 500
+
+# `batch` holds the links of the projects whose lists are computed, and
+# `sizes` only counts the technologies of projects that appear in a pair:
+# a refresh reads the links it needs, not the whole table.
+_PAIRS = f"""
+    WITH batch AS (
+        SELECT project_id, technology_id FROM {Through._meta.db_table}
+        WHERE project_id IN ({{placeholders}})
+    ),
+    pairs AS (
+        SELECT a.project_id AS project_id, b.project_id AS related_id, COUNT(*) AS shared
+        FROM batch a
+        JOIN {Through._meta.db_table} b
+          ON b.technology_id = a.technology_id AND b.project_id <> a.project_id
+        GROUP BY a.project_id, b.project_id
+    ),
+    sizes AS (
+        SELECT project_id, COUNT(*) AS size FROM {Through._meta.db_table}
+        WHERE project_id IN (SELECT related_id FROM pairs UNION SELECT project_id FROM batch)
+        GROUP BY project_id
+    )
+    SELECT pairs.project_id, pairs.related_id,
+           CAST(pairs.shared AS DOUBLE PRECISION) / (a.size + b.size - pairs.shared) AS score
+    FROM pairs
+    JOIN sizes a ON a.project_id = pairs.project_id
+    JOIN sizes b ON b.project_id = pairs.related_id
+"""
+
+_INSERT_TOP = f"""
+    INSERT INTO {RelatedProject._meta.db_table} (project_id, related_id, score, position)
+    SELECT project_id, related_id, score, position FROM (
+        SELECT project_id, related_id, score,
+               ROW_NUMBER() OVER (
+                   PARTITION BY project_id ORDER BY score DESC, related_id DESC
+               ) AS position
+        FROM ({_PAIRS}) pairs
+    ) ranked
+    WHERE position <= %s
+"""
+
+# While paused: the changed and stale pks collected instead of refreshed.
+_paused = ContextVar('related_projects_paused', default=None)
+# Per thread and database alias: the changed and stale pks awaiting commit.
+_pending = threading.local()
+
+
+def related_projects(project_pk, using=DEFAULT_DB_ALIAS):
+    """Returns the related projects of a project, most similar first, with one query."""
+    links = (
+        RelatedProject.objects.using(using)
+        .filter(project_id=project_pk)
+        .select_related('related')
+        .defer('related__description', 'related__search_vector', 'related__image_variants')
+        .order_by('position')
+    )
+    related = []
+    for link in links:
+        link.related.similarity = link.score
+        related.append(link.related)
+    return related
+
+
+def refresh(pks, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE):
+    """
+    Recomputes the lists of `pks`, a batch per transaction. Returns the
+    pks whose list changed.
+    """
+    pks = sorted(set(pks))
+    changed = []
+    for start in range(0, len(pks), batch_size):
+        with transaction.atomic(using=using):
+            changed += _refresh_batch(pks[start:start + batch_size], using)
+    return changed
+
+
+def rebuild(using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE, progress=None):
+    """
+    Recomputes every list, a batch of projects at a time. Calls
+    `progress(done, total)` after each batch. Returns the number of
+    projects whose list changed.
+    """
+    pks = list(Project.objects.using(using).order_by('pk').values_list('pk', flat=True))
+    changed = 0
+    for start in range(0, len(pks), batch_size):
+        with transaction.atomic(using=using):
+            changed += len(_refresh_batch(pks[start:start + batch_size], using))
+        if progress is not None:
+            progress(min(start + batch_size, len(pks)), len(pks))
+    return changed
+
+
+def listing(pks, using=DEFAULT_DB_ALIAS):
+    """Returns the pks of the projects whose list includes any of `pks`."""
+    return set(
+        RelatedProject.objects.using(using)
+        .filter(related_id__in=list(pks))
+        .values_list('project_id', flat=True)
+    )
+
+
+def invalidate_listing(pks, using=DEFAULT_DB_ALIAS):
+    """
+    Marks the projects whose list shows any of `pks` as modified, after a
+    change to what the lists show of them (their LISTED_FIELDS).
+    """
+    _mark_modified(sorted(listing(pks, using)), using)
+
+
+def refresh_later(changed, stale=(), using=DEFAULT_DB_ALIAS):
+    """
+    Refreshes the lists affected by a change to the technologies of the
+    `changed` projects once the current transaction commits (at once
+    outside of one). `stale` are more lists to refresh, e.g. those that
+    listed a deleted project, read before it was deleted.
+    """
+    collected = _paused.get()
+    if collected is not None:
+        collected['changed'].update(changed)
+        collected['stale'].update(stale)
+        return
+    pending = _pending.__dict__.setdefault(using, {'changed': set(), 'stale': set()})
+    pending['changed'].update(changed)
+    pending['stale'].update(stale)
+    # One callback per call: the first to run takes every pending pk. A
+    # failed refresh is logged, not raised: the write itself has committed.
+    transaction.on_commit(lambda: _refresh_pending(using), using=using, robust=True)
+
+
+def refresh_affected(changed, stale=(), using=DEFAULT_DB_ALIAS):
+    """
+    Refreshes, now, the lists affected by a change to the technologies of
+    the `changed` projects, and the `stale` ones (see `refresh_later()`).
+    Returns the pks whose list changed.
+    """
+    existing = set(
+        Project.objects.using(using).filter(pk__in=list(changed)).values_list('pk', flat=True)
+    )
+    return refresh(existing | set(stale) | _affected_by(existing, using), using=using)
+
+
+@contextmanager
+def paused():
+    """
+    Collects the refreshes requested inside instead of running one per
+    transaction, e.g. while importing many projects. Yields a dict of the
+    collected 'changed' and 'stale' pks, to pass to `refresh_affected()`
+    (or to skip, before a `rebuild()`).
+    """
+    collected = {'changed': set(), 'stale': set()}
+    token = _paused.set(collected)
+    try:
+        yield collected
+    finally:
+        _paused.reset(token)
+
+
+def _refresh_pending(using):
+    pending = _pending.__dict__.pop(using, None)
+    if pending is None:
+        return
+    refresh_affected(pending['changed'], pending['stale'], using=using)
+
+
+def _affected_by(changed, using):
+    """
+    The projects whose list may change when the technologies of the
+    `changed` projects did: those listing one of them, and those sharing
+    a technology with one of them that would now enter their list.
+    """
+    if not changed:
+        return set()
+    affected = listing(changed, using)
+    # Pairs are symmetric: these are (changed project, other project, score).
+    scores = defaultdict(float)
+    for batch in _batches(sorted(changed)):
+        with connections[using].cursor() as cursor:
+            cursor.execute(_PAIRS.format(placeholders=_placeholders(batch)), batch)
+            for _, other, score in cursor.fetchall():
+                scores[other] = max(scores[other], score)
+    lists = defaultdict(list)
+    for project_id, score in (
+        RelatedProject.objects.using(using)
+        .filter(project_id__in=list(scores))
+        .values_list('project_id', 'score')
+    ):
+        lists[project_id].append(score)
+    for other, score in scores.items():
+        current = lists.get(other, [])
+        # `>=`: a tie may go to the changed project, if it is newer.
+        if len(current) < settings.RELATED_PROJECTS_COUNT or score >= min(current):
+            affected.add(other)
+    return affected
+
+
+def _refresh_batch(pks, using):
+    """Rewrites the lists of `pks`. Returns the pks whose list changed."""
+    before = _lists(pks, using)
+    RelatedProject.objects.using(using).filter(project_id__in=pks).delete()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            _INSERT_TOP.format(placeholders=_placeholders(pks)), [*pks, settings.RELATED_PROJECTS_COUNT]
+        )
+    after = _lists(pks, using)
+    changed = [pk for pk in pks if before.get(pk) != after.get(pk)]
+    _mark_modified(changed, using)
+    return changed
+
+
+def _lists(pks, using):
+    lists = defaultdict(list)
+    for project_id, related_id, score in (
+        RelatedProject.objects.using(using)
+        .filter(project_id__in=pks)
+        .order_by('project_id', 'position')
+        .values_list('project_id', 'related_id', 'score')
+    ):
+        lists[project_id].append((related_id, score))
+    return lists
+
+
+def _mark_modified(pks, using):
+    """
+    A new list changes the detail page of its project: bump `updated_at`,
+    which its conditional GET validators are keyed on, as 'signals.py'
+    does when a project's technologies or category change.
+    """
+    if pks:
+        Project.objects.using(using).filter(pk__in=pks).update(updated_at=timezone.now())
+        api_cache.invalidate_projects(pks)
+
+
+def _batches(pks):
+    for start in range(0, len(pks), BATCH_SIZE):
+        yield pks[start:start + BATCH_SIZE]
+
+
+def _placeholders(pks):
+    return ', '.join(['%s'] * len(pks))
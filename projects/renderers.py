@@ -0,0 +1,64 @@
+"""
+API renderers for the 'projects' app.
+
+ORJSONRenderer encodes responses with orjson, several times faster than
+the standard library encoder used by DRF's JSONRenderer, while producing
+the same bytes: compact separators, UTF-8 output and escaped U+2028 /
+U+2029. Values orjson does not handle the same way (datetimes, lazy
+strings, decimals, ...) are passed to DRF's encoder.
+
+NDJSONRenderer and CSVRenderer let the export endpoint negotiate its
+format (`?format=csv`, `Accept: text/csv`). The export itself streams
+its own bytes (see 'export.py'); the renderers only encode the other
+responses of the endpoint, such as errors.
+"""
+import csv
+import io
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in replacement for JSONRenderer, backed by orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only indents by two spaces: leave indented output to DRF.
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(data, default=JSONEncoder().default, option=OPTIONS)
+        # Like JSONRenderer: keep the output valid inside JavaScript strings.
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renders data as a single JSON line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return ORJSONRenderer().render(data) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """Renders a dict (e.g. an error) as a header row and a value row."""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(data.keys())
+        writer.writerow(data.values())
+        return buffer.getvalue().encode(self.charset)
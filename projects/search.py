@@ -0,0 +1,141 @@
+"""
+Full-text search for the 'projects' app.
+
+Projects are searched through a real full-text index instead of
+`icontains` scans:
+
+- PostgreSQL: the `Project.search_vector` tsvector column (title weighted
+  above description), backed by a GIN index.
+- SQLite: an FTS5 shadow table, `projects_project_fts`, keyed by the
+  project's primary key. Used for local development and the test suite.
+
+Both indexes are created by migration 0010 and kept in sync by the
+receivers in 'signals.py'. Any other database falls back to unindexed
+`icontains` matching.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+FTS_TABLE = 'projects_project_fts'
+SEARCH_CONFIG = 'english'
+
+# The tsvector stored for each project. Title matches rank above description matches.
+SEARCH_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+)
+
+# bm25() column weights for (title, description), mirroring the A/B weights above.
+FTS_RANK = f"-bm25({FTS_TABLE}, 10.0, 1.0)"
+
+# Keeps `IN (...)` lists under SQLite's bound-parameter limit.
+BATCH_SIZE = 500
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_projects(queryset, query):
+    """
+    Filters a Project queryset down to matches for `query`.
+
+    The result is annotated with `rank` (higher is more relevant) but is
+    not ordered, so callers can combine it with their own ordering.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        # ts_rank() returns a float4; cast it so ranks round-trip exactly in cursors.
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), search_query), FloatField())
+        )
+
+    if vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT {FTS_RANK} FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    return queryset.filter(
+        Q(title__icontains=query) | Q(description__icontains=query)
+    ).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def _fts5_query(query):
+    """
+    Turns free text into a safe FTS5 MATCH expression.
+
+    Each word is quoted, so FTS5 operators and punctuation typed by the
+    user are matched literally instead of raising a syntax error. Words
+    are implicitly ANDed, like websearch_to_tsquery() on PostgreSQL.
+    """
+    return ' '.join(f'"{term}"' for term in _TERM_RE.findall(query))
+
+
+# --- Index maintenance ---
+
+def index_projects(pks, using='default'):
+    """(Re)indexes the given projects from their current database rows."""
+    from .models import Project
+
+    connection = connections[using]
+    for batch in _batches(pks):
+        if connection.vendor == 'postgresql':
+            Project.objects.using(using).filter(pk__in=batch).update(search_vector=SEARCH_VECTOR)
+        elif connection.vendor == 'sqlite':
+            placeholders = ', '.join(['%s'] * len(batch))
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                    f"SELECT id, title, description FROM {Project._meta.db_table} "
+                    f"WHERE id IN ({placeholders})",
+                    batch,
+                )
+
+
+def unindex_projects(pks, using='default'):
+    """Removes deleted projects from the SQLite shadow table."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    for batch in _batches(pks):
+        placeholders = ', '.join(['%s'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", batch)
+
+
+def rebuild_index(using='default'):
+    """Rebuilds the whole search index, e.g. after raw SQL writes."""
+    from .models import Project
+
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        Project.objects.using(using).update(search_vector=SEARCH_VECTOR)
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                f"SELECT id, title, description FROM {Project._meta.db_table}"
+            )
+
+
+def _batches(pks):
+    pks = list(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        yield pks[start:start + BATCH_SIZE]
@@ -1,5 +1,8 @@
+from django.utils.text import Truncator
 from rest_framework import serializers
 from .models import Project, Technology, Category
+from .images import rendition_urls
+from .uploads import IMAGE_TYPES, validate_upload_key
 
 class TechnologySerializer(serializers.ModelSerializer):
     """Serializer to map the Technology model to JSON."""
@@ -17,6 +20,13 @@ class ProjectSerializer(serializers.ModelSerializer):
     """
     Serializer to map the Project model to JSON.
     Includes nested serializers for readable relationships.
+
+    Writes accept either an `image` file or the `image_key` of an image
+    uploaded straight to storage (see 'uploads.py').
+
+    Reads can be limited to a sparse fieldset with `fields` (see
+    'fieldsets.py'). `excerpt`, the start of the description shown on
+    cards, is only included when asked for.
     """
     technologies = serializers.SlugRelatedField(
         many=True,
@@ -29,6 +39,9 @@ class ProjectSerializer(serializers.ModelSerializer):
     )
     
     url = serializers.HyperlinkedIdentityField(view_name='project-detail')
+    images = serializers.SerializerMethodField()
+    image_key = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    excerpt = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
@@ -39,7 +52,78 @@ class ProjectSerializer(serializers.ModelSerializer):
             'description', 
             'link', 
             'image', 
+            'images',
+            'image_key',
             'created_at',
             'category', 
-            'technologies'
-        )
\ No newline at end of file
+            'technologies',
+            'excerpt',
+        )
+
+    # Words in `excerpt`, as on the project cards, and the characters of
+    # the description loaded for it (see 'fieldsets.py').
+    EXCERPT_WORDS = 20
+    EXCERPT_CHARS = 300
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(fields) if fields is not None else set(self.fields) - {'excerpt'}
+        for name in set(self.fields) - keep:
+            del self.fields[name]
+
+    def get_excerpt(self, project):
+        """The first words of the description (from `description_start` when annotated)."""
+        text = getattr(project, 'description_start', None)
+        if text is None:
+            text = project.description[:self.EXCERPT_CHARS + 1]
+        return self.make_excerpt(text)
+
+    @classmethod
+    def make_excerpt(cls, text):
+        """Shortens the first EXCERPT_CHARS + 1 characters of a description."""
+        excerpt = Truncator(text).words(cls.EXCERPT_WORDS)
+        if excerpt == text and len(text) > cls.EXCERPT_CHARS:
+            # Fewer words than that fit: cut at the last whole one.
+            excerpt = text[:cls.EXCERPT_CHARS].rsplit(None, 1)[0] + '…'
+        return excerpt
+
+    def get_images(self, project):
+        """Resized WebP/JPEG copies of the image, with absolute URLs."""
+        request = self.context.get('request')
+        build_url = request.build_absolute_uri if request is not None else None
+        return rendition_urls(project, build_url=build_url)
+
+    def validate_image_key(self, key):
+        return validate_upload_key(key) if key else key
+
+    def validate(self, attrs):
+        key = attrs.pop('image_key', '')
+        if key:
+            attrs['image'] = key
+        return attrs
+
+class BulkProjectSerializer(serializers.ModelSerializer):
+    """
+    One item of a batch write (see 'bulk.py'). Category and technology
+    names, and the uniqueness of titles, are checked by 'bulk.py' with
+    one query per batch instead of one per item.
+    """
+    id = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.CharField(max_length=50, allow_null=True, required=False)
+    technologies = serializers.ListField(child=serializers.CharField(max_length=50))
+
+    class Meta:
+        model = Project
+        fields = ('id', 'title', 'description', 'link', 'category', 'technologies')
+        extra_kwargs = {'title': {'validators': []}}
+
+    def validate(self, attrs):
+        # Partial (PATCH) items update an existing project, named by id.
+        if self.partial and 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'This field is required.'})
+        return attrs
+
+class ImageUploadSerializer(serializers.Serializer):
+    """Request body for presigning a direct image upload."""
+    filename = serializers.CharField(max_length=200)
+    content_type = serializers.ChoiceField(choices=sorted(IMAGE_TYPES))
@@ -0,0 +1,276 @@
+"""
+Signal receivers for the 'projects' app.
+
+This file keeps derived data in sync with the core models. Receivers
+are connected when the app is ready (see 'apps.py').
+
+Batch writes (see 'bulk.py') bypass the per-instance signals and send
+one `projects_bulk_changed` signal per batch instead (and recount the
+facet counters they touch themselves).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import api_cache, facets, image_jobs, related, search
+from .models import LISTED_FIELDS, Category, Project, Technology
+
+# Sent with `saved` and `deleted` lists of project pks, `created` (the
+# saved ones that are new) and `using`.
+projects_bulk_changed = Signal()
+
+Through = Project.technologies.through
+
+_in_bulk_write = ContextVar('projects_in_bulk_write', default=False)
+
+
+@contextmanager
+def bulk_write():
+    """
+    Silences the per-project receivers below, e.g. while a queryset
+    `delete()` sends `post_delete` for every row of a batch. The caller
+    sends `projects_bulk_changed` for the whole batch instead.
+    """
+    token = _in_bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _in_bulk_write.reset(token)
+
+
+# --- Full-text search index ---
+
+@receiver(post_save, sender=Project)
+def index_saved_project(sender, instance, using, **kwargs):
+    """Refreshes the full-text index entry of a created or edited project."""
+    search.index_projects([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_deleted_project(sender, instance, using, **kwargs):
+    """Drops a deleted project from the full-text index."""
+    if _in_bulk_write.get():
+        return
+    search.unindex_projects([instance.pk], using=using)
+
+
+@receiver(projects_bulk_changed, sender=Project)
+def reindex_bulk_changed(sender, saved, deleted, using, **kwargs):
+    """Reindexes the projects of a batch write in a few statements."""
+    search.index_projects(saved, using=using)
+    search.unindex_projects(deleted, using=using)
+
+
+# --- Image derivatives ---
+
+@receiver(post_save, sender=Project)
+def queue_image_variants(sender, instance, raw, using, **kwargs):
+    """Queues resized copies when a project's image is uploaded or changed."""
+    if raw or not image_jobs.needs_build(instance):
+        return
+    # Queued in the save's transaction: the worker sees the job only
+    # once it commits.
+    image_jobs.queue(instance, using=using)
+
+
+# --- Facet counters ---
+
+@receiver(pre_save, sender=Project)
+def remember_previous_category(sender, instance, using, update_fields, **kwargs):
+    """Reads the stored category of a project saved without being loaded first."""
+    if instance._state.adding or hasattr(instance, '_loaded_category_id') or not _saves_category(update_fields):
+        return
+    instance._loaded_category_id = (
+        Project.objects.using(using).filter(pk=instance.pk).values_list('category_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Project)
+def count_saved_project(sender, instance, created, using, update_fields, **kwargs):
+    """Moves a project between category counters when its category changes."""
+    if not _saves_category(update_fields):
+        return
+    previous = None if created else getattr(instance, '_loaded_category_id', instance.category_id)
+    if previous != instance.category_id:
+        facets.adjust(Category, [previous], -1, using)
+        facets.adjust(Category, [instance.category_id], 1, using)
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_technologies(sender, instance, using, **kwargs):
+    # The through rows are deleted before post_delete, without m2m_changed.
+    if _in_bulk_write.get():
+        return
+    instance._technology_pks = list(
+        Through.objects.using(using).filter(project_id=instance.pk).values_list('technology_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def count_deleted_project(sender, instance, using, **kwargs):
+    if _in_bulk_write.get():
+        return
+    facets.adjust(Technology, getattr(instance, '_technology_pks', []), -1, using)
+    facets.adjust(Category, [instance.category_id], -1, using)
+
+
+@receiver(m2m_changed, sender=Through)
+def count_project_technologies(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """
+    Adjusts the technology counters for added and removed links.
+
+    `pk_set` of a removal lists what the caller asked to remove, so the
+    links that really go are read before they are deleted.
+    """
+    own, other = ('technology_id', 'project_id') if reverse else ('project_id', 'technology_id')
+    if action in ('pre_remove', 'pre_clear'):
+        links = Through.objects.using(using).filter(**{own: instance.pk})
+        if pk_set is not None:
+            links = links.filter(**{f'{other}__in': pk_set})
+        instance._unlinked_pks = list(links.values_list(other, flat=True))
+        return
+    if action == 'post_add':
+        pks, delta = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        pks, delta = instance.__dict__.pop('_unlinked_pks', []), -1
+    else:
+        return
+    if reverse:
+        facets.adjust(Technology, [instance.pk], delta * len(pks), using)
+    else:
+        facets.adjust(Technology, pks, delta, using)
+
+
+# --- API representation cache and conditional GET validators ---
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project(sender, instance, created=False, **kwargs):
+    if _in_bulk_write.get():
+        return
+    # A new project is in no cache yet, but in the cached lists.
+    api_cache.invalidate_projects([] if created else [instance.pk])
+
+
+@receiver(projects_bulk_changed, sender=Project)
+def invalidate_bulk_changed(sender, saved, deleted, created=(), **kwargs):
+    created = set(created)
+    api_cache.invalidate_projects([*(pk for pk in saved if pk not in created), *deleted])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Technology)
+def invalidate_renamed_relation(sender, instance, created, using, **kwargs):
+    """A renamed category or technology changes every project that shows it."""
+    if not created:
+        _relations_changed(_project_pks(instance, using), using)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Technology)
+def remember_projects_of_deleted_relation(sender, instance, using, **kwargs):
+    # The links are gone by post_delete (SET_NULL / through-row cascade),
+    # so collect the affected projects while they can still be queried.
+    instance._affected_project_pks = _project_pks(instance, using)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Technology)
+def invalidate_deleted_relation(sender, instance, using, **kwargs):
+    _relations_changed(getattr(instance, '_affected_project_pks', []), using)
+
+
+@receiver(m2m_changed, sender=Through)
+def invalidate_project_technologies(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """
+    Invalidates projects whose technology list changed.
+
+    For reverse changes (`technology.project_set.add(...)`) the instance
+    is a Technology and `pk_set` holds project pks.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _relations_changed([instance.pk], using)
+    elif action == 'pre_clear':
+        instance._affected_project_pks = _project_pks(instance, using)
+    elif action == 'post_clear':
+        _relations_changed(getattr(instance, '_affected_project_pks', []), using)
+    elif action in ('post_add', 'post_remove'):
+        _relations_changed(pk_set, using)
+
+
+# --- Related projects ---
+
+@receiver(m2m_changed, sender=Through)
+def refresh_related_projects(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Recomputes the related projects affected by a change of technologies, on commit."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        related.refresh_later([instance.pk], using=using)
+    elif action == 'post_clear':
+        related.refresh_later(getattr(instance, '_affected_project_pks', []), using=using)
+    else:
+        related.refresh_later(pk_set, using=using)
+
+
+@receiver(post_save, sender=Project)
+def invalidate_lists_showing_project(sender, instance, created, raw, using, update_fields, **kwargs):
+    """A renamed, relinked or re-imaged project changes the lists that show it."""
+    if update_fields is not None and update_fields.isdisjoint(LISTED_FIELDS):
+        return
+    values = instance.listed_values()
+    loaded = getattr(instance, '_loaded_listed_values', {})
+    instance._loaded_listed_values = values
+    if created or raw or (loaded == values and len(values) == len(LISTED_FIELDS)):
+        return
+    related.invalidate_listing([instance.pk], using=using)
+
+
+@receiver(pre_delete, sender=Project)
+def remember_lists_of_deleted_project(sender, instance, using, **kwargs):
+    # Its RelatedProject rows are cascaded: find the lists it was in first.
+    if _in_bulk_write.get():
+        return
+    instance._listed_by_pks = related.listing([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Project)
+def refresh_lists_of_deleted_project(sender, instance, using, **kwargs):
+    if _in_bulk_write.get():
+        return
+    related.refresh_later([], stale=getattr(instance, '_listed_by_pks', []), using=using)
+
+
+@receiver(post_delete, sender=Technology)
+def refresh_projects_of_deleted_technology(sender, instance, using, **kwargs):
+    related.refresh_later(getattr(instance, '_affected_project_pks', []), using=using)
+
+
+def _saves_category(update_fields):
+    return update_fields is None or not update_fields.isdisjoint({'category', 'category_id'})
+
+
+def _relations_changed(pks, using):
+    """
+    Marks projects as modified after a change to their technologies or
+    category: bumps `updated_at`, which the conditional GET validators and
+    fragment caches are keyed on, and drops their cached representations.
+    """
+    pks = list(pks)
+    if pks:
+        Project.objects.using(using).filter(pk__in=pks).update(updated_at=timezone.now())
+    api_cache.invalidate_projects(pks)
+
+
+def _project_pks(instance, using):
+    """Returns the pks of the projects linked to a Category or Technology."""
+    if isinstance(instance, Category):
+        projects = Project.objects.using(using).filter(category=instance)
+    else:
+        projects = Project.objects.using(using).filter(technologies=instance)
+    return list(projects.values_list('pk', flat=True))
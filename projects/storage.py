@@ -0,0 +1,95 @@
+"""
+Storage backends for the 'projects' app.
+
+Both backends add a presigned-upload contract to a regular Django
+storage, so that browsers and API clients can upload project images
+straight to the storage instead of streaming them through a web worker:
+
+    presigned_upload(name, content_type, max_size, expires_in)
+        -> {'url': ..., 'fields': {...}}
+
+The client sends a multipart POST to `url` with every entry of `fields`
+followed by the file itself in a field named `file`, then submits only
+the object name (see 'uploads.py').
+
+- PresignedS3Storage signs an S3 POST policy (production).
+- PresignedFileSystemStorage is a local stand-in that signs the same
+  conditions with SECRET_KEY and accepts the POST in the
+  `projects:direct_upload` view, so the flow works offline and in tests.
+"""
+import time
+
+from django.core import signing
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+UPLOAD_SALT = 'projects.storage.upload'
+
+
+class UploadRejected(Exception):
+    """Raised when a direct upload does not satisfy its signed policy."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class PresignedS3Storage(S3Boto3Storage):
+    """S3 storage that can presign browser POST uploads."""
+
+    def presigned_upload(self, name, content_type, max_size, expires_in):
+        key = self._normalize_name(clean_name(name))
+        return self.connection.meta.client.generate_presigned_post(
+            Bucket=self.bucket_name,
+            Key=key,
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
+
+
+class PresignedFileSystemStorage(FileSystemStorage):
+    """Local storage with the same presign contract as PresignedS3Storage."""
+
+    def presigned_upload(self, name, content_type, max_size, expires_in):
+        policy = {
+            'key': name,
+            'content_type': content_type,
+            'max_size': max_size,
+            'expires': int(time.time()) + expires_in,
+        }
+        return {
+            'url': reverse('projects:direct_upload'),
+            'fields': {
+                'key': name,
+                'Content-Type': content_type,
+                'policy': signing.dumps(policy, salt=UPLOAD_SALT),
+            },
+        }
+
+    def accept_upload(self, fields, file):
+        """
+        Stores a direct upload after checking it against its signed
+        policy, like S3 does. Returns the stored name.
+        """
+        try:
+            policy = signing.loads(fields.get('policy', ''), salt=UPLOAD_SALT)
+        except signing.BadSignature:
+            raise UploadRejected('Invalid upload policy.', status=403)
+
+        if policy['expires'] < time.time():
+            raise UploadRejected('Upload policy expired.', status=403)
+        if fields.get('key') != policy['key'] or fields.get('Content-Type') != policy['content_type']:
+            raise UploadRejected('Upload fields do not match the policy.', status=403)
+        if file is None:
+            raise UploadRejected('No file was uploaded.')
+        if not 0 < file.size <= policy['max_size']:
+            raise UploadRejected('Uploaded file size is outside the allowed range.')
+        if self.exists(policy['key']):
+            raise UploadRejected('An object already exists at this key.', status=409)
+        return self.save(policy['key'], file)
@@ -0,0 +1,51 @@
+"""
+Template tags for rendering project images.
+
+`{% project_picture project "card" %}` renders a <picture> element with
+WebP and JPEG `srcset`s built from the project's resized copies, explicit
+width/height (so the layout does not shift) and lazy loading.
+"""
+from django import template
+
+register = template.Library()
+
+# Layout-specific settings: the renditions offered in each srcset, the
+# one whose size fills the width/height attributes, and the `sizes` hint.
+LAYOUTS = {
+    'card': {
+        'renditions': ('card', 'card_2x'),
+        'base': 'card',
+        'sizes': '(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw',
+    },
+    'detail': {
+        'renditions': ('card_2x', 'detail', 'detail_2x'),
+        'base': 'detail',
+        'sizes': '(min-width: 992px) 66vw, 100vw',
+    },
+}
+
+
+@register.inclusion_tag('projects/includes/picture.html')
+def project_picture(project, layout, css_class='', style=''):
+    settings = LAYOUTS[layout]
+    context = {
+        'project': project,
+        'css_class': css_class,
+        'style': style,
+        'sizes': settings['sizes'],
+        'picture': None,
+    }
+    renditions = project.image_renditions
+    if renditions:
+        offered = {}
+        for name in settings['renditions']:
+            if name in renditions:
+                # Renditions of a narrow source share a width; offer it once.
+                offered.setdefault(renditions[name]['width'], renditions[name])
+        offered = offered.values()
+        context['picture'] = {
+            'base': renditions[settings['base']],
+            'webp_srcset': ', '.join(f"{r['webp']} {r['width']}w" for r in offered),
+            'jpeg_srcset': ', '.join(f"{r['jpeg']} {r['width']}w" for r in offered),
+        }
+    return context
@@ -8,6 +8,7 @@ anonymous and authenticated users.
 import pytest
 from django.urls import reverse
 from projects.models import Project, Technology, Category 
+from projects.pagination import KeysetPagination
 
 # --- INTEGRATION TESTS: REST API Security and CRUD ---
 
@@ -74,4 +75,336 @@ def test_api_project_creation_and_database_write(admin_client):
     new_project = Project.objects.get(title='API Test Project')
     assert new_project.link == 'http://apitest.com'
     assert new_project.category.name == 'Web Development'
-    assert new_project.technologies.count() == 2
\ No newline at end of file
+    assert new_project.technologies.count() == 2
+# --- Keyset Pagination Tests ---
+
+@pytest.mark.django_db
+def test_project_api_list_is_paginated_by_cursor(client):
+    """
+    Tests that the project list is served newest-first in pages, and that
+    following the 'next' links visits every project exactly once.
+    """
+    for i in range(5):
+        Project.objects.create(title=f"Project {i}", description="Paginated.")
+
+    response = client.get(reverse('project-list'), {'page_size': 2})
+    assert response.status_code == 200
+    assert [p['title'] for p in response.json()['results']] == ['Project 4', 'Project 3']
+
+    titles = []
+    url = f"{reverse('project-list')}?page_size=2"
+    while url:
+        data = client.get(url).json()
+        titles.extend(p['title'] for p in data['results'])
+        url = data['next']
+
+    assert titles == [f"Project {i}" for i in reversed(range(5))]
+
+@pytest.mark.django_db
+def test_project_api_cursor_is_stable_under_concurrent_inserts(client):
+    """
+    Tests that a project created between two page requests does not shift
+    the next page (no duplicates, no skipped rows).
+    """
+    for i in range(4):
+        Project.objects.create(title=f"Project {i}", description="Paginated.")
+
+    first = client.get(reverse('project-list'), {'page_size': 2}).json()
+    Project.objects.create(title="Inserted Meanwhile", description="New.")
+    second = client.get(first['next']).json()
+
+    assert [p['title'] for p in second['results']] == ['Project 1', 'Project 0']
+    assert second['next'] is None
+
+@pytest.mark.django_db
+def test_project_api_rejects_invalid_cursor(client):
+    """Tests that a tampered cursor returns 404 instead of a server error."""
+    response = client.get(reverse('project-list'), {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('position', [["x", 1], [1, 2], [None, None], ["2024-01-01T00:00:00+00:00", "x"]])
+def test_project_api_rejects_cursor_with_wrong_types(client, test_project, position):
+    """Tests that a well-formed cursor holding values of the wrong type returns 404."""
+    cursor = KeysetPagination().encode_cursor(position)
+    response = client.get(reverse('project-list'), {'cursor': cursor})
+    assert response.status_code == 404
+
+# --- Full-Text Search Tests ---
+
+@pytest.mark.django_db
+def test_project_api_search_ranks_title_matches_first(client):
+    """
+    Tests that '?q=' only returns matching projects and ranks a title
+    match above a description-only match.
+    """
+    Project.objects.create(title="Weather Dashboard", description="Charts built with Django.")
+    Project.objects.create(title="Django Portfolio", description="A personal website.")
+    Project.objects.create(title="Data Pipeline", description="Batch jobs in Go.")
+
+    response = client.get(reverse('project-list'), {'q': 'django'})
+
+    assert response.status_code == 200
+    titles = [p['title'] for p in response.json()['results']]
+    assert titles == ['Django Portfolio', 'Weather Dashboard']
+
+@pytest.mark.django_db
+def test_project_api_search_follows_edits_and_deletes(client, test_project, django_capture_on_commit_callbacks):
+    """Tests that the search index is kept in sync when projects change."""
+    url = reverse('project-list')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_project.description = "Now mentions kubernetes."
+        test_project.save()
+    assert [p['id'] for p in client.get(url, {'q': 'kubernetes'}).json()['results']] == [test_project.pk]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_project.delete()
+    assert client.get(url, {'q': 'kubernetes'}).json()['results'] == []
+
+@pytest.mark.django_db
+def test_project_api_search_treats_operators_as_text(client, test_project):
+    """Tests that search syntax characters in '?q=' do not cause errors."""
+    response = client.get(reverse('project-list'), {'q': 'test" (project* -'})
+    assert response.status_code == 200
+    assert [p['id'] for p in response.json()['results']] == [test_project.pk]
+
+# --- Representation Cache Tests ---
+
+@pytest.mark.django_db
+def test_project_api_cache_serves_repeat_reads_and_counts_hits(client, admin_client, test_project):
+    """
+    Tests that repeated reads are served from the cache (running only the
+    conditional GET validator query) and that the hit rate is reported by
+    the cache-stats endpoint.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    url = reverse('project-list')
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get(url)
+
+    assert second.json() == first.json()
+    assert len(queries) == 1
+
+    stats = admin_client.get(reverse('project-cache-stats')).json()
+    assert stats['list'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+@pytest.mark.django_db
+def test_project_api_cache_is_keyed_by_int_pk(client, test_project, django_capture_on_commit_callbacks):
+    """Tests that a detail URL with a zero-padded pk is invalidated like any other."""
+    url = f'/api/projects/0{test_project.pk}/'
+    assert client.get(url).json()['title'] == test_project.title
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_project.title = "Renamed"
+        test_project.save()
+
+    assert client.get(url).json()['title'] == "Renamed"
+
+@pytest.mark.django_db
+def test_project_api_cache_stats_are_admin_only(client):
+    """Tests that anonymous users cannot read the cache statistics."""
+    response = client.get(reverse('project-cache-stats'))
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_project_api_cache_is_invalidated_by_related_changes(
+    client, test_project, test_technology, django_capture_on_commit_callbacks,
+):
+    """
+    Tests that cached list and detail responses are refreshed when the
+    project, one of its technologies or its category changes.
+    """
+    list_url = reverse('project-list')
+    detail_url = reverse('project-detail', args=[test_project.pk])
+
+    def technologies():
+        return client.get(detail_url).json()['technologies']
+
+    def list_titles():
+        return [p['title'] for p in client.get(list_url).json()['results']]
+
+    assert technologies() == ['JavaScript']
+    assert list_titles() == ['Test Project 1']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_technology.name = "TypeScript"
+        test_technology.save()
+    assert technologies() == ['TypeScript']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_project.technologies.add(Technology.objects.create(name="React"))
+    assert sorted(technologies()) == ['React', 'TypeScript']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_technology.delete()
+    assert technologies() == ['React']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category = Category.objects.create(name="Frontend")
+        test_project.category = category
+        test_project.title = "Renamed Project"
+        test_project.save()
+    assert list_titles() == ['Renamed Project']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category.delete()
+    assert client.get(detail_url).json()['category'] is None
+
+# --- Conditional GET Tests ---
+
+@pytest.mark.django_db
+def test_project_api_returns_304_for_unchanged_list(client, test_project):
+    """
+    Tests that a list request carrying the previous ETag gets 304 until a
+    project is deleted.
+    """
+    url = reverse('project-list')
+    Project.objects.create(title="Older Project", description="Will be deleted.")
+    etag = client.get(url)['ETag']
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b''
+
+    Project.objects.get(title="Older Project").delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+@pytest.mark.django_db
+def test_project_api_detail_validators_follow_technology_changes(
+    client, test_project, django_capture_on_commit_callbacks,
+):
+    """
+    Tests that a project's ETag and Last-Modified change when a technology
+    is added to it, although the project row itself was not saved.
+    """
+    url = reverse('project-detail', args=[test_project.pk])
+    first = client.get(url)
+    assert 'Last-Modified' in first
+
+    with django_capture_on_commit_callbacks(execute=True):
+        test_project.technologies.add(Technology.objects.create(name="Vue"))
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 200
+    assert 'Vue' in response.json()['technologies']
+
+@pytest.mark.django_db
+def test_project_api_returns_404_for_non_numeric_pk(client):
+    """Tests that a pk that is not a number is a 404, not a server error."""
+    assert client.get('/api/projects/abc/').status_code == 404
+    assert client.get('/api/projects/abc/related/').status_code == 404
+
+# --- Sparse Fieldset Tests ---
+
+@pytest.mark.django_db
+def test_project_api_fields_select_output_and_columns(client, test_project):
+    """
+    Tests that `?fields=` trims each project to the listed fields, and
+    that neither the description column nor the technologies are loaded.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    test_project.description = ' '.join(f'word{number}' for number in range(50))
+    test_project.save()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('project-list'), {'fields': 'id,title,excerpt'})
+
+    assert response.status_code == 200
+    project = response.json()['results'][0]
+    assert list(project) == ['id', 'title', 'excerpt']
+    assert project['excerpt'] == ' '.join(f'word{number}' for number in range(20)) + '…'
+    sql = ' '.join(query['sql'] for query in queries)
+    assert ', "projects_project"."description"' not in sql
+    assert '"description_start"' in sql
+    assert 'projects_technology' not in sql
+
+@pytest.mark.django_db
+def test_project_api_omit_drops_fields(client, test_project):
+    data = client.get(reverse('project-detail', args=[test_project.pk]), {'omit': 'description,url'}).json()
+    assert 'description' not in data and 'url' not in data and 'excerpt' not in data
+    assert data['technologies'] == ['JavaScript']
+
+    response = client.get(reverse('project-list'), {'fields': 'title,secret'})
+    assert response.status_code == 400
+    assert response.json() == {'fields': ['Unknown field(s): secret.']}
+
+@pytest.mark.django_db
+def test_project_api_sparse_reads_are_not_cached_as_full_representations(client, test_project):
+    url = reverse('project-detail', args=[test_project.pk])
+    assert list(client.get(url, {'fields': 'title'}).json()) == ['title']
+    assert client.get(url).json()['description'] == test_project.description
+    assert list(client.get(url, {'fields': 'title'}).json()) == ['title']
+
+# --- Fast Read Path Tests ---
+
+@pytest.fixture
+def varied_projects(test_project):
+    """Projects covering every shape of field value the list can return."""
+    category = Category.objects.create(name="Ünicode Category")
+    python = Technology.objects.create(name="Python")
+    django = Technology.objects.create(name="Django")
+    full = Project.objects.create(
+        title="Full\u2028Project",
+        description="Line\u2028separators\u2029, \"quotes\", émojis 🚀 and <tags>. " * 20,
+        link="https://example.com/full",
+        category=category,
+        image="project_images/full.png",
+        image_variants={
+            'source': 'project_images/full.png',
+            'renditions': {'card': {
+                'width': 400, 'height': 300,
+                'webp': 'project_images/full__card.webp', 'jpeg': 'project_images/full__card.jpg',
+            }},
+        },
+    )
+    full.technologies.add(python, django)
+    Project.objects.create(title="Bare Project", description="", link=None)
+    return Project.objects.for_detail().order_by('-created_at', '-id')
+
+@pytest.mark.parametrize('fields', [None, ('url', 'title', 'excerpt', 'images', 'technologies'), ('id', 'category')])
+@pytest.mark.django_db
+def test_project_rows_match_serializer_byte_for_byte(rf, varied_projects, fields):
+    """
+    Tests that the values()-based read path renders exactly the JSON of
+    ProjectSerializer, for the default and for sparse fieldsets.
+    """
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from projects.fieldsets import restrict
+    from projects.renderers import ORJSONRenderer
+    from projects.representations import ProjectRows
+    from projects.serializers import ProjectSerializer
+
+    request = Request(rf.get('/api/projects/', HTTP_HOST='testserver'))
+    queryset = restrict(varied_projects, fields)
+    serialized = ProjectSerializer(queryset, many=True, fields=fields, context={'request': request}).data
+
+    rows = ProjectRows(request, fields)
+    represented = rows.represent(list(rows.values(queryset)))
+
+    assert ORJSONRenderer().render(represented) == JSONRenderer().render(serialized)
+
+@pytest.mark.django_db
+def test_orjson_renderer_matches_drf_json_renderer():
+    import datetime
+    import decimal
+    from django.utils.translation import gettext_lazy
+    from rest_framework.exceptions import ErrorDetail
+    from rest_framework.renderers import JSONRenderer
+    from projects.renderers import ORJSONRenderer
+
+    data = {
+        'text': 'a\u2028b\u2029c "é" </script>',
+        'error': [ErrorDetail('Invalid.', code='invalid')],
+        'lazy': gettext_lazy('Not found.'),
+        'when': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'amount': decimal.Decimal('1.50'),
+        'nested': [{'n': 1, 'none': None, 'flag': True}],
+    }
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert ORJSONRenderer().render(None) == b''
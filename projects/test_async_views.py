@@ -0,0 +1,108 @@
+"""
+Tests for the projects application's async views (ASGI deployments).
+
+Every test runs against the ASGI URL configuration. The pages and JSON
+API reads must behave exactly like their synchronous counterparts,
+including conditional GET, caching and query instrumentation.
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from .models import Project, Category, Technology
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls('portfolio_project.async_urls')]
+
+@pytest.fixture
+def many_projects(test_technology):
+    projects = []
+    for number in range(5):
+        project = Project.objects.create(title=f"Async Project {number}", description="Served asynchronously.")
+        project.technologies.add(test_technology)
+        projects.append(project)
+    return projects
+
+def test_async_pages_render(client, many_projects, test_technology):
+    """Tests the index, detail and technology pages served by async views."""
+    index = client.get(reverse('projects:project_index'))
+    assert index.status_code == 200
+    assert "Async Project 4" in index.content.decode()
+
+    detail = client.get(reverse('projects:project_detail', args=[many_projects[0].pk]))
+    assert detail.status_code == 200
+    assert test_technology.name in detail.content.decode()
+
+    technology = client.get(reverse('projects:technology_detail', args=[test_technology.name]))
+    assert technology.status_code == 200
+    assert "Async Project 2" in technology.content.decode()
+
+def test_async_pages_return_404(client):
+    assert client.get(reverse('projects:project_detail', args=[999])).status_code == 404
+    assert client.get(reverse('projects:technology_detail', args=['Nope'])).status_code == 404
+
+def test_async_pages_answer_conditional_requests(admin_client, many_projects):
+    """Tests that the async ETag matches the user-aware sync one and yields 304."""
+    url = reverse('projects:project_detail', args=[many_projects[0].pk])
+    first = admin_client.get(url)
+    assert first.has_header('Last-Modified')
+
+    assert admin_client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+def test_async_api_matches_sync_api(client, settings, many_projects):
+    """Tests that both URL configurations return byte-identical JSON and ETags."""
+    urls = [
+        reverse('project-list') + '?page_size=2',
+        reverse('project-list') + '?q=async',
+        reverse('project-list') + '?fields=id,title,excerpt,technologies',
+        reverse('project-list') + '?technology=JavaScript&technology=Nope&match=any',
+        reverse('project-detail', args=[many_projects[1].pk]),
+        reverse('project-detail', args=[many_projects[1].pk]) + '?omit=description',
+    ]
+    async_responses = [client.get(url) for url in urls]
+
+    settings.ROOT_URLCONF = 'portfolio_project.urls'
+    for url, async_response in zip(urls, async_responses):
+        sync_response = client.get(url)
+        assert async_response.status_code == sync_response.status_code == 200
+        assert async_response.content == sync_response.content
+        assert async_response['ETag'] == sync_response['ETag']
+
+def test_async_api_follows_cursor(client, many_projects):
+    url = reverse('project-list')
+    titles = []
+    while url:
+        data = client.get(url, {'page_size': 2} if 'cursor' not in url else None).json()
+        titles += [project['title'] for project in data['results']]
+        url = data['next']
+    assert titles == [f"Async Project {number}" for number in range(4, -1, -1)]
+
+def test_async_api_errors(client):
+    response = client.get(reverse('project-list'), {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
+    response = client.get(reverse('project-detail', args=[999]))
+    assert response.status_code == 404
+    assert response.json() == {'detail': 'No Project matches the given query.'}
+
+def test_async_api_delegates_writes_to_viewset(client, admin_client, many_projects):
+    """Tests that non-GET methods still go through ProjectViewSet's permissions."""
+    Category.objects.create(name='Web Development')
+    Technology.objects.create(name='Python')
+    payload = {
+        'title': 'Created under ASGI',
+        'description': 'Written by the sync viewset.',
+        'link': 'http://example.com',
+        'category': 'Web Development',
+        'technologies': ['Python'],
+    }
+    url = reverse('project-list')
+    assert client.post(url, payload, content_type='application/json').status_code == 403
+    assert admin_client.post(url, payload, content_type='application/json').status_code == 201
+
+    detail = reverse('project-detail', args=[many_projects[0].pk])
+    assert admin_client.delete(detail).status_code == 204
+    assert not Project.objects.filter(pk=many_projects[0].pk).exists()
+
+def test_async_requests_are_instrumented(async_client, many_projects):
+    """Tests that queries run by the async ORM are counted in async mode."""
+    response = async_to_sync(async_client.get)(reverse('project-list'))
+    assert response.status_code == 200
+    assert 'desc="3 queries, 0 duplicates"' in response['Server-Timing']
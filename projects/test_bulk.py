@@ -0,0 +1,172 @@
+"""
+Tests for the projects API batch write endpoint (`/api/projects/bulk/`).
+
+These tests check each operation end to end, that an invalid batch is
+rejected as a whole with errors per item, that the number of queries
+does not grow with the batch size, and that the search index and the
+representation cache follow batch writes.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Project, Category, Technology
+
+URL = '/api/projects/bulk/'
+
+def send(client, method, items):
+    return getattr(client, method)(URL, items, content_type='application/json')
+
+def item(title, **fields):
+    return {
+        'title': title,
+        'description': f'Description of {title}.',
+        'link': 'https://example.com',
+        'category': 'Web Development',
+        'technologies': ['Python', 'Django'],
+        **fields,
+    }
+
+@pytest.fixture
+def relations():
+    Category.objects.create(name='Web Development')
+    Technology.objects.create(name='Python')
+    Technology.objects.create(name='Django')
+
+def search(client, query):
+    response = client.get(reverse('project-list'), {'q': query})
+    return [project['title'] for project in response.json()['results']]
+
+@pytest.mark.django_db
+def test_bulk_write_requires_authentication(client, relations):
+    response = send(client, 'post', [item('Anonymous')])
+    assert response.status_code == 403
+    assert not Project.objects.exists()
+
+@pytest.mark.django_db
+def test_bulk_create(admin_client, relations):
+    response = send(admin_client, 'post', [item('Alpha'), item('Beta', category=None, technologies=[])])
+
+    assert response.status_code == 201
+    assert [(result['title'], result['status']) for result in response.json()['results']] == [
+        ('Alpha', 'created'), ('Beta', 'created'),
+    ]
+    alpha = Project.objects.get(title='Alpha')
+    assert alpha.category.name == 'Web Development'
+    assert sorted(alpha.technologies.values_list('name', flat=True)) == ['Django', 'Python']
+    assert Project.objects.get(title='Beta').category is None
+    assert search(admin_client, 'Alpha') == ['Alpha']
+
+@pytest.mark.django_db
+def test_bulk_create_rejects_the_whole_batch_with_errors_per_item(admin_client, relations, test_project):
+    response = send(admin_client, 'post', [
+        item('Valid'),
+        item('Unknown relations', category='Nope', technologies=['Python', 'Cobol']),
+        item(test_project.title),
+        item('Twice'),
+        item('Twice'),
+    ])
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert errors[0] == {}
+    assert errors[1] == {
+        'category': ['Object with name=Nope does not exist.'],
+        'technologies': ['Object with name=Cobol does not exist.'],
+    }
+    assert errors[2] == {'title': ['project with this title already exists.']}
+    assert 'title' in errors[3] and 'title' in errors[4]
+    assert list(Project.objects.values_list('title', flat=True)) == [test_project.title]
+
+@pytest.mark.django_db
+def test_bulk_create_runs_a_fixed_number_of_queries(admin_client, relations):
+    def count_queries(prefix, size):
+        with CaptureQueriesContext(connection) as queries:
+            response = send(admin_client, 'post', [item(f'{prefix} {number}') for number in range(size)])
+        assert response.status_code == 201
+        return len(queries)
+
+    assert count_queries('Small', 2) == count_queries('Large', 40)
+
+@pytest.mark.django_db
+def test_bulk_update_changes_only_the_given_fields(
+    admin_client, relations, test_project, django_capture_on_commit_callbacks,
+):
+    before = Project.objects.get(pk=test_project.pk).updated_at
+    admin_client.get(reverse('project-detail', args=[test_project.pk]))  # cache it
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = send(admin_client, 'patch', [
+            {'id': test_project.pk, 'title': 'Renamed', 'technologies': ['Django']},
+        ])
+
+    assert response.status_code == 200
+    project = Project.objects.get(pk=test_project.pk)
+    assert project.title == 'Renamed'
+    assert project.description == test_project.description
+    assert list(project.technologies.values_list('name', flat=True)) == ['Django']
+    assert project.updated_at > before
+    detail = admin_client.get(reverse('project-detail', args=[test_project.pk])).json()
+    assert detail['title'] == 'Renamed'
+    assert detail['technologies'] == ['Django']
+    assert search(admin_client, 'Renamed') == ['Renamed']
+
+@pytest.mark.django_db
+def test_bulk_update_requires_existing_ids(admin_client, test_project):
+    response = send(admin_client, 'patch', [
+        {'id': test_project.pk, 'title': 'Renamed'},
+        {'title': 'No id'},
+        {'id': 999999, 'title': 'Missing'},
+    ])
+
+    assert response.status_code == 400
+    assert 'id' in response.json()[1]
+    assert Project.objects.get(pk=test_project.pk).title == test_project.title
+
+    response = send(admin_client, 'patch', [{'id': 999999, 'title': 'Missing'}])
+    assert response.status_code == 400
+    assert response.json() == [{'id': ['No project with id 999999.']}]
+
+@pytest.mark.django_db
+def test_bulk_upsert_updates_by_title_and_creates_the_rest(admin_client, relations, test_project):
+    created_at = test_project.created_at
+    response = send(admin_client, 'put', [
+        item(test_project.title, description='Replaced.', technologies=['Python']),
+        item('Brand New'),
+    ])
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [(result['id'], result['status']) for result in results][0] == (test_project.pk, 'updated')
+    assert results[1]['status'] == 'created'
+    project = Project.objects.get(pk=test_project.pk)
+    assert project.description == 'Replaced.'
+    assert project.created_at == created_at
+    assert project.category.name == 'Web Development'
+    assert list(project.technologies.values_list('name', flat=True)) == ['Python']
+    assert Project.objects.count() == 2
+    assert search(admin_client, 'Replaced') == [test_project.title]
+
+@pytest.mark.django_db
+def test_bulk_delete(admin_client, relations, test_project):
+    send(admin_client, 'post', [item('Keep'), item('Drop')])
+    drop = Project.objects.get(title='Drop')
+
+    response = send(admin_client, 'delete', [test_project.pk, 999999])
+    assert response.status_code == 400
+    assert response.json() == [{}, {'id': ['No project with id 999999.']}]
+    assert Project.objects.count() == 3
+
+    response = send(admin_client, 'delete', [test_project.pk, drop.pk])
+    assert response.status_code == 200
+    assert list(Project.objects.values_list('title', flat=True)) == ['Keep']
+    assert search(admin_client, 'Drop') == []
+    assert admin_client.get(reverse('project-detail', args=[drop.pk])).status_code == 404
+
+@pytest.mark.django_db
+def test_bulk_write_limits_the_batch_size(admin_client, relations, settings):
+    settings.PROJECTS_BULK_MAX_ITEMS = 2
+    response = send(admin_client, 'post', [item('One'), item('Two'), item('Three')])
+    assert response.status_code == 400
+    assert send(admin_client, 'post', []).status_code == 400
+    assert not Project.objects.exists()
@@ -0,0 +1,124 @@
+"""
+Tests for the two-tier cache backend.
+
+These tests check that reads are served from the local tier after the
+first one, that the local tier is a bounded LRU whose copies expire,
+that a write by any worker (the writer included) clears the local
+tiers through the generation key, and that hits, misses, evictions and invalidations are counted.
+Each "worker" is a TwoTierCache with its own LOCATION, over the
+in-memory shared tier set up in 'conftest.py'.
+"""
+import time
+
+import pytest
+from django.core.cache import caches
+from .cache_backends import TwoTierCache
+
+@pytest.fixture
+def worker(request):
+    """Builds two-tier caches with local tiers private to this test."""
+    def build(name='worker', **options):
+        return TwoTierCache(
+            f'{request.node.name}-{name}',
+            {'OPTIONS': {'SHARED': 'shared', 'GENERATION_CHECK_INTERVAL': 0, **options}},
+        )
+    return build
+
+def test_reads_are_served_locally_after_the_first(worker):
+    cache = worker()
+    caches['shared'].set('answer', 42)
+
+    assert [cache.get('answer') for _ in range(3)] == [42, 42, 42]
+    assert cache.get('missing', 'default') == 'default'
+    caches['shared'].set('answer', 43)  # Written behind the local tier's back.
+    assert cache.get('answer') == 42
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (3, 2, 1)
+
+def test_get_many_only_fetches_local_misses(worker):
+    cache = worker()
+    cache.set_many({'a': 1, 'b': 2})
+    caches['shared'].set('c', 3)
+
+    assert cache.get_many(['a', 'b', 'c', 'd']) == {'a': 1, 'b': 2, 'c': 3}
+    assert cache.stats()['hits'] == 2
+    assert cache.get_many(['c']) == {'c': 3}
+    assert cache.stats()['hits'] == 3
+
+def test_local_tier_is_a_bounded_lru(worker):
+    cache = worker(MAX_ENTRIES=2)
+    caches['shared'].set_many({'a': 1, 'b': 2, 'c': 3})
+    cache.get('a')
+    cache.get('b')
+    cache.get('a')
+    cache.get('c')  # Evicts 'b', the least recently used.
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['entries'] == 2
+    assert cache.get('b') == 2  # Still in the shared tier.
+    assert cache.stats()['hits'] == 1
+
+def test_local_copies_expire(worker):
+    cache = worker(LOCAL_TIMEOUT=0.05)
+    cache.set('key', 'old')
+    caches['shared'].set('key', 'new')
+    assert cache.get('key') == 'old'
+
+    time.sleep(0.06)
+    assert cache.get('key') == 'new'
+    cache.set('short', 'lived', timeout=0.01)  # Capped by its own timeout too.
+    time.sleep(0.02)
+    assert cache.get('short') is None
+
+def test_writes_reach_other_workers_through_the_generation(worker):
+    first, second = worker('first'), worker('second')
+    first.set('key', 'old')
+    assert second.get('key') == 'old'
+
+    first.set('key', 'new')
+    assert second.get('key') == 'new'
+    first.delete('key')
+    assert second.get('key') is None
+
+    first.set('counter', 1)
+    assert second.get('counter') == 1
+    assert first.incr('counter') == 2
+    assert second.get('counter') == 2
+    assert second.stats()['invalidations'] == 3
+
+def test_generation_is_checked_at_most_once_per_interval(worker):
+    first, second = worker('first'), worker('second', GENERATION_CHECK_INTERVAL=60)
+    first.set('key', 'old')
+    assert second.get('key') == 'old'
+    first.set('key', 'new')
+
+    assert second.get('key') == 'old'  # Stale until its next check.
+    second.set('other', 1)  # Its own write sees the generation moved.
+    assert second.get('key') == 'new'
+
+def test_writer_drops_copies_another_worker_made_stale(worker):
+    """
+    Tests that a write clears the writer's own local tier, even when the
+    other worker's generation bump was lost (as concurrent incr() calls
+    on a file cache can lose one).
+    """
+    first = worker('first', GENERATION_CHECK_INTERVAL=60)
+    first.set('key', 'old')
+    caches['shared'].set('key', 'new')  # Written elsewhere, bump lost.
+
+    first.set('other', 1)
+    assert first.get('key') == 'new'
+
+def test_add_and_clear(worker):
+    first, second = worker('first'), worker('second')
+    first.set('key', 1)
+    second.get('key')
+
+    assert not second.add('key', 2)
+    assert second.add('new', 3)
+    assert first.get('new') == 3
+    assert second.stats()['invalidations'] == 0  # add() needs no invalidation.
+
+    first.clear()
+    assert second.get('key') is None
+    assert second.get('new') is None
@@ -0,0 +1,111 @@
+"""
+Tests for the compression of dynamic responses (CompressionMiddleware).
+
+These tests check content negotiation, `Vary` and ETag handling, the
+minimum size, the cache of compressed bodies and streaming responses.
+"""
+import gzip
+
+import brotli
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from . import compression
+from .middleware import CompressionMiddleware
+from .models import Project
+
+@pytest.fixture
+def projects():
+    return [
+        Project.objects.create(title=f"Compressed Project {number}", description="Repetitive text. " * 20)
+        for number in range(10)
+    ]
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('br;q=0, *', 'gzip'),
+    ('*;q=0.1', 'br'),
+    ('identity', None),
+    ('gzip;q=0, br;q=0', None),
+    ('', None),
+])
+def test_negotiate(accept_encoding, expected):
+    assert compression.negotiate(accept_encoding) == expected
+
+@pytest.mark.django_db
+def test_api_list_is_compressed(client, projects):
+    url = reverse('project-list')
+    plain = client.get(url)
+    assert plain.has_header('ETag')
+    assert 'Content-Encoding' not in plain
+    assert 'Accept-Encoding' in plain['Vary']
+
+    for encoding, decompress in (('br', brotli.decompress), ('gzip', gzip.decompress)):
+        response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        assert response['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content) < len(plain.content)
+        assert decompress(response.content) == plain.content
+        assert response['ETag'] == 'W/' + plain['ETag'].removeprefix('W/')
+
+@pytest.mark.django_db
+def test_weak_etag_still_answers_conditional_requests(client, projects):
+    url = reverse('projects:project_index')
+    first = client.get(url, HTTP_ACCEPT_ENCODING='br')
+    assert first['ETag'].startswith('W/')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='br', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 304
+
+@pytest.mark.django_db
+def test_repeated_bodies_are_compressed_once(client, projects, monkeypatch):
+    calls = []
+    original = compression.compress
+    monkeypatch.setattr(compression, 'compress', lambda *args: calls.append(args) or original(*args))
+
+    url = reverse('project-list')
+    bodies = {client.get(url, HTTP_ACCEPT_ENCODING='gzip').content for _ in range(3)}
+    assert len(bodies) == 1
+    assert len(calls) == 1
+
+    client.get(url, HTTP_ACCEPT_ENCODING='br')
+    assert len(calls) == 2
+
+def test_small_and_binary_responses_are_left_alone(settings):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+    middleware = CompressionMiddleware(lambda request: response)
+
+    response = HttpResponse(b'x' * (settings.COMPRESSION_MIN_SIZE - 1), content_type='application/json')
+    result = middleware(request)
+    assert 'Content-Encoding' not in result and 'Vary' not in result
+
+    response = HttpResponse(b'x' * 5000, content_type='image/png')
+    assert 'Content-Encoding' not in middleware(request)
+
+    response = HttpResponse(b'x' * 5000, content_type='text/html', headers={'Cache-Control': 'no-transform'})
+    assert 'Content-Encoding' not in middleware(request)
+
+def test_streaming_responses_are_compressed_chunk_by_chunk():
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+    rows = [f'{{"row": {number}}}\n'.encode() for number in range(100)]
+    middleware = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(iter(rows), content_type='application/x-ndjson')
+    )
+
+    response = middleware(request)
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response
+    assert gzip.decompress(b''.join(response.streaming_content)) == b''.join(rows)
+
+@pytest.mark.django_db
+@pytest.mark.urls('portfolio_project.async_urls')
+def test_async_responses_are_compressed(async_client, client, projects):
+    from asgiref.sync import async_to_sync
+
+    url = reverse('project-list')
+    response = async_to_sync(async_client.get)(url, headers={'Accept-Encoding': 'br'})
+    assert response['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.content) == client.get(url).content
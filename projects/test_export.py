@@ -0,0 +1,107 @@
+"""
+Tests for the streaming export of projects (endpoint and command).
+
+These tests check both formats, that the response is streamed, that
+technologies are fetched once per chunk rather than once per project,
+and that `manage.py export_projects` writes the same bytes to a file.
+"""
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Project, Category, Technology
+
+@pytest.fixture
+def catalog(test_project):
+    category = Category.objects.create(name="Tooling")
+    python = Technology.objects.create(name="Python")
+    for number in range(5):
+        project = Project.objects.create(
+            title=f"Exported, \"quoted\" {number}",
+            description=f"Line one\nline two {number}",
+            category=category if number % 2 else None,
+        )
+        project.technologies.add(python)
+    return list(Project.objects.order_by('pk'))
+
+def read(response):
+    assert response.streaming
+    return b''.join(response.streaming_content)
+
+@pytest.mark.django_db
+def test_export_is_admin_only(client):
+    assert client.get(reverse('project-export')).status_code == 403
+
+@pytest.mark.django_db
+def test_export_ndjson(admin_client, catalog):
+    response = admin_client.get(reverse('project-export'))
+
+    assert response['Content-Type'] == 'application/x-ndjson'
+    records = [json.loads(line) for line in read(response).splitlines()]
+    assert [record['id'] for record in records] == [project.pk for project in catalog]
+    assert records[0]['technologies'] == ['JavaScript']
+    assert records[2] == {
+        'id': catalog[2].pk,
+        'title': 'Exported, "quoted" 1',
+        'description': 'Line one\nline two 1',
+        'link': None,
+        'category': 'Tooling',
+        'technologies': ['Python'],
+        'image': None,
+        'created_at': catalog[2].created_at.isoformat(),
+        'updated_at': catalog[2].updated_at.isoformat(),
+    }
+
+@pytest.mark.django_db
+def test_export_csv(admin_client, catalog):
+    response = admin_client.get(reverse('project-export'), {'format': 'csv'})
+
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    rows = list(csv.DictReader(io.StringIO(read(response).decode())))
+    assert len(rows) == len(catalog)
+    assert rows[2]['title'] == 'Exported, "quoted" 1'
+    assert rows[2]['description'] == 'Line one\nline two 1'
+    assert rows[2]['technologies'] == 'Python'
+    assert rows[1]['category'] == ''
+
+@pytest.mark.django_db
+def test_export_fetches_technologies_per_chunk(admin_client, catalog, settings):
+    settings.PROJECTS_EXPORT_CHUNK_SIZE = 2
+    with CaptureQueriesContext(connection) as queries:
+        content = read(admin_client.get(reverse('project-export')))
+
+    assert len(content.splitlines()) == 6
+    technology_queries = [query for query in queries if 'projects_technology' in query['sql']]
+    assert len(technology_queries) == 3
+
+@pytest.mark.django_db
+def test_export_command_writes_the_same_bytes(admin_client, catalog, tmp_path):
+    for export_format in ('ndjson', 'csv'):
+        path = tmp_path / f'projects.{export_format}'
+        call_command('export_projects', output=str(path), chunk_size=4, stdout=io.StringIO())
+        response = admin_client.get(reverse('project-export'), {'format': export_format})
+        assert path.read_bytes() == read(response)
+
+    stdout = io.StringIO()
+    call_command('export_projects', format='csv', stdout=stdout)
+    assert stdout.getvalue().encode() == (tmp_path / 'projects.csv').read_bytes()
+
+@pytest.mark.django_db
+@pytest.mark.urls('portfolio_project.async_urls')
+def test_export_streams_under_asgi(async_client, admin_user, catalog, settings):
+    from asgiref.sync import async_to_sync
+
+    settings.ASYNC_VIEWS = True
+
+    async def export():
+        await async_client.aforce_login(admin_user)
+        response = await async_client.get(reverse('project-export'))
+        assert response.is_async
+        return b''.join([block async for block in response.streaming_content])
+
+    assert len(async_to_sync(export)().splitlines()) == len(catalog)
@@ -0,0 +1,204 @@
+"""
+Tests for the denormalized facet counts of technologies and categories.
+
+These tests check that every kind of write keeps `project_count` equal
+to a fresh recount, from both sides of the technology relation and
+through the batch write API, that saving a renamed technology or
+category never writes back a stale counter, that the counters stay
+exact when several threads edit projects at once, that
+`manage.py recount` repairs drift, and that `/api/facets/` serves the
+counts with one query.
+"""
+import io
+import threading
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Project, Category, Technology
+
+def counts():
+    """The stored counters of every technology and category, by name."""
+    return {
+        'technologies': dict(Technology.objects.values_list('name', 'project_count')),
+        'categories': dict(Category.objects.values_list('name', 'project_count')),
+    }
+
+def true_counts():
+    """The counts computed from the links themselves."""
+    return {
+        'technologies': {
+            technology.name: technology.project_set.count() for technology in Technology.objects.all()
+        },
+        'categories': {
+            category.name: category.project_set.count() for category in Category.objects.all()
+        },
+    }
+
+def retry_on_lock(func, *args, attempts=50):
+    """
+    Runs `func` in a transaction, retrying when the database reports a
+    lock conflict: SQLite allows one writer at a time, and PostgreSQL may
+    pick a transaction as a deadlock victim.
+    """
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                return func(*args)
+        except OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.01)
+
+@pytest.fixture
+def relations():
+    return {
+        'python': Technology.objects.create(name="Python"),
+        'go': Technology.objects.create(name="Go"),
+        'web': Category.objects.create(name="Web"),
+        'data': Category.objects.create(name="Data"),
+    }
+
+@pytest.mark.django_db
+def test_single_object_writes_keep_counts_exact(relations):
+    python, go, web, data = relations['python'], relations['go'], relations['web'], relations['data']
+    first = Project.objects.create(title="First", description="d", category=web)
+    second = Project.objects.create(title="Second", description="d")
+
+    first.technologies.add(python, go)
+    first.technologies.add(python)  # Already linked: not counted twice.
+    second.technologies.set([python])
+    assert counts() == true_counts()
+    assert counts()['technologies'] == {'Python': 2, 'Go': 1}
+
+    first.technologies.remove(go, go)
+    second.technologies.remove(go)  # Not linked: nothing to uncount.
+    go.project_set.add(first, second)
+    python.project_set.remove(second)
+    assert counts() == true_counts()
+
+    second.category = data
+    second.save()
+    first = Project.objects.get(pk=first.pk)
+    first.category = data
+    first.save(update_fields=['category'])
+    second = Project.objects.only('title').get(pk=second.pk)  # Category not loaded.
+    second.category = web
+    second.save()
+    assert counts() == true_counts()
+    assert counts()['categories'] == {'Web': 1, 'Data': 1}
+
+    go.project_set.clear()
+    first.delete()
+    assert counts() == true_counts()
+    assert counts() == {'technologies': {'Python': 0, 'Go': 0}, 'categories': {'Web': 1, 'Data': 0}}
+
+@pytest.mark.django_db
+def test_renaming_after_linking_keeps_counts(relations):
+    python, web = relations['python'], relations['web']
+    project = Project.objects.create(title="Renamed", description="d", category=web)
+    project.technologies.add(python)
+
+    # Both instances still hold the counts they were created with (0).
+    python.name = "Python 3"
+    python.save()
+    web.name = "Web apps"
+    web.save()
+
+    assert counts() == true_counts()
+    assert counts() == {'technologies': {'Python 3': 1, 'Go': 0}, 'categories': {'Web apps': 1, 'Data': 0}}
+
+@pytest.mark.django_db
+def test_batch_writes_keep_counts_exact(admin_client, relations):
+    url = reverse('project-bulk')
+    items = [
+        {'title': f"Batch {number}", 'description': "d", 'category': "Web", 'technologies': ["Python", "Go"]}
+        for number in range(3)
+    ]
+    response = admin_client.post(url, items, content_type='application/json')
+    assert response.status_code == 201
+    assert counts() == true_counts()
+    ids = [result['id'] for result in response.json()['results']]
+
+    response = admin_client.patch(
+        url, [{'id': ids[0], 'category': "Data", 'technologies': ["Go"]}], content_type='application/json',
+    )
+    assert response.status_code == 200
+    response = admin_client.put(
+        url, [{**items[1], 'category': None, 'technologies': []}, {**items[0], 'title': "New"}],
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    assert counts() == true_counts()
+
+    response = admin_client.delete(url, [ids[2]], content_type='application/json')
+    assert response.status_code == 200
+    assert counts() == true_counts()
+    assert counts() == {'technologies': {'Python': 1, 'Go': 2}, 'categories': {'Web': 1, 'Data': 1}}
+
+@pytest.mark.django_db(transaction=True)
+def test_counts_stay_exact_under_parallel_edits(relations):
+    python, go = relations['python'], relations['go']
+    projects = [
+        Project.objects.create(title=f"Parallel {number}", description="d") for number in range(8)
+    ]
+    barrier = threading.Barrier(len(projects))
+    errors = []
+
+    def edit(pk):
+        project = Project.objects.get(pk=pk)
+        project.technologies.add(python, go)
+        project.category = relations['web'] if project.category_id is None else None
+        project.save()
+        project.technologies.remove(go)
+
+    def worker(pk):
+        try:
+            barrier.wait()
+            for _ in range(3):
+                retry_on_lock(edit, pk)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(project.pk,)) for project in projects]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert counts() == true_counts()
+    assert counts() == {'technologies': {'Python': 8, 'Go': 0}, 'categories': {'Web': 8, 'Data': 0}}
+
+@pytest.mark.django_db
+def test_recount_command_repairs_drift(relations):
+    project = Project.objects.create(title="Drift", description="d", category=relations['web'])
+    project.technologies.add(relations['python'])
+    Technology.objects.update(project_count=42)
+    Category.objects.update(project_count=7)
+
+    call_command('recount', stdout=io.StringIO())
+
+    assert counts() == true_counts()
+
+@pytest.mark.django_db
+def test_facets_endpoint_serves_counts_in_one_query(client, relations):
+    for number in range(3):
+        project = Project.objects.create(title=f"Faceted {number}", description="d", category=relations['web'])
+        project.technologies.add(relations['python'])
+        if number:
+            project.technologies.add(relations['go'])
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('facets'))
+
+    assert len(queries) == 1
+    assert response.json() == {
+        'technologies': [{'name': "Python", 'count': 3}, {'name': "Go", 'count': 2}],
+        'categories': [{'name': "Web", 'count': 3}],
+    }
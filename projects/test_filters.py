@@ -0,0 +1,105 @@
+"""
+Tests for filtering project lists by technology and category.
+
+These tests check "any" and "all" technology matching, category
+filters and their combination with search and pagination, on the API
+(sync and async) and the HTML index, and that each filter runs as one
+query served by the indexes added for it.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Project, Category, Technology
+
+@pytest.fixture
+def catalog():
+    python = Technology.objects.create(name="Python")
+    django = Technology.objects.create(name="Django")
+    go = Technology.objects.create(name="Go")
+    web = Category.objects.create(name="Web")
+    data = Category.objects.create(name="Data")
+    for title, technologies, category in [
+        ("Blog engine", [python, django], web),
+        ("Pipeline", [python], data),
+        ("Proxy", [go], web),
+        ("Dashboard", [python, django, go], None),
+    ]:
+        project = Project.objects.create(title=title, description=f"{title} project.", category=category)
+        project.technologies.add(*technologies)
+
+def titles(client, **params):
+    response = client.get(reverse('project-list'), params)
+    assert response.status_code == 200
+    return sorted(project['title'] for project in response.json()['results'])
+
+@pytest.mark.django_db
+def test_filter_by_technology(client, catalog):
+    assert titles(client, technology=["Django", "Go"]) == ["Blog engine", "Dashboard", "Proxy"]
+    assert titles(client, technology=["Django", "Go"], match="all") == ["Dashboard"]
+    assert titles(client, technology=["Python", "Django"], match="all") == ["Blog engine", "Dashboard"]
+    assert titles(client, technology=["Python", "Nope"], match="all") == []
+    assert titles(client, technology=["Python", "Nope"]) == ["Blog engine", "Dashboard", "Pipeline"]
+
+@pytest.mark.django_db
+def test_filter_by_category_combines_with_technologies_and_search(client, catalog):
+    assert titles(client, category="Web") == ["Blog engine", "Proxy"]
+    assert titles(client, category=["Web", "Data"]) == ["Blog engine", "Pipeline", "Proxy"]
+    assert titles(client, category="Web", technology="Python") == ["Blog engine"]
+    assert titles(client, technology="Python", q="pipeline") == ["Pipeline"]
+
+@pytest.mark.django_db
+def test_filtered_list_is_paginated(client, catalog):
+    response = client.get(reverse('project-list'), {'technology': "Python", 'page_size': 2})
+    first = [project['title'] for project in response.json()['results']]
+    second = [project['title'] for project in client.get(response.json()['next']).json()['results']]
+
+    assert first == ["Dashboard", "Pipeline"]
+    assert second == ["Blog engine"]
+
+@pytest.mark.django_db
+def test_invalid_match_is_rejected(client, catalog):
+    response = client.get(reverse('project-list'), {'technology': "Python", 'match': "most"})
+    assert response.status_code == 400
+    assert response.json() == {'match': ["Must be one of: any, all."]}
+    assert client.get(reverse('projects:project_index'), {'match': "most"}).status_code == 400
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('urlconf', ['portfolio_project.urls', 'portfolio_project.async_urls'])
+def test_project_index_is_filtered(client, settings, catalog, urlconf):
+    settings.ROOT_URLCONF = urlconf
+    response = client.get(reverse('projects:project_index'), {'technology': ["Python", "Go"], 'match': "all"})
+
+    content = response.content.decode()
+    assert "Dashboard" in content
+    assert "Blog engine" not in content
+    assert "Using all of: Python, Go." in content
+
+@pytest.mark.django_db
+def test_match_all_is_one_aggregation_over_the_links(client, catalog):
+    with CaptureQueriesContext(connection) as queries:
+        titles(client, technology=["Python", "Django", "Go"], match="all", fields="title")
+
+    project_queries = [query['sql'] for query in queries if 'FROM "projects_project"' in query['sql']]
+    assert len(project_queries) == 2  # Conditional GET validators, then the page.
+    sql = project_queries[-1]
+    assert sql.count('"projects_project_technologies"') == 1
+    assert 'GROUP BY' in sql and 'HAVING' in sql
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason="Reads SQLite query plans.")
+def test_filters_use_their_indexes(catalog):
+    from .filters import filter_projects
+
+    def plan(filters):
+        queryset = filter_projects(Project.objects.order_by('-created_at', '-id'), filters)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    technology_plan = plan({'technologies': ["Python", "Go"], 'match': 'all', 'categories': []})
+    assert 'projects_project_technologies_technology_project_idx' in technology_plan
+    category_plan = plan({'technologies': [], 'match': 'any', 'categories': ["Web"]})
+    assert 'project_cat_created_id_idx' in category_plan
+    assert 'TEMP B-TREE' not in category_plan
@@ -0,0 +1,168 @@
+"""
+Tests for the projects application's image derivative pipeline.
+
+These tests verify that resized WebP/JPEG copies are queued and built
+by the worker when a project's image is uploaded or replaced, and that
+they are exposed in the API and rendered as responsive, lazily-loaded
+<picture> elements.
+"""
+import pytest
+from io import BytesIO
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from .image_jobs import build_pending
+from .images import RENDITIONS
+from .models import ImageVariantsJob, Project
+
+def make_upload(name="photo.png", size=(1600, 1200), mode='RGBA'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 40, 40, 255) if mode == 'RGBA' else (200, 40, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+@pytest.fixture
+def project_with_image(db):
+    project = Project.objects.create(
+        title="Image Project",
+        description="A project with an uploaded image.",
+        image=make_upload(),
+    )
+    build_pending()
+    return project
+
+@pytest.mark.django_db
+def test_upload_queues_the_copies_instead_of_building_them(media_storage):
+    """Tests that saving only queues a job, and the worker builds the copies."""
+    project = Project.objects.create(title="Queued", description="Queued.", image=make_upload())
+
+    assert ImageVariantsJob.objects.get(project=project).source == project.image.name
+    assert Project.objects.get(pk=project.pk).image_renditions is None
+
+    assert build_pending() == {'built': 1, 'retried': 0, 'failed': 0}
+    assert not ImageVariantsJob.objects.exists()
+    assert Project.objects.get(pk=project.pk).image_renditions['card']['width'] == 400
+
+@pytest.mark.django_db
+def test_upload_generates_resized_webp_and_jpeg_copies(project_with_image, media_storage):
+    """Tests that every rendition is stored next to the original in both formats."""
+    project = Project.objects.get(pk=project_with_image.pk)
+    variants = project.image_variants
+
+    assert variants['source'] == project.image.name
+    assert set(variants['renditions']) == set(RENDITIONS)
+
+    card = variants['renditions']['card']
+    assert (card['width'], card['height']) == (400, 300)
+    with Image.open(media_storage / card['webp']) as webp:
+        assert (webp.format, webp.size) == ('WEBP', (400, 300))
+    with Image.open(media_storage / card['jpeg']) as jpeg:
+        assert (jpeg.format, jpeg.size) == ('JPEG', (400, 300))
+
+    # Never upscaled beyond the 1600px original.
+    assert variants['renditions']['detail_2x']['width'] == 1600
+
+@pytest.mark.django_db
+def test_replacing_image_regenerates_copies(project_with_image):
+    """Tests that a new upload replaces the derivatives and bumps updated_at."""
+    previous = Project.objects.get(pk=project_with_image.pk)
+
+    project_with_image.image = make_upload("portrait.png", size=(600, 900), mode='RGB')
+    project_with_image.save()
+    # The previous copies are not shown for the new image.
+    assert Project.objects.get(pk=project_with_image.pk).image_renditions is None
+    build_pending()
+
+    project = Project.objects.get(pk=project_with_image.pk)
+    assert project.image_variants['source'] == project.image.name
+    assert project.image_variants['renditions']['card']['height'] == 600
+    assert project.updated_at > previous.updated_at
+
+@pytest.mark.django_db
+def test_replacing_image_deletes_the_previous_copies(project_with_image, media_storage):
+    """Tests that the copies of a replaced image are removed from storage."""
+    project = Project.objects.get(pk=project_with_image.pk)
+    previous = project.image_variants['renditions']
+    previous_files = [media_storage / rendition[key] for rendition in previous.values() for key in ('webp', 'jpeg')]
+    assert all(path.exists() for path in previous_files)
+
+    project.image = make_upload("replacement.png")
+    project.save()
+    build_pending()
+
+    assert not any(path.exists() for path in previous_files)
+
+@pytest.mark.django_db
+def test_copies_shared_with_another_project_are_kept(project_with_image, media_storage):
+    """Tests that copies still shown by another project (as seed_db shares them) survive a replacement."""
+    shared = Project.objects.get(pk=project_with_image.pk)
+    Project.objects.create(
+        title="Sharing", description="Shares the image.", image=shared.image.name, image_variants=shared.image_variants,
+    )
+    card = media_storage / shared.image_variants['renditions']['card']['webp']
+
+    shared.image = make_upload("replacement.png")
+    shared.save()
+    build_pending()
+
+    assert card.exists()
+
+@pytest.mark.django_db
+def test_replacing_image_before_the_build_only_builds_the_newest(project_with_image, media_storage):
+    """Tests that a job claimed for an image replaced meanwhile leaves the newer image's job queued."""
+    project_with_image.image = make_upload("first.png")
+    project_with_image.save()
+    project_with_image.image = make_upload("second.png")
+    project_with_image.save()
+
+    assert build_pending()['built'] == 1
+    project = Project.objects.get(pk=project_with_image.pk)
+    assert project.image_variants['source'] == project.image.name
+    assert project.image.name.endswith('second.png')
+
+@pytest.mark.django_db
+def test_narrow_source_stores_and_offers_each_width_once(client, media_storage):
+    """Tests that a 300px source gets one copy per format and no duplicate srcset widths."""
+    project = Project.objects.create(title="Narrow", description="A small image.", image=make_upload(size=(300, 200)))
+    build_pending()
+
+    renditions = Project.objects.get(pk=project.pk).image_variants['renditions']
+    assert set(renditions) == set(RENDITIONS)
+    assert {renditions[name]['webp'] for name in RENDITIONS} == {renditions['card']['webp']}
+    assert len(list((media_storage / 'project_images').glob('*__*'))) == 2
+
+    detail = client.get(reverse('projects:project_detail', args=[project.pk])).content.decode()
+    assert detail.count(' 300w') == 2  # Once per format.
+    assert 'width="300" height="200"' in detail
+
+@pytest.mark.django_db
+def test_decompression_bombs_keep_the_original_image(project_with_image, monkeypatch):
+    # Pillow refuses images over twice MAX_IMAGE_PIXELS.
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100_000)
+    project_with_image.image = make_upload("bomb.png")
+    project_with_image.save()
+    build_pending()
+
+    project = Project.objects.get(pk=project_with_image.pk)
+    assert project.image_variants == {'source': project.image.name, 'renditions': {}}
+
+@pytest.mark.django_db
+def test_api_exposes_image_renditions(client, project_with_image):
+    """Tests that the API returns absolute URLs and sizes for each rendition."""
+    data = client.get(reverse('project-detail', args=[project_with_image.pk])).json()
+
+    card = data['images']['card']
+    assert card['webp'].startswith('http://testserver/media/project_images/')
+    assert card['webp'].endswith('__card.webp')
+    assert (card['width'], card['height']) == (400, 300)
+
+@pytest.mark.django_db
+def test_templates_render_lazy_srcset(client, project_with_image):
+    """Tests that cards and detail pages use srcset, explicit sizes and lazy loading."""
+    index = client.get(reverse('projects:project_index')).content.decode()
+    assert 'type="image/webp"' in index
+    assert '__card_2x.webp 800w' in index
+    assert 'width="400" height="300" loading="lazy"' in index
+
+    detail = client.get(reverse('projects:project_detail', args=[project_with_image.pk])).content.decode()
+    assert '__detail.jpg 960w' in detail
+    assert 'width="960" height="720" loading="lazy"' in detail
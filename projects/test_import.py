@@ -0,0 +1,193 @@
+"""
+Tests for the streaming import of projects (`manage.py import_projects`).
+
+These tests check that an export of either format imports back as the
+same catalog, that unknown technologies and categories are created,
+that projects are upserted by title, that invalid records (undecodable
+lines included) are skipped, that an interrupted import resumes from
+its offset, and that imported projects are searchable and get their
+related projects, refreshing only the lists the import affects.
+"""
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from . import imports, related
+from .imports import import_records
+from .models import Project, Category, Technology
+from .related import related_projects
+from .search import search_projects
+
+def record(title, **fields):
+    return {
+        'title': title,
+        'description': f'Description of {title}.',
+        'link': 'https://example.com',
+        'category': 'Tooling',
+        'technologies': ['Python', 'Go'],
+        **fields,
+    }
+
+def write_ndjson(path, records):
+    path.write_bytes(b''.join(json.dumps(record).encode() + b'\n' for record in records))
+    return str(path)
+
+def import_file(path, **options):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    call_command('import_projects', path, stdout=stdout, stderr=stderr, **options)
+    return stdout.getvalue(), stderr.getvalue()
+
+def catalog():
+    return [
+        (project.title, project.description, project.link,
+         project.category.name if project.category else None,
+         sorted(technology.name for technology in project.technologies.all()))
+        for project in Project.objects.for_detail().order_by('title')
+    ]
+
+@pytest.mark.django_db
+def test_import_roundtrips_an_export(test_project, tmp_path):
+    category = Category.objects.create(name="Tooling")
+    Project.objects.create(title="No link", description="Multi\nline, \"quoted\"", category=category)
+    expected = catalog()
+
+    for export_format in ('ndjson', 'csv'):
+        path = tmp_path / f'projects.{export_format}'
+        call_command('export_projects', output=str(path), stdout=io.StringIO())
+        Project.objects.all().delete()
+        Technology.objects.all().delete()
+        Category.objects.all().delete()
+
+        stdout, _ = import_file(str(path), chunk_size=1)
+        assert catalog() == expected
+        assert "2 created, 0 updated, 0 skipped" in stdout
+
+@pytest.mark.django_db
+def test_import_upserts_by_title_and_creates_relations(test_project, tmp_path):
+    path = write_ndjson(tmp_path / 'projects.ndjson', [
+        record(test_project.title, description="Replaced.", technologies=['Go']),
+        record("New one"),
+        record("New one", description="Last duplicate wins."),
+    ])
+
+    stdout, _ = import_file(path)
+
+    assert "1 created, 1 updated" in stdout
+    assert Project.objects.count() == 2
+    test_project.refresh_from_db()
+    assert test_project.description == "Replaced."
+    assert list(test_project.technologies.values_list('name', flat=True)) == ['Go']
+    assert Project.objects.get(title="New one").description == "Last duplicate wins."
+    assert sorted(Technology.objects.values_list('name', flat=True)) == ['Go', 'JavaScript', 'Python']
+    assert list(Category.objects.values_list('name', flat=True)) == ['Tooling']
+    assert [project.title for project in related_projects(test_project.pk)] == ["New one"]
+
+@pytest.mark.django_db
+def test_import_only_refreshes_the_related_projects_it_affects(test_project, tmp_path, monkeypatch):
+    Project.objects.create(title="Untouched", description="d").technologies.add(
+        *test_project.technologies.all()
+    )
+    refreshed = []
+    monkeypatch.setattr(related, 'refresh', lambda pks, using: refreshed.append(set(pks)) or [])
+    monkeypatch.setattr(related, 'rebuild', lambda using: pytest.fail("rebuilt every list"))
+
+    import_file(write_ndjson(tmp_path / 'projects.ndjson', [record("New one")]))
+    new_one = Project.objects.get(title="New one")
+    assert refreshed == [{new_one.pk}]
+
+    rebuilds = []
+    monkeypatch.setattr(related, 'rebuild', lambda using: rebuilds.append(using))
+    import_file(write_ndjson(tmp_path / 'again.ndjson', [record("New one")]), rebuild_related=True)
+    assert rebuilds == ['default'] and len(refreshed) == 1
+
+@pytest.mark.django_db
+def test_import_skips_invalid_records(tmp_path):
+    path = write_ndjson(tmp_path / 'projects.ndjson', [
+        record("Valid"),
+        record(""),
+        record("Bad link", link="not a url"),
+        record("Bad technologies", technologies="Python"),
+        ["not", "an", "object"],
+    ])
+
+    stdout, stderr = import_file(path)
+
+    assert list(Project.objects.values_list('title', flat=True)) == ["Valid"]
+    assert "1 created, 0 updated, 4 skipped" in stdout
+    assert stderr.splitlines() == [
+        "Skipped record 2: title is required",
+        "Skipped record 3: invalid link",
+        "Skipped record 4: invalid technologies",
+        "Skipped record 5: not an object",
+    ]
+
+@pytest.mark.django_db
+def test_import_commits_per_chunk_and_resumes_from_an_offset(tmp_path):
+    records = [record(f"Project {number}") for number in range(1, 6)]
+    committed = []
+
+    def interrupted():
+        yield from records[:3]
+        raise OSError("connection lost")
+
+    with pytest.raises(OSError):
+        import_records(interrupted(), chunk_size=2, progress=lambda stats: committed.append(stats.committed))
+    assert committed == [2]
+    assert Project.objects.count() == 2
+
+    stats = import_records(iter(records), chunk_size=2, offset=2)
+    assert (stats.committed, stats.created, stats.updated) == (5, 3, 0)
+    assert Project.objects.count() == 5
+
+@pytest.mark.django_db
+def test_import_skips_undecodable_lines(tmp_path):
+    path = write_ndjson(tmp_path / 'projects.ndjson', [record("First")])
+    with open(path, 'ab') as file:
+        file.write(b'{"truncated": \n')
+        file.write(json.dumps(record("Second")).encode() + b'\n')
+    csv_path = tmp_path / 'projects.csv'
+    csv_path.write_bytes(
+        b'title,description,technologies\n'
+        b'Third,Fine,Python\n'
+        b'Bad \xff bytes,Broken,Python\n'
+        b'Fourth,Fine,Go\n'
+    )
+
+    stdout, stderr = import_file(path)
+    assert "2 created, 0 updated, 1 skipped" in stdout
+    assert stderr.splitlines() == ["Skipped record 2: invalid JSON"]
+
+    stdout, stderr = import_file(str(csv_path))
+    assert "2 created, 0 updated, 1 skipped" in stdout
+    assert stderr.splitlines() == ["Skipped record 2: invalid UTF-8"]
+    assert sorted(Project.objects.values_list('title', flat=True)) == ["First", "Fourth", "Second", "Third"]
+
+@pytest.mark.django_db
+def test_import_command_reports_the_offset_to_resume_from(tmp_path, monkeypatch):
+    path = write_ndjson(tmp_path / 'projects.ndjson', [record("First"), record("Second"), record("Third")])
+    upsert_projects = imports.upsert_projects
+    calls = []
+
+    def fail_second_chunk(items, **kwargs):
+        calls.append(items)
+        if len(calls) == 2:
+            raise OSError("connection lost")
+        return upsert_projects(items, **kwargs)
+
+    monkeypatch.setattr(imports, 'upsert_projects', fail_second_chunk)
+    with pytest.raises(CommandError, match="Resume with --offset 2"):
+        import_file(path, chunk_size=2)
+    assert Project.objects.count() == 2
+
+@pytest.mark.django_db
+def test_imported_projects_are_searchable(client, tmp_path):
+    path = write_ndjson(tmp_path / 'projects.ndjson', [record("Quasar telescope")])
+    import_file(path)
+
+    assert list(search_projects(Project.objects.all(), 'quasar').values_list('title', flat=True)) == [
+        "Quasar telescope"
+    ]
+    response = client.get('/api/projects/', {'q': 'telescope'})
+    assert [project['title'] for project in response.json()['results']] == ["Quasar telescope"]
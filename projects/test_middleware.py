@@ -0,0 +1,87 @@
+"""
+Tests for the projects application's middleware.
+
+These tests verify that the query instrumentation middleware reports
+each request's database usage (streamed bodies included) and enforces
+the per-URL query budgets.
+"""
+import logging
+import pytest
+from django.urls import reverse
+from .middleware import QueryBudgetExceeded
+
+@pytest.mark.django_db
+def test_query_middleware_adds_server_timing_header(client, test_project):
+    """Tests that the response reports the number of queries it ran."""
+    response = client.get(reverse('projects:project_detail', args=[test_project.pk]))
+
+    assert response.status_code == 200
+    assert response['Server-Timing'].startswith('db;dur=')
+    assert 'desc="4 queries, 0 duplicates"' in response['Server-Timing']
+
+@pytest.mark.django_db
+def test_query_middleware_logs_structured_line(client, caplog):
+    """Tests that every request is logged with its URL name and query count."""
+    with caplog.at_level(logging.INFO, logger='projects.queries'):
+        client.get(reverse('projects:project_index'))
+
+    record = caplog.records[-1]
+    assert record.url_name == 'projects:project_index'
+    assert record.queries == 2
+    assert 'queries=2' in record.getMessage()
+
+@pytest.mark.django_db
+def test_query_middleware_raises_when_budget_exceeded(client, settings):
+    """Tests that an over-budget request raises when the action is 'raise'."""
+    settings.QUERY_BUDGETS = {'projects:project_index': 1}
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse('projects:project_index'))
+
+@pytest.mark.django_db
+def test_query_middleware_logs_when_budget_exceeded(client, settings, caplog):
+    """Tests that an over-budget request only logs a warning when the action is 'log'."""
+    settings.QUERY_BUDGETS = {'projects:project_index': 1}
+    settings.QUERY_BUDGET_ACTION = 'log'
+
+    with caplog.at_level(logging.WARNING, logger='projects.queries'):
+        response = client.get(reverse('projects:project_index'))
+
+    assert response.status_code == 200
+    assert 'projects:project_index ran 2 queries (budget: 1)' in caplog.text
+
+@pytest.mark.django_db
+def test_query_middleware_counts_queries_run_while_streaming(admin_client, test_project, caplog, settings):
+    """Tests that the queries of a streamed export are logged once its body is consumed."""
+    settings.PROJECTS_EXPORT_CHUNK_SIZE = 1
+
+    with caplog.at_level(logging.INFO, logger='projects.queries'):
+        response = admin_client.get(reverse('project-export'))
+        assert not caplog.records
+        b''.join(response.streaming_content)
+
+    record = caplog.records[-1]
+    assert record.url_name == 'project-export'
+    # The session and user lookups, then the export's own queries.
+    assert record.queries > 2
+    assert f'queries={record.queries}' in record.getMessage()
+
+@pytest.mark.django_db
+@pytest.mark.urls('portfolio_project.async_urls')
+def test_query_middleware_counts_queries_run_while_streaming_under_asgi(async_client, admin_user, test_project, caplog, settings):
+    """Tests that the queries of an async streamed export are counted as well."""
+    from asgiref.sync import async_to_sync
+
+    settings.ASYNC_VIEWS = True
+
+    async def export():
+        await async_client.aforce_login(admin_user)
+        response = await async_client.get(reverse('project-export'))
+        return b''.join([block async for block in response.streaming_content])
+
+    with caplog.at_level(logging.INFO, logger='projects.queries'):
+        async_to_sync(export)()
+
+    record = caplog.records[-1]
+    assert record.url_name == 'project-export'
+    assert record.queries > 2
@@ -0,0 +1,60 @@
+"""
+Tests for the projects application's email outbox.
+
+These tests verify that queued emails are delivered in batches over a
+single connection, and that failed deliveries are retried with backoff
+before being given up on.
+"""
+import pytest
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+from . import outbox
+from .models import OutboundEmail
+
+def queue(count):
+    for i in range(count):
+        outbox.enqueue(f"Subject {i}", "Body", "from@example.com", ["admin@example.com"])
+
+@pytest.mark.django_db
+def test_outbox_delivers_batches_over_one_connection():
+    """Tests that all due messages are sent, in several batches, through one open connection."""
+    queue(5)
+
+    with mock.patch.object(EmailBackend, 'open', autospec=True) as open_connection:
+        stats = outbox.deliver_pending(batch_size=2)
+
+    assert stats == {'sent': 5, 'retried': 0, 'failed': 0}
+    assert open_connection.call_count == 1
+    assert [m.subject for m in mail.outbox] == [f"Subject {i}" for i in range(5)]
+    assert OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count() == 5
+
+@pytest.mark.django_db
+def test_outbox_retries_failed_sends_with_backoff(settings):
+    """Tests that a failed send is rescheduled with growing delays and finally marked failed."""
+    settings.OUTBOX_MAX_ATTEMPTS = 3
+    settings.OUTBOX_RETRY_BASE_SECONDS = 30
+    queue(1)
+    email = OutboundEmail.objects.get()
+
+    with mock.patch.object(EmailBackend, 'send_messages', side_effect=SMTPException("Server busy")):
+        for attempt, delay in [(1, 30), (2, 60)]:
+            before = timezone.now()
+            assert outbox.deliver_pending() == {'sent': 0, 'retried': 1, 'failed': 0}
+            email.refresh_from_db()
+            assert email.attempts == attempt
+            assert email.last_error == "SMTPException: Server busy"
+            assert email.next_attempt_at >= before + timedelta(seconds=delay)
+
+            # Not due yet: nothing is sent until the backoff has passed.
+            assert outbox.deliver_pending() == {'sent': 0, 'retried': 0, 'failed': 0}
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+        assert outbox.deliver_pending() == {'sent': 0, 'retried': 0, 'failed': 1}
+
+    email.refresh_from_db()
+    assert email.status == OutboundEmail.Status.FAILED
+    assert len(mail.outbox) == 0
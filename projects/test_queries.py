@@ -0,0 +1,78 @@
+"""
+Query-count regression tests for the projects application.
+
+Each page and API endpoint must run a constant number of SQL queries,
+however many projects it shows. These tests render every page with a
+small and a larger data set and pin the exact query count, so a missing
+select_related/prefetch_related (an N+1 query) fails loudly.
+"""
+import pytest
+from django.urls import reverse
+from . import related
+from .models import Project, Technology, Category
+
+def create_projects(count, technology):
+    """Creates `count` projects that each use every eager-loaded relation."""
+    category = Category.objects.create(name="Query Count Category")
+    extra = Technology.objects.create(name="Query Count Extra")
+    for i in range(count):
+        project = Project.objects.create(
+            title=f"Query Count Project {i}",
+            description="A project used for query counting.",
+            category=category,
+            image=f"project_images/query-count-{i}.png",
+        )
+        project.technologies.add(technology, extra)
+    related.rebuild()
+    return Project.objects.order_by('pk').first()
+
+# Validator aggregate + projects.
+PROJECT_INDEX_QUERIES = 2
+# Validator aggregate + project with category + technologies + related projects.
+PROJECT_DETAIL_QUERIES = 4
+# Validator aggregate + technology + projects.
+TECHNOLOGY_DETAIL_QUERIES = 3
+# Validator aggregate + projects with categories + technologies.
+PROJECT_API_LIST_QUERIES = 3
+PROJECT_API_DETAIL_QUERIES = 3
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 10])
+def test_project_index_query_count_is_constant(client, django_assert_num_queries, test_technology, count):
+    create_projects(count, test_technology)
+    with django_assert_num_queries(PROJECT_INDEX_QUERIES):
+        response = client.get(reverse('projects:project_index'))
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 10])
+def test_project_detail_query_count_is_constant(client, django_assert_num_queries, test_technology, count):
+    project = create_projects(count, test_technology)
+    with django_assert_num_queries(PROJECT_DETAIL_QUERIES):
+        response = client.get(reverse('projects:project_detail', args=[project.pk]))
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 10])
+def test_technology_detail_query_count_is_constant(client, django_assert_num_queries, test_technology, count):
+    create_projects(count, test_technology)
+    with django_assert_num_queries(TECHNOLOGY_DETAIL_QUERIES):
+        response = client.get(reverse('projects:technology_detail', args=[test_technology.name]))
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 10])
+def test_project_api_list_query_count_is_constant(client, django_assert_num_queries, test_technology, count):
+    create_projects(count, test_technology)
+    with django_assert_num_queries(PROJECT_API_LIST_QUERIES):
+        response = client.get(reverse('project-list'))
+    assert response.status_code == 200
+    assert len(response.json()['results']) == count
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', [1, 10])
+def test_project_api_detail_query_count_is_constant(client, django_assert_num_queries, test_technology, count):
+    project = create_projects(count, test_technology)
+    with django_assert_num_queries(PROJECT_API_DETAIL_QUERIES):
+        response = client.get(reverse('project-detail', args=[project.pk]))
+    assert response.status_code == 200
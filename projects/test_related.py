@@ -0,0 +1,191 @@
+"""
+Tests for the precomputed related projects.
+
+These tests check that the lists rank projects by Jaccard similarity of
+their technologies, that every kind of write refreshes the lists it
+affects (and only those) once the transaction commits, that renaming a
+listed project marks the lists showing it modified, that
+`manage.py rebuild_related_projects` computes the same lists from
+scratch, and that the detail page and `/api/projects/<pk>/related/`
+read them with one query.
+"""
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from . import related
+from .models import Project, RelatedProject, Technology
+
+def lists():
+    """Every stored list, as {title: [(related title, score), ...]}."""
+    result = {}
+    for link in RelatedProject.objects.select_related('project', 'related').order_by('project', 'position'):
+        result.setdefault(link.project.title, []).append((link.related.title, round(link.score, 3)))
+    return result
+
+def rebuilt_lists():
+    """The lists computed from scratch."""
+    RelatedProject.objects.all().delete()
+    related.rebuild()
+    return lists()
+
+@pytest.fixture
+def technologies():
+    return {name: Technology.objects.create(name=name) for name in ("Python", "Go", "Rust", "SQL")}
+
+@pytest.fixture
+def catalog(technologies, django_capture_on_commit_callbacks):
+    def project(title, *names):
+        created = Project.objects.create(title=title, description="d")
+        created.technologies.set([technologies[name] for name in names])
+        return created
+
+    with django_capture_on_commit_callbacks(execute=True):
+        return {
+            'a': project("A", "Python", "Go", "SQL"),
+            'b': project("B", "Python", "Go"),
+            'c': project("C", "Python"),
+            'd': project("D", "Rust"),
+            'e': project("E", "Python", "SQL"),
+        }
+
+@pytest.mark.django_db
+def test_lists_rank_projects_by_jaccard_similarity(catalog, settings):
+    assert lists()["A"] == [("E", 0.667), ("B", 0.667), ("C", 0.333)]
+    assert lists()["C"] == [("E", 0.5), ("B", 0.5), ("A", 0.333)]
+    assert "D" not in lists()  # Shares no technology.
+
+    settings.RELATED_PROJECTS_COUNT = 2
+    related.rebuild()
+    assert lists()["A"] == [("E", 0.667), ("B", 0.667)]
+
+@pytest.mark.django_db
+def test_technology_changes_refresh_affected_lists(catalog, technologies, django_capture_on_commit_callbacks):
+    a, d = catalog['a'], catalog['d']
+    with django_capture_on_commit_callbacks(execute=True):
+        d.technologies.add(technologies['Go'])
+    assert lists()["D"] == [("B", 0.333), ("A", 0.25)]
+    assert ("D", 0.25) in lists()["A"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        a.technologies.remove(technologies['SQL'])
+        technologies['Python'].project_set.remove(catalog['c'])
+    expected = lists()
+    assert expected == rebuilt_lists()
+    assert expected["A"][0] == ("B", 1.0)
+    assert "C" not in expected
+
+    with django_capture_on_commit_callbacks(execute=True):
+        technologies['Go'].project_set.clear()
+    assert lists() == rebuilt_lists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        technologies['Python'].delete()
+    # Only E links a technology now: every list is empty.
+    assert lists() == {}
+    assert rebuilt_lists() == {}
+
+@pytest.mark.django_db
+def test_deleting_a_project_refills_the_lists_it_was_in(catalog, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog['e'].delete()
+
+    assert lists() == rebuilt_lists()
+    assert lists()["A"] == [("B", 0.667), ("C", 0.333)]
+
+@pytest.mark.django_db
+def test_only_changed_lists_mark_their_project_modified(catalog, technologies, django_capture_on_commit_callbacks):
+    before = dict(Project.objects.values_list('title', 'updated_at'))
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog['d'].technologies.add(technologies['SQL'])
+    after = dict(Project.objects.values_list('title', 'updated_at'))
+
+    # D's own links changed; A and E gained D; B and C kept their lists.
+    assert {title for title in after if after[title] != before[title]} == {"A", "D", "E"}
+
+@pytest.mark.django_db
+def test_renaming_a_listed_project_marks_the_lists_showing_it_modified(client, admin_client, catalog):
+    url = reverse('project-related', args=[catalog['a'].pk])
+    etag = client.get(url)['ETag']
+
+    def modified(change):
+        before = dict(Project.objects.values_list('title', 'updated_at'))
+        change()
+        after = dict(Project.objects.values_list('title', 'updated_at'))
+        return {title for title in after if after.get(title) != before.get(title)}
+
+    project = Project.objects.get(pk=catalog['d'].pk)
+    project.description = "Not shown in any list."
+    assert modified(project.save) == {"D"}
+
+    project = Project.objects.get(pk=catalog['b'].pk)
+    project.title = "B renamed"
+    # B itself, and A, C and E, which list it.
+    assert modified(project.save) == {"A", "B renamed", "C", "E"}
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "B renamed" in [item['title'] for item in response.json()]
+
+    patch = lambda: admin_client.patch(
+        reverse('project-bulk'), [{'id': catalog['c'].pk, 'link': 'https://example.com/c'}],
+        content_type='application/json',
+    )
+    assert modified(patch) == {"A", "C", "E", "B renamed"}
+
+@pytest.mark.django_db
+def test_batch_writes_refresh_lists(admin_client, technologies, django_capture_on_commit_callbacks):
+    url = reverse('project-bulk')
+    items = [
+        {'title': f"Batch {number}", 'description': "d", 'technologies': ["Python", "Go"][:number + 1]}
+        for number in range(3)
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(url, items, content_type='application/json')
+    assert response.status_code == 201
+    ids = [result['id'] for result in response.json()['results']]
+    assert lists() == rebuilt_lists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.patch(url, [{'id': ids[0], 'technologies': ["Go"]}], content_type='application/json')
+    assert lists() == rebuilt_lists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_client.delete(url, [ids[1]], content_type='application/json')
+    assert lists() == rebuilt_lists()
+    assert lists() == {"Batch 0": [("Batch 2", 0.5)], "Batch 2": [("Batch 0", 0.5)]}
+
+@pytest.mark.django_db
+def test_rebuild_command_recomputes_every_list(catalog):
+    expected = lists()
+    RelatedProject.objects.all().delete()
+    stdout = io.StringIO()
+
+    call_command('rebuild_related_projects', batch_size=2, stdout=stdout)
+
+    assert lists() == expected
+    assert "4 lists changed" in stdout.getvalue()
+
+@pytest.mark.django_db
+def test_detail_page_shows_related_projects(client, catalog):
+    response = client.get(reverse('projects:project_detail', args=[catalog['c'].pk]))
+
+    assert [project.title for project in response.context['related_projects']] == ["E", "B", "A"]
+    assert "50% shared technologies" in response.content.decode()
+
+@pytest.mark.django_db
+def test_related_endpoint_reads_the_list_with_one_query(client, catalog):
+    url = reverse('project-related', args=[catalog['b'].pk])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert [(item['title'], round(item['score'], 3)) for item in response.json()] == [
+        ("A", 0.667), ("C", 0.5), ("E", 0.333),
+    ]
+    # One query for the conditional GET validator, one for the list.
+    assert len(queries) == 2
+    assert client.get(reverse('project-related', args=[catalog['d'].pk])).json() == []
+    assert client.get(reverse('project-related', args=[0])).status_code == 404
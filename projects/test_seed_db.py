@@ -0,0 +1,65 @@
+"""
+Tests for the seed_db management command's synthetic (scale) mode.
+"""
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .models import Project, Technology, Category
+from .search import search_projects
+
+def seed(**options):
+    call_command('seed_db', stdout=StringIO(), **options)
+
+@pytest.mark.django_db
+def test_seed_db_without_options_creates_showcase_projects():
+    seed()
+    assert set(Project.objects.values_list('title', flat=True)) == {
+        "Full-Stack Django Portfolio", "Daily Briefing API",
+    }
+
+@pytest.mark.django_db
+def test_seed_db_generates_synthetic_projects_in_batches(django_assert_max_num_queries):
+    """Tests that each batch costs a constant number of queries, not one per row."""
+    with django_assert_max_num_queries(30):
+        seed(projects=250, technologies=30, categories=4, max_technologies=3, batch_size=100)
+
+    assert Project.objects.count() == 250
+    assert Technology.objects.count() == 30
+    assert Category.objects.count() == 4
+    links = Project.technologies.through.objects
+    assert 250 <= links.count() <= 750
+    assert not Project.objects.filter(technologies=None).exists()
+    assert not Project.objects.filter(category=None).exists()
+
+@pytest.mark.django_db
+def test_seed_db_is_reproducible_and_repeatable():
+    """Tests that a seed fixes the data, and that seeding again adds new rows."""
+    seed(projects=20, seed=7)
+    first = list(Project.objects.order_by('pk').values_list('title', 'description', 'category__name'))
+    Project.objects.all().delete()
+
+    seed(projects=20, seed=7)
+    seed(projects=20, seed=7)
+    second = list(Project.objects.order_by('pk').values_list('title', 'description', 'category__name'))
+
+    assert len(second) == 40
+    assert [row[1:] for row in second[:20]] == [row[1:] for row in first]
+
+@pytest.mark.django_db
+def test_seed_db_indexes_synthetic_projects():
+    seed(projects=30)
+    word = Project.objects.first().description.split()[1]
+    assert search_projects(Project.objects.all(), word).exists()
+
+@pytest.mark.django_db
+def test_seed_db_shares_placeholder_images():
+    seed(projects=10, images=2)
+    names = set(Project.objects.values_list('image', flat=True))
+    assert len(names) <= 2
+    project = Project.objects.first()
+    assert project.image_renditions['card']['width'] == 400
+
+def test_seed_db_rejects_invalid_sizes():
+    with pytest.raises(CommandError):
+        seed(projects=10, batch_size=0)
@@ -0,0 +1,146 @@
+"""
+Tests for the token bucket rate limits.
+
+These tests check that clients may burst up to the rate and then get
+429 Too Many Requests with a Retry-After header until the bucket
+refills, under WSGI and ASGI alike, that buckets are kept per IP
+address, per user and per scope, that the contact form only limits
+submissions, and that concurrent requests never spend the same token.
+"""
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory
+from django.urls import reverse
+from .models import OutboundEmail
+from .throttling import ContactThrottle, TokenBucketThrottle
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable clock for the throttles, starting at 1000.0."""
+    now = [1000.0]
+    monkeypatch.setattr(TokenBucketThrottle, 'timer', staticmethod(lambda: now[0]))
+    return now
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'anon': '3/min', 'user': '5/min', 'write': '2/min', 'contact': '2/hour'},
+    }
+
+def contact_data():
+    return {'name': "Ada", 'email': "ada@example.com", 'subject': "Hello", 'message': "Hi there"}
+
+@pytest.mark.django_db
+def test_clients_burst_then_wait_for_the_bucket_to_refill(client, clock, rates):
+    url = reverse('project-list')
+    assert [client.get(url).status_code for _ in range(3)] == [200, 200, 200]
+
+    response = client.get(url)
+    assert response.status_code == 429
+    assert response['Retry-After'] == '20'  # One token per 60 / 3 seconds.
+
+    clock[0] += 19
+    assert client.get(url).status_code == 429
+    clock[0] += 1
+    assert client.get(url).status_code == 200
+    assert client.get(url).status_code == 429
+
+    clock[0] += 600  # A full bucket, not more.
+    assert [client.get(url).status_code for _ in range(4)] == [200, 200, 200, 429]
+
+@pytest.mark.django_db
+@pytest.mark.urls('portfolio_project.async_urls')
+def test_async_api_reads_are_throttled(async_client, clock, rates, test_project):
+    """Tests that the async API views run the same throttles as the viewset."""
+    urls = [reverse('project-list'), reverse('project-detail', args=[test_project.pk])] * 2
+
+    async def get_all():
+        return [await async_client.get(url) for url in urls]
+
+    responses = async_to_sync(get_all)()
+    assert [response.status_code for response in responses] == [200, 200, 200, 429]
+    assert responses[-1]['Retry-After'] == '20'
+    assert responses[-1].json()['detail'].startswith('Request was throttled.')
+
+@pytest.mark.django_db
+def test_buckets_are_kept_per_ip_address(client, clock, rates):
+    url = reverse('project-list')
+    for _ in range(3):
+        client.get(url, REMOTE_ADDR='10.0.0.1')
+
+    assert client.get(url, REMOTE_ADDR='10.0.0.1').status_code == 429
+    assert client.get(url, REMOTE_ADDR='10.0.0.2').status_code == 200
+
+@pytest.mark.django_db
+def test_forwarded_for_headers_are_ignored_without_proxies(client, clock, rates):
+    url = reverse('project-list')
+    statuses = [
+        client.get(url, HTTP_X_FORWARDED_FOR=f'10.0.0.{number}').status_code for number in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+
+def test_rates_above_a_thousand_per_second_still_limit(clock, settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'contact': '4000/s'},
+    }
+    request = RequestFactory().post('/contact/', REMOTE_ADDR='10.0.0.1')
+    allowed = [ContactThrottle().allow_request(request, None) for _ in range(4001)]
+    assert allowed.count(True) == 4000
+
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['contact'] = '2000000/s'
+    with pytest.raises(ImproperlyConfigured):
+        ContactThrottle()
+
+@pytest.mark.django_db
+def test_users_have_their_own_rate_and_a_write_rate(admin_client, clock, rates):
+    list_url, bulk_url = reverse('project-list'), reverse('project-bulk')
+    items = [{'title': "Throttled", 'description': "d", 'link': None, 'category': None, 'technologies': []}]
+    response = admin_client.post(bulk_url, items, content_type='application/json')
+    assert response.status_code == 201
+    ids = [result['id'] for result in response.json()['results']]
+    assert admin_client.delete(bulk_url, ids, content_type='application/json').status_code == 200
+
+    response = admin_client.post(bulk_url, items, content_type='application/json')
+    assert response.status_code == 429
+    assert response['Retry-After'] == '30'
+
+    # Reads are still allowed, up to the user rate: every request above,
+    # the refused write too, took a token from the user bucket.
+    assert [admin_client.get(list_url).status_code for _ in range(3)] == [200, 200, 429]
+
+@pytest.mark.django_db
+def test_contact_form_limits_submissions(client, clock, rates):
+    url = reverse('projects:contact')
+    assert [client.post(url, contact_data()).status_code for _ in range(2)] == [302, 302]
+
+    response = client.post(url, contact_data())
+    assert response.status_code == 429
+    assert response['Retry-After'] == '1800'
+    assert OutboundEmail.objects.count() == 2
+    assert client.get(url).status_code == 200
+
+    clock[0] += 1800
+    assert client.post(url, contact_data()).status_code == 302
+
+def test_concurrent_requests_never_spend_the_same_token(clock, rates):
+    request = RequestFactory().post('/contact/', REMOTE_ADDR='10.0.0.1')
+    barrier = threading.Barrier(16)
+    allowed = []
+
+    def worker():
+        throttle = ContactThrottle()
+        barrier.wait()
+        allowed.append(throttle.allow_request(request, None))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert allowed.count(True) == 2
@@ -0,0 +1,177 @@
+"""
+Tests for the projects application's direct-to-storage image uploads.
+
+These tests run the full presign -> upload -> submit-key flow against
+PresignedFileSystemStorage, the offline stand-in for S3, and verify that
+the server rejects tampered uploads, images too large to decode, and
+keys it did not issue.
+"""
+import pytest
+from io import BytesIO
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from .image_jobs import build_pending
+from .models import Project, Category, Technology
+from .uploads import UPLOAD_PREFIX
+
+def png_bytes(size=(640, 480)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (20, 120, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def presign(client, filename='diagram.png', content_type='image/png'):
+    response = client.post(
+        reverse('project-uploads'),
+        {'filename': filename, 'content_type': content_type},
+        content_type='application/json',
+    )
+    assert response.status_code == 201
+    return response.json()
+
+def upload(client, presigned, content, **overrides):
+    data = {**presigned['fields'], **overrides}
+    data['file'] = SimpleUploadedFile('upload', content)
+    return client.post(presigned['url'], data)
+
+@pytest.mark.django_db
+def test_presign_requires_authentication(client):
+    """Tests that anonymous users cannot reserve uploads."""
+    response = client.post(
+        reverse('project-uploads'),
+        {'filename': 'a.png', 'content_type': 'image/png'},
+        content_type='application/json',
+    )
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_presign_rejects_non_image_types(admin_client):
+    response = admin_client.post(
+        reverse('project-uploads'),
+        {'filename': 'a.exe', 'content_type': 'application/octet-stream'},
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_api_create_with_uploaded_key(admin_client, client):
+    """
+    Tests the full API flow: presign, upload straight to storage (no
+    session needed), then create the project from the returned key.
+    """
+    presigned = presign(admin_client, filename='my diagram.png')
+    assert presigned['key'].startswith(UPLOAD_PREFIX)
+    assert presigned['key'].endswith('/my_diagram.png')
+
+    assert upload(client, presigned, png_bytes()).status_code == 204
+
+    Category.objects.create(name='Web Development')
+    Technology.objects.create(name='Python')
+    response = admin_client.post(reverse('project-list'), {
+        'title': 'Uploaded',
+        'description': 'Image uploaded directly to storage.',
+        'link': 'http://example.com',
+        'category': 'Web Development',
+        'technologies': ['Python'],
+        'image_key': presigned['key'],
+    }, content_type='application/json')
+
+    assert response.status_code == 201
+    assert 'image_key' not in response.json()
+    build_pending()
+    project = Project.objects.get(title='Uploaded')
+    assert project.image.name == presigned['key']
+    assert project.image_variants['renditions']['card']['width'] == 400
+
+@pytest.mark.django_db
+def test_form_update_with_uploaded_key(admin_client, test_project):
+    """Tests that the HTML edit form accepts an image_key instead of a file."""
+    presigned = presign(admin_client)
+    upload(admin_client, presigned, png_bytes())
+
+    response = admin_client.post(reverse('projects:project_edit', args=[test_project.pk]), {
+        'title': test_project.title,
+        'description': test_project.description,
+        'technologies': [tech.pk for tech in test_project.technologies.all()],
+        'link': test_project.link,
+        'image_key': presigned['key'],
+    })
+
+    assert response.status_code == 302
+    test_project.refresh_from_db()
+    assert test_project.image.name == presigned['key']
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('overrides, status', [
+    ({'policy': 'forged'}, 403),
+    ({'key': f'{UPLOAD_PREFIX}{"0" * 32}/other.png'}, 403),
+    ({'Content-Type': 'text/html'}, 403),
+])
+def test_direct_upload_enforces_policy(admin_client, client, overrides, status):
+    """Tests that uploads which do not match their signed policy are refused."""
+    presigned = presign(admin_client)
+    assert upload(client, presigned, png_bytes(), **overrides).status_code == status
+    assert not default_storage.exists(presigned['key'])
+
+@pytest.mark.django_db
+def test_direct_upload_enforces_size_and_expiry(admin_client, client, settings):
+    settings.PROJECT_IMAGE_MAX_UPLOAD_SIZE = 100
+    assert upload(client, presign(admin_client), png_bytes()).status_code == 400
+
+    settings.PROJECT_IMAGE_UPLOAD_EXPIRY = -1
+    assert upload(client, presign(admin_client), b'x').status_code == 403
+
+@pytest.mark.django_db
+def test_direct_upload_cannot_overwrite(admin_client, client):
+    presigned = presign(admin_client)
+    assert upload(client, presigned, png_bytes()).status_code == 204
+    assert upload(client, presigned, png_bytes()).status_code == 409
+
+@pytest.mark.django_db
+def test_image_key_validation(admin_client, test_project, settings):
+    """Tests that keys must be issued, present, small enough and real images."""
+    url = reverse('project-detail', args=[test_project.pk])
+
+    def patch(key):
+        return admin_client.patch(url, {'image_key': key}, content_type='application/json')
+
+    not_image = presign(admin_client)['key']
+    default_storage.save(not_image, ContentFile(b'<html>not an image</html>'))
+    unissued = 'project_images/elsewhere.png'
+    default_storage.save(unissued, ContentFile(png_bytes()))
+    issued = presign(admin_client)['key']
+    forged = f'{issued[:issued.index(".") + 1]}{"A" * 22}/diagram.png'
+    default_storage.save(forged, ContentFile(png_bytes()))
+
+    assert patch('project_images/uploads/../../settings.py').status_code == 400
+    assert patch(unissued).status_code == 400
+    assert patch(forged).status_code == 400
+    assert patch(issued.replace('diagram.png', 'other.png')).status_code == 400
+    assert patch(presign(admin_client)['key']).status_code == 400
+    assert patch(not_image).status_code == 400
+
+    too_large = presign(admin_client)['key']
+    default_storage.save(too_large, ContentFile(png_bytes()))
+    settings.PROJECT_IMAGE_MAX_UPLOAD_SIZE = 100
+    assert patch(too_large).status_code == 400
+
+@pytest.mark.django_db
+def test_image_key_rejects_decompression_bombs(admin_client, client, test_project, monkeypatch):
+    presigned = presign(admin_client)
+    upload(client, presigned, png_bytes())
+    # Pillow refuses images over twice MAX_IMAGE_PIXELS.
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100_000)
+
+    response = admin_client.patch(
+        reverse('project-detail', args=[test_project.pk]),
+        {'image_key': presigned['key']}, content_type='application/json',
+    )
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_long_filenames_are_shortened_to_fit_the_image_field(admin_client):
+    key = presign(admin_client, filename=f'{"x" * 150}.png')['key']
+    assert len(key) == Project._meta.get_field('image').max_length
+    assert key.endswith('x.png')
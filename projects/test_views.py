@@ -6,10 +6,12 @@ including standard page loads, form submissions (Contact, CRUD),
 and security/redirects.
 """
 import pytest
+from io import StringIO
 from django.urls import reverse
 from django.core import mail
+from django.core.management import call_command
 from django.conf import settings
-from .models import Project, Technology, Category
+from .models import Project, Technology, Category, OutboundEmail
 
 # --- View "Read" Tests (GET requests) ---
 
@@ -52,13 +54,61 @@ def test_technology_detail_page_displays_project(client, test_project, test_tech
     assert response.status_code == 200
     assert test_project.title in str(response.content)
 
+@pytest.mark.django_db
+def test_project_index_returns_304_when_unchanged(client, test_project):
+    """
+    Tests that the homepage answers a matching If-None-Match with 304,
+    and renders again once a project is edited.
+    """
+    url = reverse('projects:project_index')
+    etag = client.get(url)['ETag']
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    test_project.title = "Edited Title"
+    test_project.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Edited Title" in str(response.content)
+
+@pytest.mark.django_db
+def test_project_detail_etag_changes_with_technology_rename(client, test_project, test_technology):
+    """Tests that renaming a technology invalidates its projects' pages."""
+    url = reverse('projects:project_detail', args=[test_project.pk])
+    etag = client.get(url)['ETag']
+
+    test_technology.name = "ECMAScript"
+    test_technology.save()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "ECMAScript" in str(response.content)
+
+@pytest.mark.django_db
+def test_project_index_caches_cards_per_visitor_type(client, admin_client, test_project):
+    """
+    Tests that cached project cards keep separate anonymous and
+    authenticated variants, and that an edit renders a fresh card.
+    """
+    url = reverse('projects:project_index')
+    edit_url = reverse('projects:project_edit', args=[test_project.pk])
+
+    assert edit_url not in client.get(url).content.decode()
+    assert edit_url in admin_client.get(url).content.decode()
+    assert edit_url not in client.get(url).content.decode()
+
+    test_project.description = "A freshly edited description."
+    test_project.save()
+    assert "A freshly edited description." in client.get(url).content.decode()
+
 # --- Contact Form Test ---
 
 @pytest.mark.django_db
-def test_contact_form_sends_email_and_redirects(client):
+def test_contact_form_queues_email_and_redirects(client):
     """
-    Tests that a valid contact form submission sends an email
-    and correctly redirects the user to the homepage.
+    Tests that a valid contact form submission queues the email in the
+    outbox without sending it, redirects the user to the homepage, and
+    that the outbox worker then delivers it.
     """
     url = reverse('projects:contact')
     form_data = {
@@ -74,6 +124,10 @@ def test_contact_form_sends_email_and_redirects(client):
 
     assert response.status_code == 302
     assert response.url == reverse('projects:project_index')
+    assert len(mail.outbox) == 0
+    assert OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING).count() == 1
+
+    call_command('process_outbox', stdout=StringIO())
     assert len(mail.outbox) == 1
 
     sent_email = mail.outbox[0]
@@ -155,4 +209,16 @@ def test_project_delete_view(admin_client, test_project):
 
     assert response.status_code == 302
     assert response.url == reverse('projects:project_index')
-    assert Project.objects.count() == 0
\ No newline at end of file
+    assert Project.objects.count() == 0
+# --- Admin Search Test ---
+
+@pytest.mark.django_db
+def test_admin_project_search_uses_full_text_index(admin_client, test_project):
+    """Tests that the admin changelist search finds projects by description words."""
+    Project.objects.create(title="Unrelated", description="Nothing to see here.")
+    url = reverse('admin:projects_project_changelist')
+
+    response = admin_client.get(url, {'q': 'description'})
+
+    assert response.status_code == 200
+    assert list(response.context['cl'].result_list) == [test_project]
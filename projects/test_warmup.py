@@ -0,0 +1,57 @@
+"""
+Tests for the application server configuration and worker warm-up.
+
+These tests verify that gunicorn.conf.py sizes workers from the
+usable CPUs, within a cap, or from the environment, and that the
+warm-up compiles every project template into the cached loader without
+touching the database.
+"""
+import os
+import runpy
+from django.conf import settings
+from django.template import engines
+from portfolio_project.warmup import warm_up
+
+def load_gunicorn_config(monkeypatch, **env):
+    for name in ('SERVER_MODE', 'WEB_CONCURRENCY', 'GUNICORN_THREADS'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+def test_gunicorn_config_defaults_to_threaded_wsgi(monkeypatch):
+    config = load_gunicorn_config(monkeypatch)
+    assert config['wsgi_app'] == 'portfolio_project.wsgi:application'
+    assert config['worker_class'] == 'gthread'
+    assert config['workers'] == min(config['CPUS'] * 2 + 1, config['MAX_DEFAULT_WORKERS'])
+    assert config['threads'] == 4
+    assert config['preload_app'] is True
+
+def test_gunicorn_config_reads_environment(monkeypatch):
+    config = load_gunicorn_config(monkeypatch, SERVER_MODE='asgi', WEB_CONCURRENCY='3', PORT='9000')
+    assert config['wsgi_app'] == 'portfolio_project.asgi:application'
+    assert config['worker_class'] == 'uvicorn_worker.UvicornWorker'
+    assert config['workers'] == 3
+    assert config['bind'] == '0.0.0.0:9000'
+
+def test_gunicorn_config_caps_workers_on_large_hosts(monkeypatch):
+    # Only the CPUs this process may run on count, and never past the cap.
+    monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(64)), raising=False)
+    config = load_gunicorn_config(monkeypatch)
+    assert config['CPUS'] == 64
+    assert config['workers'] == config['MAX_DEFAULT_WORKERS']
+
+    monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: {0, 1}, raising=False)
+    config = load_gunicorn_config(monkeypatch, SERVER_MODE='asgi')
+    assert config['workers'] == 2
+
+def test_warm_up_compiles_templates_without_database_access():
+    # Without the django_db mark, any query would raise an error.
+    stats = warm_up()
+
+    assert stats['url_patterns'] > 0
+    assert stats['templates'] >= 9
+    loader = engines['django'].engine.template_loaders[0]
+    assert {
+        'base.html', 'projects/project_index.html', 'projects/includes/picture.html',
+    } <= set(loader.get_template_cache)
@@ -0,0 +1,174 @@
+"""
+Rate limiting for the 'projects' app.
+
+Each client gets a token bucket per scope: it holds up to N tokens,
+refills at N per period (the DRF rate syntax, e.g. '60/min') and every
+request takes one. A client may burst N requests, then gets one more
+per period / N seconds.
+
+The bucket is kept in its equivalent "generic cell rate" form: one
+integer under one key of the THROTTLE_CACHE_ALIAS cache, the time (in
+microseconds) at which it will be full again. A request pushes it period / N
+later with an atomic `incr()`, and is refused (and the push undone with
+`decr()`) if that leaves more than a full period to wait. So a check is
+a few O(1) cache operations however many requests the client made,
+unlike DRF's own throttles that keep a history of every request of the
+period, and concurrent requests never spend the same token.
+
+That takes a cache whose `add`/`incr`/`decr` are atomic and shared by
+every worker: Redis (THROTTLE_REDIS_URL) in production. Django's file
+and database caches are neither atomic nor O(1) per write.
+
+The DRF throttles below are enabled for every API view in
+`REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES']`, with their rates in
+`DEFAULT_THROTTLE_RATES`; `throttle()` applies one to a plain Django
+view, such as the contact form.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from rest_framework.throttling import BaseThrottle
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+MICROSECONDS = 1_000_000
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class: subclasses set `scope` and implement `get_cache_key()`,
+    returning None for requests they do not limit.
+    """
+    scope = None
+    timer = time.time
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+
+    def __init__(self):
+        rate = settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][self.scope]
+        self.capacity, self.period = self.parse_rate(rate)
+        # The time one request adds to the bucket, in whole microseconds.
+        self.interval = self.period * MICROSECONDS // self.capacity
+        if not self.interval:
+            raise ImproperlyConfigured(
+                f"Throttle rate {rate!r} ({self.scope}) is above one request per microsecond."
+            )
+        self.wait_seconds = None
+
+    @staticmethod
+    def parse_rate(rate):
+        """Returns (requests, seconds) for a rate such as '60/min'."""
+        num, period = rate.split('/')
+        return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        now = int(self.timer() * MICROSECONDS)
+        period = self.period * MICROSECONDS
+        interval = self.interval
+        while True:
+            # A missing bucket is a full one: the first request creates it.
+            if cache.add(key, now + interval, timeout=_seconds(interval)):
+                return True
+            try:
+                full_at = cache.incr(key, interval)
+            except ValueError:
+                continue  # Expired between add() and incr().
+            # A second of slack: cache timeouts are rounded up to seconds.
+            if full_at - interval >= now - MICROSECONDS:
+                break
+            # Full long ago, yet not expired (e.g. the clock jumped): start over.
+            cache.delete(key)
+        if full_at - now > period:
+            cache.decr(key, interval)
+            self.wait_seconds = (full_at - period - now) / MICROSECONDS
+            return False
+        # Expire once the bucket is full again, as a missing one is.
+        cache.touch(key, timeout=_seconds(full_at - now))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Limits the requests of anonymous clients, per IP address."""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Limits the requests of signed-in users, per user."""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class WriteTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Limits writes, per user or, for anonymous clients, per IP address:
+    they cost far more than reads.
+    """
+    scope = 'write'
+
+    def get_cache_key(self, request, view):
+        if request.method not in WRITE_METHODS:
+            return None
+        if request.user and request.user.is_authenticated:
+            ident = f'user_{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class ContactThrottle(TokenBucketThrottle):
+    """Limits contact form submissions, per IP address."""
+    scope = 'contact'
+
+    def get_cache_key(self, request, view):
+        if request.method != 'POST':
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+def _seconds(microseconds):
+    """A cache timeout of at least a second: 0 would expire the key at once."""
+    return max(1, math.ceil(microseconds / MICROSECONDS))
+
+
+def throttle(throttle_class):
+    """
+    Decorates a plain Django view with a throttle: requests over the
+    limit get 429 Too Many Requests with a Retry-After header.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            throttle = throttle_class()
+            if not throttle.allow_request(request, None):
+                wait = math.ceil(throttle.wait())
+                response = HttpResponse(
+                    f"Too many requests. Try again in {wait} seconds.\n",
+                    status=429, content_type='text/plain; charset=utf-8',
+                )
+                response['Retry-After'] = str(wait)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
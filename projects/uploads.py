@@ -0,0 +1,101 @@
+"""
+Direct-to-storage image uploads for the 'projects' app.
+
+Instead of posting the image to a web worker, which then streams it on
+to the storage, a client:
+
+1. asks for an upload with `create_upload()` (exposed as
+   `POST /api/projects/uploads/`), which reserves a unique object name
+   under UPLOAD_PREFIX, signed with SECRET_KEY, and presigns a POST to
+   the storage;
+2. uploads the file straight to the storage with that presigned POST;
+3. submits the returned `key` as `image_key` with the project form or
+   API payload, where `validate_upload_key()` checks its signature, and
+   the upload itself, before it is assigned to `Project.image`.
+
+The default storage must implement `presigned_upload()` (see 'storage.py').
+"""
+import os
+import re
+import secrets
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.signing import Signer
+from django.utils.crypto import constant_time_compare
+from django.utils.text import get_valid_filename
+from PIL import Image
+
+UPLOAD_PREFIX = 'project_images/uploads/'
+# Keys are stored in Project.image, a 100-character column: the signature
+# is cut to 22 base64 characters (132 bits of the HMAC).
+MAX_KEY_LENGTH = 100
+NONCE_BYTES = 8
+SIGNATURE_LENGTH = 22
+# <prefix><random hex>.<signature of the rest of the key>/<filename>
+KEY_PATTERN = re.compile(
+    rf'^{re.escape(UPLOAD_PREFIX)}(?P<nonce>[0-9a-f]{{{NONCE_BYTES * 2}}})'
+    rf'\.(?P<signature>[\w-]{{{SIGNATURE_LENGTH}}})/(?P<filename>[\w.-]+)$'
+)
+
+# Allowed content type -> Pillow format.
+IMAGE_TYPES = {
+    'image/jpeg': 'JPEG',
+    'image/png': 'PNG',
+    'image/webp': 'WEBP',
+    'image/gif': 'GIF',
+}
+
+
+def create_upload(filename, content_type):
+    """
+    Reserves an object name for a new image and presigns its upload.
+    Returns {'key', 'url', 'fields', 'max_size'}.
+    """
+    if content_type not in IMAGE_TYPES:
+        raise ValidationError(
+            'Unsupported image type %(type)s.', code='invalid_type', params={'type': content_type},
+        )
+    filename = get_valid_filename(os.path.basename(filename or '')) or 'image'
+    nonce = secrets.token_hex(NONCE_BYTES)
+    room = MAX_KEY_LENGTH - len(UPLOAD_PREFIX) - len(nonce) - SIGNATURE_LENGTH - 2
+    root, extension = os.path.splitext(filename)
+    filename = (root[:max(1, room - len(extension))] + extension)[:room]
+    key = f'{UPLOAD_PREFIX}{nonce}.{_sign(nonce, filename)}/{filename}'
+    max_size = settings.PROJECT_IMAGE_MAX_UPLOAD_SIZE
+    presigned = default_storage.presigned_upload(
+        key, content_type, max_size, settings.PROJECT_IMAGE_UPLOAD_EXPIRY,
+    )
+    return {'key': key, **presigned, 'max_size': max_size}
+
+
+def validate_upload_key(key):
+    """
+    Checks that `key` names a finished upload of an acceptable image:
+    issued by `create_upload()` (its signature matches), present in the
+    storage, within the size limit, and decodable as one of IMAGE_TYPES.
+    """
+    match = KEY_PATTERN.match(key)
+    if not match or not constant_time_compare(
+        match['signature'], _sign(match['nonce'], match['filename']),
+    ):
+        raise ValidationError('This is not a valid upload key.', code='invalid_key')
+    if not default_storage.exists(key):
+        raise ValidationError('No upload was found for this key.', code='missing')
+    if default_storage.size(key) > settings.PROJECT_IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError('The uploaded image is too large.', code='too_large')
+    try:
+        with default_storage.open(key, 'rb') as upload:
+            with Image.open(upload) as image:
+                image_format = image.format
+                image.verify()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        image_format = None
+    if image_format not in IMAGE_TYPES.values():
+        raise ValidationError('The uploaded file is not a supported image.', code='invalid_image')
+    return key
+
+
+def _sign(nonce, filename):
+    return Signer(salt='projects.uploads').signature(f'{nonce}/{filename}')[:SIGNATURE_LENGTH]
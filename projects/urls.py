@@ -24,4 +24,7 @@ urlpatterns = [
     path('projects/<int:pk>/', views.project_detail, name='project_detail'),
     path('projects/<int:pk>/edit/', views.ProjectUpdateView.as_view(), name="project_edit"),
     path('projects/<int:pk>/delete/', views.ProjectDeleteView.as_view(), name="project_delete"),
+
+    # Local stand-in for presigned direct-to-storage uploads
+    path('uploads/direct/', views.direct_upload, name='direct_upload'),
 ]
\ No newline at end of file
@@ -10,48 +10,87 @@ Class-Based Views (CBVs) for handling complex, model-based
 CRUD (Create, Read, Update, Delete) operations for Projects.
 """
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.mail import send_mail
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.db import IntegrityError
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from .models import Project, Technology, Category
 from .forms import ContactForm, ProjectForm
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.conf import settings
-from rest_framework import viewsets
+from django.utils.functional import cached_property
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action, api_view
 from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
-from .serializers import ProjectSerializer, TechnologySerializer
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from .serializers import (
+    BulkProjectSerializer, ImageUploadSerializer, ProjectSerializer, TechnologySerializer,
+)
+from .bulk import BulkWriteError, create_projects, delete_projects, update_projects, upsert_projects
+from .pagination import ProjectCursorPagination
+from .representations import ProjectRows
+from .search import search_projects
+from . import api_cache, export, facets, fieldsets, filters, outbox, related, uploads
+from .renderers import CSVRenderer, NDJSONRenderer
+from .storage import UploadRejected
+from .throttling import ContactThrottle, throttle
+from .conditional import (
+    conditional_action, conditional_page, project_list_state, project_state, technology_state,
+)
 
+@conditional_page(project_list_state, last_modified=False)
 def project_index(request):
     """
-    Renders the homepage with a list of all Project objects.
+    Renders the homepage with a list of all Project objects, optionally
+    filtered by technology and category (see 'filters.py').
 
     Template: 'projects/project_index.html'
-    Context: {'projects': All Project objects}
+    Context: {
+        'projects': The (filtered) Project objects,
+        'filters': The active filters, or None,
+        'card_cache_timeout': Lifetime of each cached project card
+    }
     """
-    projects = Project.objects.all()
+    try:
+        project_filters = filters.requested_filters(request.GET)
+    except serializers.ValidationError as exc:
+        return HttpResponseBadRequest(' '.join(exc.detail['match']))
+    projects = filters.filter_projects(Project.objects.for_listing(), project_filters)
     
     context = {
-        'projects': projects
+        'projects': projects,
+        'filters': project_filters,
+        'card_cache_timeout': settings.PROJECT_CARD_CACHE_TIMEOUT,
     }
     return render(request, 'projects/project_index.html', context)
 
 def about(request):
     return render(request, 'projects/about.html')
 
+@conditional_page(project_state)
 def project_detail(request, pk):
     """
     Renders the detail page for a single project, identified by its 
     primary key (pk). Returns a 404 if the project is not found.
 
     Template: 'projects/project_detail.html'
-    Context: {'project': The requested Project object}
+    Context: {
+        'project': The requested Project object,
+        'related_projects': Its precomputed related projects (see 'related.py')
+    }
     """
-    project = get_object_or_404(Project, pk=pk)
+    project = get_object_or_404(Project.objects.for_detail(), pk=pk)
     context = {
-        'project': project
+        'project': project,
+        'related_projects': related.related_projects(project.pk),
     }
     return render(request, 'projects/project_detail.html', context)
 
+@conditional_page(technology_state, last_modified=False)
 def technology_detail(request, name):
     """
     Displays a detail page for a single Technology.
@@ -63,22 +102,27 @@ def technology_detail(request, name):
     Template: 'projects/technology_detail.html'
     Context: {
         'technology': The requested Technology object,
-        'projects': A QuerySet of all projects linked to this technology
+        'projects': A QuerySet of all projects linked to this technology,
+        'card_cache_timeout': Lifetime of each cached project card
     }
     """
     technology = get_object_or_404(Technology, name=name)
-    projects = technology.project_set.all()
+    projects = technology.project_set.for_listing()
     context = {
         'technology': technology,
-        'projects': projects
+        'projects': projects,
+        'card_cache_timeout': settings.PROJECT_CARD_CACHE_TIMEOUT,
     }
     return render(request, 'projects/technology_detail.html', context)
 
+@throttle(ContactThrottle)
 def contact(request):
     """
-    Handles the contact form.
+    Handles the contact form, a few submissions per client and hour
+    (the 'contact' throttle rate).
     - GET: Displays a blank ContactForm.
-    - POST: Validates form. If valid, sends email and redirects to 
+    - POST: Validates form. If valid, queues the email in the outbox
+            (delivered by the 'process_outbox' worker) and redirects to
             'project_index'. If invalid, re-renders form with errors.
             
     Template: 'projects/contact.html'
@@ -104,18 +148,13 @@ def contact(request):
             Message:
             {message}
             """
-            send_mail(
+            outbox.enqueue(
                 subject,
                 email_message,
                 settings.DEFAULT_FROM_EMAIL,
                 [settings.ADMIN_EMAIL],
             )
-
-            print(f'New Message from {name} ({email}): {message}')
             return redirect('projects:project_index')
-        else:
-            print("Form invalid!")
-            print(form.errors.as_data())
     else:
         form = ContactForm()
         
@@ -124,6 +163,23 @@ def contact(request):
     }
     return render(request, 'projects/contact.html', context)
 
+@csrf_exempt
+@require_POST
+def direct_upload(request):
+    """
+    Receives presigned direct uploads for PresignedFileSystemStorage,
+    standing in for the storage service itself. The signed policy in the
+    POST, not a session or CSRF token, authorizes the upload.
+    Responds 204 No Content on success, like S3.
+    """
+    if not hasattr(default_storage, 'accept_upload'):
+        raise Http404('Direct uploads go straight to the storage service.')
+    try:
+        default_storage.accept_upload(request.POST, request.FILES.get('file'))
+    except UploadRejected as exc:
+        return HttpResponse(str(exc), status=exc.status, content_type='text/plain')
+    return HttpResponse(status=204)
+
 class ProjectCreateView(LoginRequiredMixin, CreateView):
     model = Project
     form_class = ProjectForm
@@ -148,10 +204,193 @@ class ProjectViewSet(viewsets.ModelViewSet):
     A read-write API endpoint for projects.
     - Read operations (list, retrieve) are public.
     - Write operations (create, update, destroy) are restricted to admins.
+    - The list is keyset-paginated on (created_at, id); follow `next`.
+    - `?q=` runs a ranked full-text search over title and description.
+    - `?technology=` (repeatable, with `match=any|all`) and `?category=`
+      filter the list (see 'filters.py').
+    - `?fields=` / `?omit=` select the fields of each project, and only
+      the matching columns are loaded (see 'fieldsets.py').
+    - Lists are built from `values()` rows by ProjectRows, which matches
+      the serializer's output without creating model instances.
+    - `bulk/` writes a JSON list of projects in one transaction (see
+      'bulk.py'): POST creates, PATCH updates by `id`, PUT upserts by
+      `title` and DELETE deletes a list of ids.
+    - `GET <pk>/related/` lists the projects sharing the most technologies
+      with a project, precomputed (see 'related.py').
+    - `GET export/` streams the whole catalog as NDJSON or CSV (admins).
+    - `POST uploads/` presigns a direct-to-storage image upload; send the
+      returned `key` as `image_key` when creating or updating a project.
+    - Read responses are served from the representation cache in
+      'api_cache.py' when possible, and answer conditional requests
+      with 304 Not Modified (see 'conditional.py').
     """
-    queryset = Project.objects.select_related('category').prefetch_related('technologies').all().order_by('-created_at')
+    queryset = Project.objects.for_detail().order_by('-created_at', '-id')
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ProjectCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('q', '').strip()
+        if self.action == 'list' and query:
+            queryset = search_projects(queryset, query)
+        if self.action == 'list':
+            queryset = filters.filter_projects(queryset, self.project_filters)
+        if self.action in ('list', 'retrieve'):
+            queryset = fieldsets.restrict(queryset, self.fieldset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve'):
+            kwargs.setdefault('fields', self.fieldset)
+        return super().get_serializer(*args, **kwargs)
+
+    @cached_property
+    def project_filters(self):
+        """The technology and category filters of the list, or None."""
+        return filters.requested_filters(self.request.query_params)
+
+    @cached_property
+    def fieldset(self):
+        """The fields asked for with `?fields=` / `?omit=`, or None for all."""
+        return fieldsets.requested_fields(self.request.query_params)
+
+    @conditional_action(project_list_state, last_modified=False)
+    def list(self, request, *args, **kwargs):
+        cached = api_cache.get_list(request)
+        if cached is not None:
+            return Response(cached)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.format_kwarg:
+            # URLs must carry the format suffix: leave them to the serializer.
+            data = self.represent(self.paginate_queryset(queryset))
+        else:
+            rows = ProjectRows(request, self.fieldset)
+            data = self.represent(self.paginate_queryset(rows.values(queryset)), rows.represent)
+        response = self.get_paginated_response(data)
+        api_cache.set_list(request, response.data)
+        return response
+
+    @conditional_action(project_state)
+    def retrieve(self, request, *args, **kwargs):
+        # As invalidated: by int pk, whatever the URL spelling ('05').
+        # project_state has already turned a non-numeric pk into a 404.
+        pk = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if self.fieldset is not None:
+            return super().retrieve(request, *args, **kwargs)
+        cached = api_cache.get_projects([pk], request)
+        if pk in cached:
+            return Response(cached[pk])
+
+        response = super().retrieve(request, *args, **kwargs)
+        api_cache.set_projects({pk: response.data}, request)
+        return response
+
+    def represent(self, projects, serialize=None):
+        """
+        Serializes `projects` (instances, or rows for `serialize`), reusing
+        cached representations and only serializing the cache misses.
+        Sparse fieldsets are always serialized.
+        """
+        serialize = serialize or (lambda missing: self.get_serializer(missing, many=True).data)
+        if self.fieldset is not None:
+            return serialize(projects)
+        return api_cache.represent(projects, self.request, serialize)
+
+    @action(detail=True, methods=['get'], url_path='related', url_name='related')
+    @conditional_action(project_state)
+    def related_projects(self, request, pk=None):
+        """The related projects of a project, most similar first."""
+        projects = related.related_projects(pk)
+        if not projects and not Project.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response([
+            {
+                'id': project.pk,
+                'url': reverse('project-detail', args=[project.pk], request=request),
+                'title': project.title,
+                'score': project.similarity,
+            }
+            for project in projects
+        ])
+
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Reports the representation cache hit rate of the serving worker (admins only)."""
+        return Response(api_cache.stats())
+
+    @action(
+        detail=False, methods=['get'], permission_classes=[IsAdminUser],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """
+        Streams every project as NDJSON (default) or CSV (`?format=csv`),
+        a chunk of rows at a time (see 'export.py').
+        """
+        export_format = request.accepted_renderer.format
+        blocks = export.iter_blocks(export_format, settings.PROJECTS_EXPORT_CHUNK_SIZE)
+        if settings.ASYNC_VIEWS:
+            blocks = export.aiter_blocks(blocks)
+        response = StreamingHttpResponse(blocks, content_type=export.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="projects.{export_format}"'
+        return response
+
+    @action(detail=False, methods=['post'])
+    def uploads(self, request):
+        """Presigns a direct upload of a project image to storage."""
+        serializer = ImageUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = uploads.create_upload(**serializer.validated_data)
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post', 'patch', 'put', 'delete'])
+    def bulk(self, request):
+        """
+        Writes a batch of projects in one transaction. Invalid batches are
+        rejected as a whole with 400 and a list of errors per item.
+        """
+        max_items = settings.PROJECTS_BULK_MAX_ITEMS
+        if request.method == 'DELETE':
+            ids = serializers.ListField(
+                child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=max_items,
+            ).run_validation(request.data)
+            return self._bulk_write(delete_projects, ids, status.HTTP_200_OK)
+
+        serializer = BulkProjectSerializer(
+            data=request.data, many=True, partial=request.method == 'PATCH',
+            allow_empty=False, max_length=max_items,
+        )
+        serializer.is_valid(raise_exception=True)
+        operation, success = {
+            'POST': (create_projects, status.HTTP_201_CREATED),
+            'PATCH': (update_projects, status.HTTP_200_OK),
+            'PUT': (upsert_projects, status.HTTP_200_OK),
+        }[request.method]
+        return self._bulk_write(operation, serializer.validated_data, success)
+
+    def _bulk_write(self, operation, items, success):
+        try:
+            results = operation(items)
+        except BulkWriteError as exc:
+            return Response(exc.errors, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            # A concurrent write took a title (or deleted a project) first.
+            return Response(
+                {'detail': 'The batch conflicts with a concurrent change; nothing was saved.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({'results': results}, status=success)
+
+@api_view(['GET'])
+def facet_counts(request):
+    """
+    Lists the technologies and categories in use with their number of
+    projects, most used first. The counts are stored on each row (see
+    'facets.py'), so this is a single query.
+    """
+    return Response(facets.facet_counts())
 
 class TechnologyViewSet(viewsets.ModelViewSet):
     """
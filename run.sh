@@ -8,5 +8,15 @@ python manage.py migrate
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Contact-form emails and project image resizing are only queued by the
+# site; this worker delivers and builds them. Set OUTBOX_WORKER=0 where a separate process already runs
+# `manage.py process_outbox --loop` (as the docker-compose worker does).
+if [ "${OUTBOX_WORKER:-1}" != "0" ]; then
+    echo "Starting outbox worker..."
+    python manage.py process_outbox --loop &
+fi
+
 echo "Starting server..."
-gunicorn portfolio_project.wsgi
\ No newline at end of file
+# Configured by gunicorn.conf.py; SERVER_MODE=asgi serves the async
+# views with Uvicorn workers.
+exec gunicorn
\ No newline at end of file